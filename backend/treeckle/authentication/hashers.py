@@ -0,0 +1,99 @@
+import threading
+from typing import Callable, TypeVar
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+from treeckle.common.exceptions import ServiceUnavailable
+
+T = TypeVar("T")
+
+## Argon2 cost profiles; memory_cost is in KiB
+ARGON2_PROFILES = {
+    ## Django's defaults
+    "default": {"time_cost": 2, "memory_cost": 102400, "parallelism": 8},
+    ## cheaper hashes for login bursts on small instances
+    "interactive": {"time_cost": 2, "memory_cost": 65536, "parallelism": 2},
+    ## stronger hashes when CPU and memory are plentiful
+    "sensitive": {"time_cost": 4, "memory_cost": 262144, "parallelism": 8},
+}
+
+
+def get_argon2_parameters() -> dict:
+    parameters = dict(ARGON2_PROFILES[settings.PASSWORD_HASHING["PROFILE"]])
+
+    for name in ("time_cost", "memory_cost", "parallelism"):
+        if settings.PASSWORD_HASHING[name.upper()] is not None:
+            parameters[name] = settings.PASSWORD_HASHING[name.upper()]
+
+    return parameters
+
+
+class ProfiledArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher whose cost comes from settings.PASSWORD_HASHING.
+
+    Hashes made with other parameters still verify, and must_update flags them
+    so that they are rehashed on the next successful login.
+    """
+
+    def __init__(self):
+        parameters = get_argon2_parameters()
+
+        self.time_cost = parameters["time_cost"]
+        self.memory_cost = parameters["memory_cost"]
+        self.parallelism = parameters["parallelism"]
+
+
+class PasswordHashingService:
+    """
+    Runs password hashing in the calling thread, at most max_concurrent at a time.
+
+    Argon2 releases the GIL while hashing, so when gunicorn serves requests on
+    several threads the limit caps the combined CPU and memory use of hashes in a
+    process. Calls wait up to timeout seconds for a slot and are then rejected
+    with a 503. Sync workers serve one request at a time, so they never wait.
+    """
+
+    def __init__(self, max_concurrent: int, timeout: float):
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        if not self.slots.acquire(timeout=self.timeout):
+            raise ServiceUnavailable(
+                detail="Too many login attempts at the moment, please try again.",
+                code="password_hashing_busy",
+            )
+
+        try:
+            return fn(*args)
+        finally:
+            self.slots.release()
+
+    def make_password(self, password: str) -> str:
+        return self.run(hashers.make_password, password)
+
+    def check_password(self, password: str, encoded: str) -> tuple[bool, bool]:
+        """
+        Returns whether the password matches, and whether the encoded hash should
+        be replaced because the preferred hasher or its parameters have changed.
+        """
+
+        def check() -> tuple[bool, bool]:
+            needs_rehash = False
+
+            def setter(_password):
+                nonlocal needs_rehash
+                needs_rehash = True
+
+            return hashers.check_password(password, encoded, setter), needs_rehash
+
+        return self.run(check)
+
+
+password_hashing_service = PasswordHashingService(
+    max_concurrent=settings.PASSWORD_HASHING["MAX_CONCURRENT"],
+    timeout=settings.PASSWORD_HASHING["TIMEOUT"],
+)
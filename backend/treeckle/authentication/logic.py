@@ -5,7 +5,15 @@ from django.db import transaction
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from treeckle.common.constants import REFRESH, ACCESS, TOKENS, USER
+from treeckle.common.constants import (
+    REFRESH,
+    ACCESS,
+    TOKENS,
+    USER,
+    ROLE,
+    ORGANIZATION_ID,
+    USER_VERSION,
+)
 
 from users.models import User
 from users.logic import requester_to_json
@@ -15,6 +23,11 @@ from .models import PasswordAuthentication, PasswordAuthenticationData
 def get_tokens(user: User) -> dict:
     refreshToken = RefreshToken.for_user(user)
 
+    ## claims are copied to the access token, allowing authorization without db
+    refreshToken[ROLE] = user.role
+    refreshToken[ORGANIZATION_ID] = user.organization_id
+    refreshToken[USER_VERSION] = user.version
+
     return {
         REFRESH: str(refreshToken),
         ACCESS: str(refreshToken.access_token),
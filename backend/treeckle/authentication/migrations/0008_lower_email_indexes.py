@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:05
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0007_auto_20210726_0249"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="facebookauthentication",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="facebook_auth_lower_email_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="googleauthentication",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="google_auth_lower_email_idx",
+            ),
+        ),
+    ]
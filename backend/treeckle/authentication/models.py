@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 from django.db import models, transaction
-from django.contrib.auth.hashers import check_password, make_password
+from django.db.models.functions import Lower
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 
@@ -11,6 +11,7 @@ from treeckle.common.models import TimestampedModel
 
 from content_delivery_service.models import Image
 from users.models import User, UserInvite
+from .hashers import password_hashing_service
 
 
 ## DB models
@@ -58,11 +59,13 @@ class CustomProfileAuthenticationMethod(AuthenticationMethod):
 
 ## Alternative auth methods
 class GoogleAuthentication(CustomProfileAuthenticationMethod):
-    pass
+    class Meta:
+        indexes = [models.Index(Lower("email"), name="google_auth_lower_email_idx")]
 
 
 class FacebookAuthentication(CustomProfileAuthenticationMethod):
-    pass
+    class Meta:
+        indexes = [models.Index(Lower("email"), name="facebook_auth_lower_email_idx")]
 
 
 class OpenIdAuthentication(AuthenticationMethod):
@@ -79,7 +82,16 @@ ALTERNATIVE_AUTH_METHODS = [
 
 class PasswordAuthentication(AuthenticationMethod):
     def is_valid(self, auth_data: "AuthenticationData"):
-        return check_password(auth_data.auth_id, self.auth_id)
+        is_correct, needs_rehash = password_hashing_service.check_password(
+            auth_data.auth_id, self.auth_id
+        )
+
+        ## upgrade the stored hash to the current hasher and cost parameters
+        if is_correct and needs_rehash:
+            self.auth_id = password_hashing_service.make_password(auth_data.auth_id)
+            self.save(update_fields=["auth_id", "updated_at"])
+
+        return is_correct
 
     @classmethod
     def create(
@@ -99,7 +111,7 @@ class PasswordAuthentication(AuthenticationMethod):
             )
             raise BadRequest(detail=detail, code="bad_password")
 
-        auth_data.auth_id = make_password(auth_data.auth_id)
+        auth_data.auth_id = password_hashing_service.make_password(auth_data.auth_id)
         return super().create(user, auth_data)
 
 
@@ -125,7 +137,12 @@ class AuthenticationData(ABC):
 
     @transaction.atomic
     def authenticate(self) -> Optional[User]:
-        from users.logic import get_users, get_user_invites
+        from users.logic import (
+            get_users,
+            get_user_invites,
+            email_matches,
+            get_single_by_email,
+        )
 
         ## try to login to associated user account if any
         if self.auth_method_class is not PasswordAuthentication:
@@ -140,7 +157,7 @@ class AuthenticationData(ABC):
                 user = auth_method.user
 
                 ## remove user invite with same email if any
-                get_user_invites(email=user.email).delete()
+                get_user_invites(email_matches(user.email)).delete()
 
                 ## update custom profile auth method if required
                 if isinstance(auth_method, CustomProfileAuthenticationMethod) and (
@@ -157,23 +174,22 @@ class AuthenticationData(ABC):
 
         ## check if is existing user
         try:
-            user = (
-                get_users(email=self.email)
-                .select_related(
+            user = get_single_by_email(
+                get_users().select_related(
                     "organization",
                     "profile_image",
                     "passwordauthentication",
                     "googleauthentication",
                     "facebookauthentication",
-                )
-                .get()
+                ),
+                self.email,
             )
         except User.DoesNotExist:
             user = None
 
         try:
-            user_invite = (
-                get_user_invites(email=self.email).select_related("organization").get()
+            user_invite = get_single_by_email(
+                get_user_invites().select_related("organization"), self.email
             )
         except UserInvite.DoesNotExist:
             user_invite = None
@@ -184,12 +200,11 @@ class AuthenticationData(ABC):
 
         ## user invite exists but not user
         if user is None:
+            ## social profile images are external urls, so nothing is uploaded
             if self.profile_image:
-                image = Image(
+                image = Image.objects.create(
                     organization=user_invite.organization, image_url=self.profile_image
                 )
-                image.upload_image_to_server()
-                image.save()
             else:
                 image = None
 
@@ -197,7 +212,8 @@ class AuthenticationData(ABC):
             user = User.objects.create(
                 organization=user_invite.organization,
                 name=self.name,
-                email=self.email,
+                ## invite emails are stored lowercased
+                email=user_invite.email,
                 profile_image=image,
                 role=user_invite.role,
             )
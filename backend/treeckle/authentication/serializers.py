@@ -1,8 +1,6 @@
 import os
 import requests
 
-from django.utils.timezone import now
-
 from rest_framework import serializers, exceptions
 
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
@@ -20,12 +18,21 @@ from treeckle.common.constants import (
     PASSWORD,
     USER,
     TOKENS,
+    TOKENS_ONLY,
+    USER_VERSION,
 )
 from treeckle.common.exceptions import InternalServerError, BadRequest
 from users.models import User, UserInvite
-from users.logic import requester_to_json, get_users, get_user_invites
+from users.logic import (
+    requester_to_json,
+    get_users,
+    get_user_invites,
+    get_single_by_email,
+    update_last_login,
+    get_user_version,
+)
 from email_service.logic import send_password_reset_email
-from .logic import get_authenticated_data, reset_password
+from .logic import get_authenticated_data, get_tokens, reset_password
 
 from .models import (
     AuthenticationData,
@@ -181,8 +188,7 @@ class BaseAuthenticationSerializer(serializers.Serializer):
         if authenticated_user is None:
             self.raise_invalid_user()
 
-        authenticated_user.last_login = now()
-        authenticated_user.save()
+        update_last_login(authenticated_user)
 
         return get_authenticated_data(user=authenticated_user)
 
@@ -252,10 +258,24 @@ class AccessTokenRefreshSerializer(
     TokenRefreshSerializer,
     BaseAuthenticationSerializer,
 ):
-    def validate(self, attrs):
-        tokens = super().validate(attrs)
+    ## skips loading the requester when the client only needs new tokens
+    tokens_only = serializers.BooleanField(default=False)
 
-        user_id = RefreshToken(tokens[REFRESH]).get(key=api_settings.USER_ID_CLAIM)
+    def validate(self, attrs):
+        refresh_token = RefreshToken(attrs[REFRESH])
+        user_id = refresh_token[api_settings.USER_ID_CLAIM]
+        version = refresh_token.get(USER_VERSION)
+
+        ## claims are current if the user's version is unchanged,
+        ## which is usually answered by the user version cache.
+        ## tokens issued before versioning carry no version and need a full lookup
+        if (
+            attrs[TOKENS_ONLY]
+            and version is not None
+            and version == get_user_version(user_id)
+        ):
+            ## rotates and blacklists the refresh token per the SIMPLE_JWT settings
+            return {TOKENS: {REFRESH: attrs[REFRESH], **super().validate(attrs)}}
 
         try:
             user = (
@@ -272,9 +292,17 @@ class AccessTokenRefreshSerializer(
         except User.DoesNotExist:
             self.raise_invalid_user()
 
-        data = requester_to_json(user)
+        ## new tokens are issued below instead of rotating the current one,
+        ## which is still blacklisted as a rotation would
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            try:
+                refresh_token.blacklist()
+            except AttributeError:
+                pass
 
-        return {USER: data, TOKENS: tokens}
+        ## reissue tokens so that role and organization claims stay current,
+        ## and return the user since their role or organization may have changed
+        return {USER: requester_to_json(user), TOKENS: get_tokens(user)}
 
 
 class CheckAccountSerializer(BaseAuthenticationSerializer):
@@ -284,13 +312,13 @@ class CheckAccountSerializer(BaseAuthenticationSerializer):
         email = attrs[EMAIL]
 
         try:
-            user = get_users(email=email).get()
+            user = get_single_by_email(get_users(), email)
             return {EMAIL: user.email, NAME: user.name}
         except User.DoesNotExist:
             pass
 
         try:
-            user_invite = get_user_invites(email=email).get()
+            user_invite = get_single_by_email(get_user_invites(), email)
             return {EMAIL: user_invite.email}
         except UserInvite.DoesNotExist:
             pass
@@ -305,7 +333,7 @@ class PasswordResetSerializer(BaseAuthenticationSerializer):
         email = attrs[EMAIL]
 
         try:
-            user = get_users(email=email).get()
+            user = get_single_by_email(get_users(), email)
         except User.DoesNotExist:
             self.raise_invalid_user()
 
@@ -1 +1,208 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from treeckle.common.testing import benchmark, measure
+from organizations.models import Organization
+from users.models import User, Role
+from .hashers import PasswordHashingService, get_argon2_parameters
+from .logic import get_tokens
+from .models import PasswordAuthentication, PasswordAuthenticationData
+from .serializers import AccessTokenRefreshSerializer, CheckAccountSerializer
+
+
 # Create your tests here.
+class AccessTokenRefreshSerializerTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Organization")
+        self.user = User.objects.create(
+            organization=organization, name="User", email="user@example.com"
+        )
+
+    def refresh(self, refresh_token: str, tokens_only: bool = True) -> dict:
+        serializer = AccessTokenRefreshSerializer(
+            data={"refresh": refresh_token, "tokens_only": tokens_only}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def test_current_token_is_rotated(self):
+        refresh_token = get_tokens(self.user)["refresh"]
+
+        tokens = self.refresh(refresh_token)["tokens"]
+
+        self.assertNotEqual(tokens["refresh"], refresh_token)
+        self.assertEqual(
+            RefreshToken(tokens["refresh"])["user_version"], self.user.version
+        )
+
+    def test_current_token_skips_the_user(self):
+        refresh_token = get_tokens(self.user)["refresh"]
+        ## warms the user version cache
+        self.refresh(refresh_token)
+
+        with self.assertNumQueries(0):
+            data = self.refresh(refresh_token)
+
+        self.assertNotIn("user", data)
+
+    def test_stale_token_returns_the_current_user(self):
+        refresh_token = get_tokens(self.user)["refresh"]
+        self.user.role = Role.ADMIN
+        self.user.save()
+
+        with patch.object(
+            TokenRefreshSerializer, "validate", side_effect=AssertionError
+        ):
+            data = self.refresh(refresh_token)
+
+        self.assertEqual(data["user"]["role"], Role.ADMIN)
+        self.assertEqual(AccessToken(data["tokens"]["access"])["role"], Role.ADMIN)
+        self.assertNotEqual(data["tokens"]["refresh"], refresh_token)
+
+    def test_full_refresh_returns_the_user(self):
+        refresh_token = get_tokens(self.user)["refresh"]
+
+        data = self.refresh(refresh_token, tokens_only=False)
+
+        self.assertEqual(data["user"]["id"], self.user.id)
+        self.assertEqual(
+            RefreshToken(data["tokens"]["refresh"])["user_version"], self.user.version
+        )
+
+    @benchmark
+    def test_benchmark_refresh_throughput(self):
+        refresh_token = get_tokens(self.user)["refresh"]
+
+        for tokens_only in [True, False]:
+            num_refreshes = 1000
+            elapsed = measure(
+                lambda: [
+                    self.refresh(refresh_token, tokens_only)
+                    for _ in range(num_refreshes)
+                ],
+                repeat=1,
+            )
+            print(
+                f"\nrefresh with tokens_only={tokens_only}: "
+                f"{num_refreshes / elapsed:.0f} refreshes/s"
+            )
+
+    def test_legacy_token_of_deleted_user_is_rejected(self):
+        ## issued before tokens carried a user version
+        refresh_token = str(RefreshToken.for_user(self.user))
+        self.user.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.refresh(refresh_token)
+
+
+class CaseOnlyDuplicateEmailsTestCase(TestCase):
+    """
+    Accounts created before emails were lowercased may differ only in case.
+    """
+
+    def setUp(self):
+        organization = Organization.objects.create(name="Organization")
+        self.lower_user = User.objects.create(
+            organization=organization, name="Lower", email="user@example.com"
+        )
+        self.mixed_user = User.objects.create(
+            organization=organization, name="Mixed", email="User@example.com"
+        )
+
+    def check_account(self, email: str) -> dict:
+        serializer = CheckAccountSerializer(data={"email": email})
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def test_exact_match_is_preferred(self):
+        self.assertEqual(self.check_account("User@example.com")["name"], "Mixed")
+        self.assertEqual(self.check_account("user@example.com")["name"], "Lower")
+
+        user = PasswordAuthenticationData(
+            name="", email="User@example.com", auth_id="Kx7pQ2mZ-login"
+        ).authenticate()
+        self.assertEqual(user, self.mixed_user)
+
+    def test_ambiguous_email_is_an_invalid_user(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.check_account("USER@example.com")
+
+        user = PasswordAuthenticationData(
+            name="", email="USER@example.com", auth_id="Kx7pQ2mZ-login"
+        ).authenticate()
+        self.assertIsNone(user)
+
+
+class PasswordHashingTestCase(TestCase):
+    password = "Kx7pQ2mZ-login"
+
+    def setUp(self):
+        organization = Organization.objects.create(name="Organization")
+        self.user = User.objects.create(
+            organization=organization, name="User", email="user@example.com"
+        )
+
+    def login(self, password: str):
+        return PasswordAuthenticationData(
+            name="", email=self.user.email, auth_id=password
+        ).authenticate()
+
+    def test_hash_with_old_parameters_is_rehashed_on_login(self):
+        old_hasher = Argon2PasswordHasher()
+        old_hasher.time_cost = 1
+        old_hasher.memory_cost = 8192
+        old_hasher.parallelism = 1
+        old_encoded = old_hasher.encode(self.password, old_hasher.salt())
+        PasswordAuthentication.objects.create(user=self.user, auth_id=old_encoded)
+
+        self.assertIsNone(self.login("wrong password"))
+        self.assertEqual(PasswordAuthentication.objects.get().auth_id, old_encoded)
+
+        self.assertEqual(self.login(self.password), self.user)
+
+        new_encoded = PasswordAuthentication.objects.get().auth_id
+        parameters = get_argon2_parameters()
+        self.assertNotEqual(new_encoded, old_encoded)
+        self.assertIn(
+            f"m={parameters['memory_cost']},t={parameters['time_cost']},"
+            f"p={parameters['parallelism']}",
+            new_encoded,
+        )
+        self.assertEqual(self.login(self.password), self.user)
+
+    @benchmark
+    def test_benchmark_login_throughput(self):
+        num_cores = os.cpu_count()
+        num_logins = num_cores * 10
+        ## one request thread per core, as under gthread workers
+        service = PasswordHashingService(max_concurrent=num_cores, timeout=60)
+        encoded = service.make_password(self.password)
+
+        with ThreadPoolExecutor(max_workers=num_cores) as executor:
+            start = time.perf_counter()
+            results = list(
+                executor.map(
+                    lambda _: service.check_password(self.password, encoded),
+                    range(num_logins),
+                )
+            )
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(is_correct for is_correct, _ in results))
+        print(
+            f"\npassword checks with the {settings.PASSWORD_HASHING['PROFILE']} "
+            f"profile: {num_logins / elapsed / num_cores:.1f} logins/s/core "
+            f"on {num_cores} cores"
+        )
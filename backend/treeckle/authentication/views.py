@@ -191,9 +191,14 @@ class AccessTokenRefreshView(TokenViewBase):
     Accepts a valid refresh token and returns a new access token along with current user data.
     The refresh token remains valid for future use until it expires.
 
+    With "tokensOnly": true, only the tokens are returned, and the user is neither
+    loaded nor returned unless their role or organization changed since the refresh
+    token was issued.
+
     Request body:
     {
-        "refresh": "jwt_refresh_token"
+        "refresh": "jwt_refresh_token",
+        "tokensOnly": false
     }
 
     Response:
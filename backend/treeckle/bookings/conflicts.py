@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from collections import namedtuple
+from typing import Iterable, Optional, Sequence
+
+from django.db import models
+
+DateTimeInterval = namedtuple(
+    "DateTimeInterval", ["start", "end", "is_new"], defaults=[True]
+)
+
+
+class DroppedReason(models.TextChoices):
+    CLASHING_APPROVED_BOOKING = "CLASHING_APPROVED_BOOKING"
+    CLASHING_NEW_INTERVAL = "CLASHING_NEW_INTERVAL"
+
+
+DroppedDateTimeInterval = namedtuple(
+    "DroppedDateTimeInterval", ["interval", "reason", "clashing_interval"]
+)
+
+
+class DateTimeIntervalIndex:
+    """
+    Sorted, array-backed index over a venue's existing intervals.
+
+    Intervals are sorted by start time, and a running maximum of end times is kept
+    alongside so that a clash check is a single binary search.
+    """
+
+    def __init__(self, date_time_intervals: Iterable[DateTimeInterval]):
+        sorted_date_time_intervals = sorted(date_time_intervals)
+
+        self.starts = []
+        ## index of the interval with the latest end among intervals[0..i]
+        self.max_end_indices = []
+        self.date_time_intervals = sorted_date_time_intervals
+
+        max_end_index = None
+
+        for index, date_time_interval in enumerate(sorted_date_time_intervals):
+            if (
+                max_end_index is None
+                or date_time_interval.end
+                > sorted_date_time_intervals[max_end_index].end
+            ):
+                max_end_index = index
+
+            self.starts.append(date_time_interval.start)
+            self.max_end_indices.append(max_end_index)
+
+    def __len__(self):
+        return len(self.date_time_intervals)
+
+    def find_clashing_interval(
+        self, date_time_interval: DateTimeInterval
+    ) -> Optional[DateTimeInterval]:
+        ## only intervals starting before the given interval ends can clash
+        num_candidates = bisect_left(self.starts, date_time_interval.end)
+
+        if num_candidates == 0:
+            return None
+
+        latest_ending_interval = self.date_time_intervals[
+            self.max_end_indices[num_candidates - 1]
+        ]
+
+        if latest_ending_interval.end <= date_time_interval.start:
+            return None
+
+        return latest_ending_interval
+
+
+def resolve_date_time_interval_conflicts(
+    existing_date_time_intervals: Iterable[DateTimeInterval],
+    new_date_time_intervals: Iterable[DateTimeInterval],
+) -> tuple[Sequence[DateTimeInterval], Sequence[DroppedDateTimeInterval]]:
+    """
+    Split new intervals into those that can be booked and those that are dropped.
+
+    A new interval is dropped if it clashes with an existing interval, or with an
+    earlier new interval that was kept. Runs in O((n + m) log n) for n existing and
+    m new intervals, plus the O(m log m) sort of the new intervals.
+    """
+    existing_date_time_interval_index = DateTimeIntervalIndex(
+        existing_date_time_intervals
+    )
+
+    valid_date_time_intervals = []
+    dropped_date_time_intervals = []
+
+    for date_time_interval in sorted(set(new_date_time_intervals)):
+        clashing_interval = existing_date_time_interval_index.find_clashing_interval(
+            date_time_interval
+        )
+
+        if clashing_interval is not None:
+            dropped_date_time_intervals.append(
+                DroppedDateTimeInterval(
+                    date_time_interval,
+                    DroppedReason.CLASHING_APPROVED_BOOKING,
+                    clashing_interval,
+                )
+            )
+            continue
+
+        ## kept intervals are sorted and non-overlapping, so only the last can clash
+        if (
+            valid_date_time_intervals
+            and valid_date_time_intervals[-1].end > date_time_interval.start
+        ):
+            dropped_date_time_intervals.append(
+                DroppedDateTimeInterval(
+                    date_time_interval,
+                    DroppedReason.CLASHING_NEW_INTERVAL,
+                    valid_date_time_intervals[-1],
+                )
+            )
+            continue
+
+        valid_date_time_intervals.append(date_time_interval)
+
+    return valid_date_time_intervals, dropped_date_time_intervals
@@ -1,9 +1,10 @@
+import base64
+import binascii
 from typing import Iterable, Sequence, Optional
 from datetime import datetime
-from collections import namedtuple
 
-from django.db.models import QuerySet
-from django.db import transaction
+from django.db.models import QuerySet, Q
+from django.db import transaction, IntegrityError
 
 from rest_framework.exceptions import PermissionDenied
 
@@ -18,48 +19,28 @@ from treeckle.common.constants import (
     END_DATE_TIME,
     STATUS,
     FORM_RESPONSE_DATA,
+    REASON,
+    CLASHING_DATE_TIME_RANGE,
 )
 from treeckle.common.exceptions import BadRequest
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.camel_case import camel_case_json, camelize_json_field
 from organizations.models import Organization
 from users.logic import user_to_json
 from users.models import User, Role
 from venues.models import Venue
 from venues.logic import venue_to_json
-from .models import Booking, BookingStatusAction, BookingStatus
-
-DateTimeInterval = namedtuple(
-    "DateTimeInterval", ["start", "end", "is_new"], defaults=[True]
+from .models import (
+    Booking,
+    BookingStatusAction,
+    BookingStatus,
+    EXCLUDE_OVERLAPPING_APPROVED_BOOKINGS,
+)
+from .conflicts import (
+    DateTimeInterval,
+    DroppedDateTimeInterval,
+    resolve_date_time_interval_conflicts,
 )
-
-
-def is_intersecting(interval_A: DateTimeInterval, interval_B: DateTimeInterval) -> bool:
-    return not (
-        interval_A.end <= interval_B.start or interval_A.start >= interval_B.end
-    )
-
-
-def get_non_overlapping_date_time_intervals(
-    date_time_intervals: Iterable[DateTimeInterval],
-) -> Sequence[DateTimeInterval]:
-    sorted_date_time_intervals = sorted(date_time_intervals)
-
-    non_overlapping_date_time_intervals = []
-
-    for date_time_interval in sorted_date_time_intervals:
-        while non_overlapping_date_time_intervals and is_intersecting(
-            non_overlapping_date_time_intervals[-1], date_time_interval
-        ):
-            if date_time_interval.is_new:
-                ## does not go to else clause
-                break
-
-            non_overlapping_date_time_intervals.pop()
-        else:
-            ## only adds non-overlapping intervals
-            non_overlapping_date_time_intervals.append(date_time_interval)
-
-    return non_overlapping_date_time_intervals
 
 
 def booking_to_json(
@@ -80,7 +61,7 @@ def booking_to_json(
     if full_details:
         data.update(
             {
-                FORM_RESPONSE_DATA: booking.form_response_data,
+                FORM_RESPONSE_DATA: camelize_json_field(booking.form_response_data),
             }
         )
 
@@ -97,7 +78,7 @@ def booking_to_json(
     #         }
     #     )
 
-    return data
+    return camel_case_json(data)
 
 
 def get_bookings(*args, **kwargs) -> QuerySet[Booking]:
@@ -132,9 +113,76 @@ def get_requested_bookings(
     )
 
 
+def encode_booking_cursor(booking: Booking) -> str:
+    raw_cursor = f"{booking.start_date_time.isoformat()}|{booking.id}"
+    return base64.urlsafe_b64encode(raw_cursor.encode()).decode()
+
+
+def decode_booking_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw_cursor = base64.urlsafe_b64decode(cursor.encode()).decode()
+        start_date_time, booking_id = raw_cursor.split("|")
+        return datetime.fromisoformat(start_date_time), int(booking_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor.")
+
+
+def paginate_bookings(
+    bookings: QuerySet[Booking],
+    limit: int,
+    cursor: Optional[tuple[datetime, int]],
+) -> tuple[Sequence[Booking], Optional[str]]:
+    ## keyset pagination over (start_date_time, id)
+    if cursor is not None:
+        cursor_start_date_time, cursor_id = cursor
+        bookings = bookings.filter(
+            Q(start_date_time__gt=cursor_start_date_time)
+            | Q(start_date_time=cursor_start_date_time, id__gt=cursor_id)
+        )
+
+    ## fetch one extra booking to check if there is a next page
+    paginated_bookings = list(bookings.order_by("start_date_time", "id")[: limit + 1])
+
+    if len(paginated_bookings) <= limit:
+        return paginated_bookings, None
+
+    paginated_bookings = paginated_bookings[:limit]
+    next_cursor = encode_booking_cursor(paginated_bookings[-1])
+
+    return paginated_bookings, next_cursor
+
+
+def date_time_interval_to_json(date_time_interval: DateTimeInterval) -> dict:
+    data = {
+        START_DATE_TIME: parse_datetime_to_ms_timestamp(date_time_interval.start),
+        END_DATE_TIME: parse_datetime_to_ms_timestamp(date_time_interval.end),
+    }
+
+    return camel_case_json(data)
+
+
+def dropped_date_time_interval_to_json(
+    dropped_date_time_interval: DroppedDateTimeInterval,
+) -> dict:
+    data = {
+        START_DATE_TIME: parse_datetime_to_ms_timestamp(
+            dropped_date_time_interval.interval.start
+        ),
+        END_DATE_TIME: parse_datetime_to_ms_timestamp(
+            dropped_date_time_interval.interval.end
+        ),
+        REASON: dropped_date_time_interval.reason,
+        CLASHING_DATE_TIME_RANGE: date_time_interval_to_json(
+            dropped_date_time_interval.clashing_interval
+        ),
+    }
+
+    return camel_case_json(data)
+
+
 def get_valid_new_date_time_intervals(
     venue: Venue, new_date_time_intervals: Iterable[DateTimeInterval]
-) -> Sequence[DateTimeInterval]:
+) -> tuple[Sequence[DateTimeInterval], Sequence[DroppedDateTimeInterval]]:
     min_start_date_time = min(new_date_time_intervals).start
     max_end_date_time = max(new_date_time_intervals).end
 
@@ -149,22 +197,11 @@ def get_valid_new_date_time_intervals(
         for booking in existing_bookings_within_range
     )
 
-    date_time_intervals = set(existing_date_time_intervals) | set(
-        new_date_time_intervals
-    )
-
-    valid_date_time_intervals = get_non_overlapping_date_time_intervals(
-        date_time_intervals
+    return resolve_date_time_interval_conflicts(
+        existing_date_time_intervals=existing_date_time_intervals,
+        new_date_time_intervals=new_date_time_intervals,
     )
 
-    valid_new_date_time_intervals = [
-        date_time_interval
-        for date_time_interval in valid_date_time_intervals
-        if date_time_interval.is_new
-    ]
-
-    return valid_new_date_time_intervals
-
 
 def create_bookings(
     title: str,
@@ -172,11 +209,18 @@ def create_bookings(
     venue: Venue,
     new_date_time_intervals: Iterable[DateTimeInterval],
     form_response_data: list[dict],
-) -> Sequence[Booking]:
+) -> tuple[Sequence[Booking], Sequence[DroppedDateTimeInterval]]:
+    """
+    Creates bookings for the new intervals that do not clash, and returns them
+    with the intervals that were dropped for clashing.
+    """
     if not new_date_time_intervals:
-        return []
+        return [], []
 
-    valid_new_date_time_intervals = get_valid_new_date_time_intervals(
+    (
+        valid_new_date_time_intervals,
+        dropped_date_time_intervals,
+    ) = get_valid_new_date_time_intervals(
         venue=venue, new_date_time_intervals=new_date_time_intervals
     )
     bookings_to_be_created = (
@@ -193,7 +237,16 @@ def create_bookings(
 
     new_bookings = Booking.objects.bulk_create(bookings_to_be_created)
 
-    return new_bookings
+    return new_bookings, dropped_date_time_intervals
+
+
+def is_clashing_approved_bookings_error(error: IntegrityError) -> bool:
+    ## the database driver reports the name of the violated constraint
+    diag = getattr(error.__cause__, "diag", None)
+
+    return (
+        getattr(diag, "constraint_name", None) == EXCLUDE_OVERLAPPING_APPROVED_BOOKINGS
+    )
 
 
 @transaction.atomic
@@ -249,14 +302,15 @@ def update_booking_status(
 
         return [booking], {booking.id: current_booking_status}
 
-    ## do not update if there are clashing APPROVED bookings
-    if (
-        get_bookings(status=BookingStatus.APPROVED, venue=booking.venue)
-        .exclude(end_date_time__lte=booking.start_date_time)
-        .exclude(start_date_time__gte=booking.end_date_time)
-        .exclude(id=booking.id)
-        .exists()
-    ):
+    ## do not update if there are clashing APPROVED bookings,
+    ## which is enforced by the exclusion constraint on Booking
+    try:
+        with transaction.atomic():
+            booking.save(update_fields=["status"])
+    except IntegrityError as e:
+        if not is_clashing_approved_bookings_error(e):
+            raise
+
         raise BadRequest(
             detail="Cannot approve booking due to other existing clashing approved bookings.",
             code="clashing_approved_bookings",
@@ -279,14 +333,13 @@ def update_booking_status(
     ## reject clashing pending bookings
     clashing_pending_bookings.update(status=BookingStatus.REJECTED)
 
-    ## update current booking to APPROVED
-    booking.save(update_fields=["status"])
-
     updated_bookings = [
         booking
         for booking in get_bookings(
             id__in=id_to_previous_booking_status_mapping
-        ).select_related("booker__organization", "booker__profile_image", "venue")
+        ).select_related(
+            "booker__organization", "booker__profile_image", "venue__organization"
+        )
     ]
 
     return updated_bookings, id_to_previous_booking_status_mapping
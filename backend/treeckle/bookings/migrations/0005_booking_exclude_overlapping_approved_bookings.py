@@ -0,0 +1,76 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:12
+
+from bisect import bisect_left
+
+import bookings.models
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+def check_no_overlapping_approved_bookings(apps, schema_editor):
+    ## the constraint cannot be added while approved bookings overlap; which of
+    ## them to keep is an admin's decision, so the migration stops and lists the
+    ## approved bookings overlapping an earlier approved one instead
+    Booking = apps.get_model("bookings", "Booking")
+
+    kept_intervals_by_venue = {}
+    overlapping_booking_ids = []
+
+    for booking_id, venue_id, start_date_time, end_date_time in (
+        Booking.objects.filter(status="APPROVED")
+        .order_by("created_at", "id")
+        .values_list("id", "venue_id", "start_date_time", "end_date_time")
+        .iterator()
+    ):
+        kept_intervals = kept_intervals_by_venue.setdefault(venue_id, [])
+
+        ## kept intervals are sorted and do not overlap, so only the neighbours
+        ## of a new interval can overlap it
+        index = bisect_left(kept_intervals, (start_date_time, end_date_time))
+
+        if (index > 0 and kept_intervals[index - 1][1] > start_date_time) or (
+            index < len(kept_intervals) and kept_intervals[index][0] < end_date_time
+        ):
+            overlapping_booking_ids.append(booking_id)
+            continue
+
+        kept_intervals.insert(index, (start_date_time, end_date_time))
+
+    if not overlapping_booking_ids:
+        return
+
+    raise RuntimeError(
+        f"Cannot exclude overlapping approved bookings while "
+        f"{len(overlapping_booking_ids)} approved booking(s) overlap earlier approved "
+        f"ones: {', '.join(map(str, overlapping_booking_ids))}. Revoke or reject "
+        f"them, then run the migration again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_alter_booking_status"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(
+            check_no_overlapping_approved_bookings, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(("status", "APPROVED")),
+                expressions=[
+                    ("venue", "="),
+                    (
+                        bookings.models.TsTzRange("start_date_time", "end_date_time"),
+                        "&&",
+                    ),
+                ],
+                name="exclude_overlapping_approved_bookings",
+            ),
+        ),
+    ]
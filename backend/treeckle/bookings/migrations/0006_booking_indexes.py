@@ -0,0 +1,26 @@
+# Generated by Django 4.2.20 on 2026-10-18 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_booking_exclude_overlapping_approved_bookings"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["venue", "status", "start_date_time", "end_date_time"],
+                name="booking_venue_status_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["booker", "start_date_time"], name="booking_booker_start_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
 from django.db import models
-from django.db.models import Q, F
+from django.db.models import Q, F, Func
 
 # Create your models here.
 from treeckle.common.models import TimestampedModel
@@ -23,6 +25,13 @@ class BookingStatusAction(models.TextChoices):
 
 MAX_STATUS_LENGTH = max(map(len, BookingStatus))
 
+EXCLUDE_OVERLAPPING_APPROVED_BOOKINGS = "exclude_overlapping_approved_bookings"
+
+
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
 
 class Booking(TimestampedModel):
     title = models.CharField(max_length=255)
@@ -42,7 +51,29 @@ class Booking(TimestampedModel):
             models.CheckConstraint(
                 check=Q(start_date_time__lt=F("end_date_time")),
                 name="booking_start_date_time_lt_end_date_time",
-            )
+            ),
+            ## approved bookings of the same venue cannot overlap
+            ExclusionConstraint(
+                name=EXCLUDE_OVERLAPPING_APPROVED_BOOKINGS,
+                expressions=[
+                    ("venue", RangeOperators.EQUAL),
+                    (
+                        TsTzRange("start_date_time", "end_date_time"),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                condition=Q(status=BookingStatus.APPROVED),
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["venue", "status", "start_date_time", "end_date_time"],
+                name="booking_venue_status_time_idx",
+            ),
+            models.Index(
+                fields=["booker", "start_date_time"],
+                name="booking_booker_start_idx",
+            ),
         ]
         ordering = ["-created_at"]
 
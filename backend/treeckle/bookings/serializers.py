@@ -1,6 +1,9 @@
 from rest_framework import serializers
 
 from .models import Booking, BookingStatus, BookingStatusAction
+from .logic import decode_booking_cursor
+
+MAX_BOOKINGS_PAGE_SIZE = 1000
 
 
 class GetBookingSerializer(serializers.Serializer):
@@ -12,10 +15,24 @@ class GetBookingSerializer(serializers.Serializer):
         choices=BookingStatus.choices, required=False
     )
     full_details = serializers.BooleanField(default=False, required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_BOOKINGS_PAGE_SIZE, required=False
+    )
+    cursor = serializers.CharField(required=False)
+
+    def validate_cursor(self, value):
+        """
+        Decode cursor into (start_date_time, id).
+        """
+        try:
+            return decode_booking_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor")
 
     def validate(self, data):
         """
-        Check that start_date_time is before end_date_time.
+        Check that start_date_time is before end_date_time,
+        and that limit is provided with cursor.
         """
         if (
             "start_date_time" in data
@@ -26,6 +43,9 @@ class GetBookingSerializer(serializers.Serializer):
                 "Booking start date/time must be before end date/time"
             )
 
+        if "cursor" in data and "limit" not in data:
+            raise serializers.ValidationError("Cursor must be used with limit")
+
         return data
 
 
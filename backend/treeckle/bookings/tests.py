@@ -1 +1,433 @@
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TransactionTestCase
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+
+from treeckle.common.camel_case import PrecomputedCamelCaseJSONRenderer
+from treeckle.common.exceptions import BadRequest
+from treeckle.common.testing import benchmark, measure
+from organizations.models import Organization
+from users.models import User, Role
+from venues.models import Venue, VenueCategory
+from .models import Booking, BookingStatus, BookingStatusAction
+from .logic import (
+    booking_to_json,
+    get_bookings,
+    get_requested_bookings,
+    update_booking_status,
+)
+from .conflicts import (
+    DateTimeInterval,
+    DroppedReason,
+    resolve_date_time_interval_conflicts,
+)
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def interval(start_hour: int, end_hour: int, is_new: bool = True):
+    return DateTimeInterval(
+        START + timedelta(hours=start_hour), START + timedelta(hours=end_hour), is_new
+    )
+
+
+def random_intervals(count: int, is_new: bool, rng: random.Random):
+    intervals = []
+
+    for _ in range(count):
+        start_hour = rng.randrange(24 * 365)
+        intervals.append(
+            interval(start_hour, start_hour + rng.randrange(1, 6), is_new=is_new)
+        )
+
+    return intervals
+
+
+def is_intersecting(interval_a: DateTimeInterval, interval_b: DateTimeInterval):
+    return interval_a.start < interval_b.end and interval_b.start < interval_a.end
+
+
+def get_legacy_valid_new_date_time_intervals(
+    existing_date_time_intervals, new_date_time_intervals
+):
+    ## the stack scan that resolve_date_time_interval_conflicts replaced
+    non_overlapping_date_time_intervals = []
+
+    for date_time_interval in sorted(
+        set(existing_date_time_intervals) | set(new_date_time_intervals)
+    ):
+        while non_overlapping_date_time_intervals and is_intersecting(
+            non_overlapping_date_time_intervals[-1], date_time_interval
+        ):
+            if date_time_interval.is_new:
+                break
+
+            non_overlapping_date_time_intervals.pop()
+        else:
+            non_overlapping_date_time_intervals.append(date_time_interval)
+
+    return [
+        date_time_interval
+        for date_time_interval in non_overlapping_date_time_intervals
+        if date_time_interval.is_new
+    ]
+
+
 # Create your tests here.
+class ResolveDateTimeIntervalConflictsTestCase(SimpleTestCase):
+    def test_drops_intervals_with_their_reason(self):
+        approved = interval(10, 12, is_new=False)
+
+        valid, dropped = resolve_date_time_interval_conflicts(
+            existing_date_time_intervals=[approved],
+            new_date_time_intervals=[
+                interval(9, 10),
+                interval(11, 13),
+                interval(12, 14),
+            ],
+        )
+
+        self.assertEqual(valid, [interval(9, 10), interval(12, 14)])
+        self.assertEqual(len(dropped), 1)
+        self.assertEqual(dropped[0].interval, interval(11, 13))
+        self.assertEqual(dropped[0].reason, DroppedReason.CLASHING_APPROVED_BOOKING)
+        self.assertEqual(dropped[0].clashing_interval, approved)
+
+    def test_drops_new_intervals_clashing_with_each_other(self):
+        valid, dropped = resolve_date_time_interval_conflicts(
+            existing_date_time_intervals=[],
+            new_date_time_intervals=[interval(1, 3), interval(2, 4), interval(1, 3)],
+        )
+
+        self.assertEqual(valid, [interval(1, 3)])
+        self.assertEqual(
+            [(d.interval, d.reason, d.clashing_interval) for d in dropped],
+            [(interval(2, 4), DroppedReason.CLASHING_NEW_INTERVAL, interval(1, 3))],
+        )
+
+    def test_finds_clash_with_long_interval_ending_late(self):
+        ## the latest ending interval is not the last one to start
+        long_approved = interval(0, 100, is_new=False)
+
+        valid, dropped = resolve_date_time_interval_conflicts(
+            existing_date_time_intervals=[long_approved, interval(1, 2, is_new=False)],
+            new_date_time_intervals=[interval(50, 51)],
+        )
+
+        self.assertEqual(valid, [])
+        self.assertEqual(dropped[0].clashing_interval, long_approved)
+
+    def test_random_intervals(self):
+        rng = random.Random(0)
+
+        for _ in range(50):
+            existing = random_intervals(200, is_new=False, rng=rng)
+            new = random_intervals(100, is_new=True, rng=rng)
+
+            valid, dropped = resolve_date_time_interval_conflicts(existing, new)
+
+            self.assertCountEqual(valid + [d.interval for d in dropped], set(new))
+
+            for i, date_time_interval in enumerate(valid):
+                self.assertFalse(
+                    any(is_intersecting(date_time_interval, e) for e in existing)
+                )
+                self.assertFalse(
+                    any(is_intersecting(date_time_interval, v) for v in valid[:i])
+                )
+
+            for dropped_date_time_interval in dropped:
+                self.assertTrue(
+                    is_intersecting(
+                        dropped_date_time_interval.interval,
+                        dropped_date_time_interval.clashing_interval,
+                    )
+                )
+
+    @benchmark
+    def test_benchmark_against_legacy_scan(self):
+        rng = random.Random(0)
+
+        for num_existing, num_new in [(1000, 100), (10000, 500), (50000, 1000)]:
+            existing = random_intervals(num_existing, is_new=False, rng=rng)
+            new = random_intervals(num_new, is_new=True, rng=rng)
+
+            legacy_time = measure(
+                lambda: get_legacy_valid_new_date_time_intervals(existing, new)
+            )
+            resolve_time = measure(
+                lambda: resolve_date_time_interval_conflicts(existing, new)
+            )
+
+            print(
+                f"\n{num_existing} approved, {num_new} new intervals: "
+                f"legacy {legacy_time * 1000:.1f}ms, "
+                f"indexed {resolve_time * 1000:.1f}ms"
+            )
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "the exclusion constraint on approved bookings needs PostgreSQL",
+)
+class ConcurrentBookingApprovalTestCase(TransactionTestCase):
+    """
+    Overlapping approvals racing in separate transactions must not both be
+    committed, which only the exclusion constraint on PostgreSQL guarantees.
+    """
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Organization")
+        self.admin = User.objects.create(
+            organization=self.organization,
+            name="Admin",
+            email="admin@example.com",
+            role=Role.ADMIN,
+        )
+        self.venue = Venue.objects.create(
+            organization=self.organization,
+            name="Venue",
+            category=VenueCategory.objects.create(
+                organization=self.organization, name="Category"
+            ),
+            form_field_data=[],
+        )
+
+    def create_booking(self, start_hour: int, end_hour: int) -> Booking:
+        return Booking.objects.create(
+            title="Booking",
+            booker=self.admin,
+            venue=self.venue,
+            start_date_time=START + timedelta(hours=start_hour),
+            end_date_time=START + timedelta(hours=end_hour),
+            form_response_data=[],
+        )
+
+    def approve_concurrently(self, bookings: list[Booking]) -> list:
+        barrier = threading.Barrier(len(bookings))
+        results = [None] * len(bookings)
+
+        def approve(index: int, booking: Booking):
+            try:
+                barrier.wait()
+                update_booking_status(booking, BookingStatusAction.APPROVE, self.admin)
+                results[index] = BookingStatus.APPROVED
+            except BadRequest as e:
+                results[index] = e
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=approve, args=(index, booking))
+            for index, booking in enumerate(bookings)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_only_one_of_overlapping_approvals_succeeds(self):
+        bookings = [self.create_booking(hour, hour + 2) for hour in range(4)]
+
+        results = self.approve_concurrently(bookings)
+
+        self.assertEqual(results.count(BookingStatus.APPROVED), 2)
+        for result in results:
+            if isinstance(result, BadRequest):
+                self.assertEqual(result.get_codes(), "clashing_approved_bookings")
+
+        approved_bookings = list(
+            Booking.objects.filter(status=BookingStatus.APPROVED).order_by(
+                "start_date_time"
+            )
+        )
+        for booking, next_booking in zip(approved_bookings, approved_bookings[1:]):
+            self.assertLessEqual(booking.end_date_time, next_booking.start_date_time)
+
+    def test_non_overlapping_approvals_all_succeed(self):
+        bookings = [self.create_booking(hour * 2, hour * 2 + 2) for hour in range(4)]
+
+        results = self.approve_concurrently(bookings)
+
+        self.assertEqual(results, [BookingStatus.APPROVED] * len(bookings))
+
+
+@benchmark
+class BookingIndexBenchmarkTestCase(TransactionTestCase):
+    """
+    Seeds BOOKING_BENCHMARK_ROWS bookings (1,000,000 by default) and reports the
+    query plans and latency of the booking range queries with and without the
+    composite indexes on Booking.
+    """
+
+    def setUp(self):
+        num_bookings = int(os.getenv("BOOKING_BENCHMARK_ROWS", 1_000_000))
+        rng = random.Random(0)
+
+        self.organization = Organization.objects.create(name="Organization")
+        category = VenueCategory.objects.create(
+            organization=self.organization, name="Category"
+        )
+        self.venues = Venue.objects.bulk_create(
+            Venue(
+                organization=self.organization,
+                name=f"Venue {i}",
+                category=category,
+                form_field_data=[],
+            )
+            for i in range(50)
+        )
+        self.bookers = User.objects.bulk_create(
+            User(
+                organization=self.organization,
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+            )
+            for i in range(200)
+        )
+
+        def generate_bookings():
+            for _ in range(num_bookings):
+                start_hour = rng.randrange(24 * 365 * 5)
+                yield Booking(
+                    title="Booking",
+                    booker=rng.choice(self.bookers),
+                    venue=rng.choice(self.venues),
+                    start_date_time=START + timedelta(hours=start_hour),
+                    end_date_time=START + timedelta(hours=start_hour + 2),
+                    status=rng.choice(BookingStatus.values),
+                    form_response_data=[],
+                )
+
+        Booking.objects.bulk_create(generate_bookings(), batch_size=10_000)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Booking._meta.db_table}")
+
+    def get_queries(self):
+        start_date_time = START + timedelta(days=365 * 2)
+        end_date_time = start_date_time + timedelta(days=31)
+
+        return {
+            "venue calendar": get_requested_bookings(
+                organization=self.organization,
+                user_id=None,
+                venue_id=self.venues[0].id,
+                start_date_time=start_date_time,
+                end_date_time=end_date_time,
+                statuses=[BookingStatus.APPROVED, BookingStatus.PENDING],
+            ),
+            "own bookings": get_requested_bookings(
+                organization=self.organization,
+                user_id=self.bookers[0].id,
+                venue_id=None,
+                start_date_time=start_date_time,
+                end_date_time=end_date_time,
+                statuses=None,
+            ),
+            "approved clashes": get_bookings(
+                venue=self.venues[0], status=BookingStatus.APPROVED
+            )
+            .exclude(end_date_time__lte=start_date_time)
+            .exclude(start_date_time__gte=start_date_time + timedelta(days=1)),
+        }
+
+    def report(self, label: str):
+        for name, queryset in self.get_queries().items():
+            print(f"\n{name} ({label}): {measure(lambda: list(queryset.all())):.4f}s")
+            print(queryset.explain())
+
+    def test_benchmark_booking_indexes(self):
+        indexes = Booking._meta.indexes
+
+        with connection.schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.remove_index(Booking, index)
+
+        try:
+            self.report("without indexes")
+        finally:
+            with connection.schema_editor() as schema_editor:
+                for index in indexes:
+                    schema_editor.add_index(Booking, index)
+
+        self.report("with indexes")
+
+
+def build_bookings(count: int) -> list[Booking]:
+    ## unsaved bookings with their relations set, so serializing them needs no queries
+    organization = Organization(id=1, name="Organization")
+    booker = User(
+        id=1,
+        organization=organization,
+        name="Booker",
+        email="booker@example.com",
+        created_at=START,
+        updated_at=START,
+    )
+    venue = Venue(
+        id=1,
+        organization=organization,
+        name="Venue",
+        created_at=START,
+        updated_at=START,
+    )
+
+    return [
+        Booking(
+            id=i,
+            title=f"Booking {i}",
+            booker=booker,
+            venue=venue,
+            start_date_time=START + timedelta(hours=i),
+            end_date_time=START + timedelta(hours=i + 1),
+            status=BookingStatus.PENDING,
+            form_response_data=[{"field_type": "text", "is_required": True}],
+            created_at=START,
+            updated_at=START,
+        )
+        for i in range(count)
+    ]
+
+
+class BookingRendererTestCase(SimpleTestCase):
+    def test_precomputed_keys_render_like_the_recursive_transform(self):
+        data = [
+            booking_to_json(booking, full_details=True) for booking in build_bookings(3)
+        ]
+
+        rendered = PrecomputedCamelCaseJSONRenderer().render(data)
+
+        self.assertEqual(rendered, CamelCaseJSONRenderer().render(data))
+        self.assertIn(b'"startDateTime"', rendered)
+        self.assertIn(b'"formResponseData":[{"fieldType":"text"', rendered)
+
+    def test_other_payloads_are_still_camelized(self):
+        rendered = PrecomputedCamelCaseJSONRenderer().render({"error_code": "x"})
+
+        self.assertEqual(rendered, b'{"errorCode":"x"}')
+
+    @benchmark
+    def test_benchmark_serializing_bookings(self):
+        bookings = build_bookings(10_000)
+
+        def serialize(renderer):
+            return lambda: renderer.render(
+                [booking_to_json(booking, full_details=True) for booking in bookings]
+            )
+
+        precomputed = measure(serialize(PrecomputedCamelCaseJSONRenderer()))
+        recursive = measure(serialize(CamelCaseJSONRenderer()))
+
+        print(
+            f"\nserializing 10k bookings: precomputed {precomputed:.3f}s, "
+            f"recursive camelize {recursive:.3f}s"
+        )
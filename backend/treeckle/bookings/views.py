@@ -10,7 +10,10 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 from drf_spectacular.openapi import OpenApiResponse, OpenApiTypes
 
 from treeckle.common.exceptions import BadRequest
+from treeckle.common.camel_case import camel_case_json
+from treeckle.common.responses import StreamingJSONListResponse, STREAMING_CHUNK_SIZE
 from treeckle.common.parsers import parse_ms_timestamp_to_datetime
+from treeckle.common.constants import BOOKINGS, NEXT_CURSOR, DROPPED_DATE_TIME_RANGES
 from email_service.logic import send_created_booking_emails, send_updated_booking_emails
 from users.permission_middlewares import check_access
 from users.models import Role, User
@@ -26,8 +29,10 @@ from .middlewares import check_requester_is_booker_or_admin
 from .logic import (
     get_bookings,
     get_requested_bookings,
+    paginate_bookings,
     booking_to_json,
     create_bookings,
+    dropped_date_time_interval_to_json,
     DateTimeInterval,
     update_booking_status,
 )
@@ -147,6 +152,20 @@ class PendingBookingCountView(APIView):
                 description="Whether to return full booking details",
                 required=False,
             ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Maximum number of bookings to return. When provided, bookings are ordered by start date/time and returned with a cursor to the next page",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Cursor from a previous page's next_cursor. Requires limit",
+                required=False,
+            ),
         ],
         responses={
             200: OpenApiResponse(description="List of bookings returned successfully"),
@@ -159,7 +178,9 @@ class PendingBookingCountView(APIView):
         description="Create one or more bookings for specified date/time ranges at a venue",
         tags=["Bookings"],
         responses={
-            201: OpenApiResponse(description="Bookings created successfully"),
+            201: OpenApiResponse(
+                description="Created bookings, and the date/time ranges dropped for clashing"
+            ),
             400: OpenApiResponse(description="Invalid booking data or venue not found"),
             403: OpenApiResponse(description="Insufficient permissions"),
         },
@@ -172,12 +193,16 @@ class BookingsView(APIView):
     GET: Retrieve bookings with optional filtering
     - Supports filtering by user_id, venue_id, date range, statuses
     - Returns basic or full details based on full_details parameter
+    - Optional keyset pagination with limit and cursor parameters,
+      returning {bookings, next_cursor} instead of a list
     - Accessible by residents, organizers, and admins
 
     POST: Create new bookings
     - Creates bookings for multiple date/time ranges at once
     - Sends notification emails to relevant parties
-    - Returns the created booking objects
+    - Returns {bookings, dropped_date_time_ranges}, listing the created
+      bookings and the ranges dropped for clashing with approved bookings
+      or with each other
     """
 
     @check_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
@@ -213,10 +238,31 @@ class BookingsView(APIView):
         )
 
         full_details = validated_data.get("full_details", False)
+        limit = validated_data.get("limit", None)
 
-        data = [
-            booking_to_json(booking, full_details=full_details) for booking in bookings
-        ]
+        if limit is None:
+            data = (
+                booking_to_json(booking, full_details=full_details)
+                for booking in bookings.iterator(chunk_size=STREAMING_CHUNK_SIZE)
+            )
+
+            return StreamingJSONListResponse(data, status=status.HTTP_200_OK)
+
+        paginated_bookings, next_cursor = paginate_bookings(
+            bookings=bookings,
+            limit=limit,
+            cursor=validated_data.get("cursor", None),
+        )
+
+        data = camel_case_json(
+            {
+                BOOKINGS: [
+                    booking_to_json(booking, full_details=full_details)
+                    for booking in paginated_bookings
+                ],
+                NEXT_CURSOR: next_cursor,
+            }
+        )
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -247,7 +293,7 @@ class BookingsView(APIView):
             for date_time_range in date_time_ranges
         ]
 
-        new_bookings = create_bookings(
+        new_bookings, dropped_date_time_intervals = create_bookings(
             title=validated_data.get("title", ""),
             booker=requester,
             venue=venue,
@@ -257,7 +303,17 @@ class BookingsView(APIView):
 
         send_created_booking_emails(bookings=new_bookings)
 
-        data = [booking_to_json(booking) for booking in new_bookings]
+        data = camel_case_json(
+            {
+                BOOKINGS: [booking_to_json(booking) for booking in new_bookings],
+                ## ranges not booked because they clash with approved bookings
+                ## or with each other
+                DROPPED_DATE_TIME_RANGES: [
+                    dropped_date_time_interval_to_json(dropped_date_time_interval)
+                    for dropped_date_time_interval in dropped_date_time_intervals
+                ],
+            }
+        )
 
         return Response(data, status=status.HTTP_201_CREATED)
 
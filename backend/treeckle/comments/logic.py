@@ -2,6 +2,7 @@ from django.db import transaction
 from django.db.models import QuerySet
 
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.camel_case import camel_case_json
 from treeckle.common.constants import (
     ID,
     CREATED_AT,
@@ -19,14 +20,16 @@ DELETED_COMMENT_MESSAGE = "This comment has been deleted."
 
 
 def comment_to_json(comment: Comment) -> dict:
-    return {
-        ID: comment.id,
-        CREATED_AT: parse_datetime_to_ms_timestamp(comment.created_at),
-        UPDATED_AT: parse_datetime_to_ms_timestamp(comment.updated_at),
-        COMMENTER: user_to_json(comment.commenter),
-        CONTENT: comment.content if comment.is_active else DELETED_COMMENT_MESSAGE,
-        IS_ACTIVE: comment.is_active,
-    }
+    return camel_case_json(
+        {
+            ID: comment.id,
+            CREATED_AT: parse_datetime_to_ms_timestamp(comment.created_at),
+            UPDATED_AT: parse_datetime_to_ms_timestamp(comment.updated_at),
+            COMMENTER: user_to_json(comment.commenter),
+            CONTENT: comment.content if comment.is_active else DELETED_COMMENT_MESSAGE,
+            IS_ACTIVE: comment.is_active,
+        }
+    )
 
 
 def booking_comment_to_json(booking_comment: BookingComment) -> dict:
@@ -1,6 +1,42 @@
 from django.contrib import admin
 
-from .models import Image
+from .models import Image, ImageFileTombstone, PendingImageUpload
+
 
 # Register your models here.
-admin.site.register(Image)
+@admin.register(Image)
+class ImageAdmin(admin.ModelAdmin):
+    """
+    Read-only, as images are only created and deleted through their reference
+    counts, by acquiring and releasing them for holders.
+    """
+
+    list_display = ["image_url", "organization", "reference_count", "created_at"]
+    list_filter = ["organization"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PendingImageUpload)
+class PendingImageUploadAdmin(admin.ModelAdmin):
+    list_display = [
+        "content_type",
+        "object_id",
+        "status",
+        "attempts",
+        "next_attempt_at",
+    ]
+    list_filter = ["status"]
+    exclude = ["image_data"]
+
+
+@admin.register(ImageFileTombstone)
+class ImageFileTombstoneAdmin(admin.ModelAdmin):
+    list_display = ["image_id", "attempts", "next_attempt_at", "created_at"]
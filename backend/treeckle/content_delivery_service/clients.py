@@ -0,0 +1,95 @@
+import base64
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.utils.crypto import get_random_string
+
+from imagekitio import ImageKit
+from imagekitio.exceptions.NotFoundException import NotFoundException
+from imagekitio.models.results.ResponseMetadata import ResponseMetadata
+
+IMAGEKIT_PRIVATE_KEY = os.getenv("IMAGEKIT_PRIVATE_KEY")
+IMAGEKIT_PUBLIC_KEY = os.getenv("IMAGEKIT_PUBLIC_KEY")
+IMAGEKIT_BASE_URL = os.getenv("IMAGEKIT_BASE_URL")
+## "imagekit", or "fake" to keep uploaded images on the local filesystem
+IMAGEKIT_CLIENT = os.getenv("IMAGEKIT_CLIENT", "imagekit")
+IMAGEKIT_FAKE_STORAGE_DIR = os.getenv(
+    "IMAGEKIT_FAKE_STORAGE_DIR",
+    os.path.join(tempfile.gettempdir(), "treeckle-fake-imagekit"),
+)
+
+
+class FakeImageKit:
+    """
+    Offline stand-in for the parts of the ImageKit client used by this app.
+
+    Files are written under storage_dir and get URLs under base_url, mirroring
+    the folder and file name layout that ImageKit uses.
+    """
+
+    def __init__(self, storage_dir: str, base_url: str):
+        self.storage_dir = Path(storage_dir)
+        self.base_url = base_url.rstrip("/")
+
+    def get_path(self, file_id: str) -> Path:
+        return self.storage_dir / file_id
+
+    def upload(self, file, file_name: str, options=None):
+        if isinstance(file, str):
+            content = base64.b64decode(file.split(",", 1)[-1])
+        elif isinstance(file, bytes):
+            content = file
+        else:
+            content = file.read()
+
+        folder = getattr(options, "folder", None) or ""
+        file_id = get_random_string(length=24)
+        path = self.get_path(file_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+        url = "/".join(part for part in (self.base_url, folder, file_name) if part)
+
+        return SimpleNamespace(url=url, file_id=file_id, name=file_name)
+
+    def delete_file(self, file_id: str):
+        self.get_path(file_id).unlink(missing_ok=True)
+
+    def bulk_file_delete(self, file_ids: list[str]):
+        ## like ImageKit, deletes nothing if any of the files is missing
+        missing_file_ids = [
+            file_id for file_id in file_ids if not self.get_path(file_id).exists()
+        ]
+
+        if missing_file_ids:
+            raise NotFoundException(
+                message="The requested file(s) does not exist.",
+                response_help="",
+                response_metadata=ResponseMetadata(
+                    {"missingFileIds": missing_file_ids}, 404, {}
+                ),
+            )
+
+        for file_id in file_ids:
+            self.delete_file(file_id)
+
+        return SimpleNamespace(successfully_deleted_file_ids=file_ids)
+
+
+def get_imagekit_client():
+    if IMAGEKIT_CLIENT == "fake":
+        return FakeImageKit(
+            storage_dir=IMAGEKIT_FAKE_STORAGE_DIR,
+            base_url=IMAGEKIT_BASE_URL or "http://localhost/fake-imagekit",
+        )
+
+    return ImageKit(
+        private_key=IMAGEKIT_PRIVATE_KEY,
+        public_key=IMAGEKIT_PUBLIC_KEY,
+        url_endpoint=IMAGEKIT_BASE_URL,
+    )
+
+
+imagekit = get_imagekit_client()
@@ -1,43 +1,116 @@
-import os
+import hashlib
 from typing import Optional
 
-from django.utils.crypto import get_random_string
+from django.db import IntegrityError, transaction
+from django.db.models import F
 
-from imagekitio import ImageKit
-
-IMAGEKIT_PRIVATE_KEY = os.getenv("IMAGEKIT_PRIVATE_KEY")
-IMAGEKIT_PUBLIC_KEY = os.getenv("IMAGEKIT_PUBLIC_KEY")
-IMAGEKIT_BASE_URL = os.getenv("IMAGEKIT_BASE_URL")
-
-imagekit = ImageKit(
-    private_key=IMAGEKIT_PRIVATE_KEY,
-    public_key=IMAGEKIT_PUBLIC_KEY,
-    url_endpoint=IMAGEKIT_BASE_URL,
-)
+from organizations.models import Organization
+from content_delivery_service.models import Image, ImageFileTombstone, ImageHolder
 
 # References:
 # - https://docs.imagekit.io/api-reference/upload-file-api/server-side-file-upload
 # - https://pypi.org/project/imagekitio/
 
 
-## Legacy
-def delete_image(image_id: str):
-    if not image_id:
+def get_images(*args, **kwargs):
+    return Image.objects.filter(*args, **kwargs)
+
+
+def get_content_hash(source: bytes) -> str:
+    """
+    Returns the sha256 hex digest of image bytes.
+    """
+    return hashlib.sha256(source).hexdigest()
+
+
+@transaction.atomic
+def acquire_image(organization: Organization, content_hash: str) -> Optional[Image]:
+    """
+    Adds a reference to the organization's image with content_hash, if any.
+    """
+    image = (
+        get_images(organization=organization, content_hash=content_hash)
+        .select_for_update()
+        .first()
+    )
+
+    if image is None:
+        return None
+
+    get_images(id=image.id).update(reference_count=F("reference_count") + 1)
+    image.reference_count += 1
+
+    return image
+
+
+def create_uploaded_image(
+    organization: Organization, content_hash: str, image_url: str, image_id: str
+) -> Image:
+    """
+    Records a newly uploaded file as an image with one reference.
+
+    If the same bytes were uploaded concurrently, the other image is reused
+    and the file just uploaded is deleted.
+    """
+    try:
+        with transaction.atomic():
+            return Image.objects.create(
+                organization=organization,
+                content_hash=content_hash,
+                image_url=image_url,
+                image_id=image_id,
+            )
+    except IntegrityError:
+        image = acquire_image(organization=organization, content_hash=content_hash)
+
+        if image is None:
+            raise
+
+        delete_image(image_id)
+
+        return image
+
+
+@transaction.atomic
+def release_image(image: Image):
+    """
+    Removes a reference to image, deleting it when no references are left.
+    """
+    image = get_images(id=image.id).select_for_update().first()
+
+    if image is None:
         return
 
-    imagekit.delete_file(image_id)
+    if image.reference_count > 1:
+        get_images(id=image.id).update(reference_count=F("reference_count") - 1)
+    else:
+        image.delete()
+
+
+@transaction.atomic
+def replace_image(holder: ImageHolder, image: Optional[Image]):
+    """
+    Points holder at image, which must already carry a reference for holder,
+    and releases the image it held before.
+    """
+    ## reload the locked holder, in case its image was swapped since it was read
+    type(holder).objects.select_for_update().filter(pk=holder.pk).exists()
+    holder.refresh_from_db()
+    previous_image = holder.get_image()
 
+    holder.set_image(image)
 
-## Legacy
-def upload_image(base64_image: str, filename: Optional[str] = None) -> tuple[str, str]:
-    if not base64_image:
-        return "", ""
+    if previous_image is not None:
+        release_image(previous_image)
 
-    image_name = filename if filename else get_random_string(length=20)
-    _, image_file = base64_image.split(":", 1)
 
-    data = imagekit.upload(file=image_file, file_name=image_name).get("response", {})
-    image_url = data.get("url", "")
-    image_id = data.get("fileId", "")
+def delete_image(image_id: str):
+    """
+    Queues the file for the deleteimagefiles worker once the current transaction
+    commits, so that deletes never wait on ImageKit and rolled back deletes keep
+    their file.
+    """
+    if not image_id:
+        return
 
-    return image_id, image_url
+    transaction.on_commit(lambda: ImageFileTombstone.objects.create(image_id=image_id))
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from imagekitio.exceptions.NotFoundException import NotFoundException
+from imagekitio.exceptions.PartialSuccessException import PartialSuccessException
+
+from treeckle.common.retries import get_retry_delay
+from content_delivery_service.clients import imagekit
+from content_delivery_service.models import ImageFileTombstone
+
+
+def get_image_file_tombstones(*args, **kwargs):
+    return ImageFileTombstone.objects.filter(*args, **kwargs)
+
+
+def claim_image_file_tombstones(batch_size: int) -> list[ImageFileTombstone]:
+    """
+    Leases a batch of due tombstones so that other workers skip them.
+
+    The lease is an advanced next_attempt_at, so files held by a worker that
+    dies are retried once the lease expires.
+    """
+    with transaction.atomic():
+        image_file_tombstones = list(
+            get_image_file_tombstones(next_attempt_at__lte=timezone.now())
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        lease_expiry = timezone.now() + timedelta(
+            seconds=settings.IMAGE_FILE_DELETIONS["LEASE"]
+        )
+
+        for image_file_tombstone in image_file_tombstones:
+            image_file_tombstone.attempts += 1
+            image_file_tombstone.next_attempt_at = lease_expiry
+
+        ImageFileTombstone.objects.bulk_update(
+            image_file_tombstones, fields=["attempts", "next_attempt_at"]
+        )
+
+    return image_file_tombstones
+
+
+def record_image_file_deletion_failure(
+    image_file_tombstones: list[ImageFileTombstone], errors: dict[str, str]
+):
+    """
+    Backs off the tombstones until their next attempt, recording the error of
+    each by its image_id.
+    """
+    ## deletes are retried until they succeed, at most RETRY_BACKOFF_MAX apart
+    now = timezone.now()
+
+    for image_file_tombstone in image_file_tombstones:
+        image_file_tombstone.next_attempt_at = now + get_retry_delay(
+            image_file_tombstone.attempts,
+            base=settings.IMAGE_FILE_DELETIONS["RETRY_BACKOFF_BASE"],
+            maximum=settings.IMAGE_FILE_DELETIONS["RETRY_BACKOFF_MAX"],
+        )
+        image_file_tombstone.last_error = errors[image_file_tombstone.image_id]
+        image_file_tombstone.updated_at = now
+
+    ImageFileTombstone.objects.bulk_update(
+        image_file_tombstones, fields=["next_attempt_at", "last_error", "updated_at"]
+    )
+
+
+def release_image_file_tombstones(image_file_tombstones: list[ImageFileTombstone]):
+    ## ends the lease of tombstones whose files were not attempted
+    get_image_file_tombstones(
+        id__in=[tombstone.id for tombstone in image_file_tombstones]
+    ).update(next_attempt_at=timezone.now())
+
+
+def get_error_response(error: Exception) -> dict:
+    raw = error.response_metadata.raw
+
+    return raw if isinstance(raw, dict) else {}
+
+
+def bulk_delete_image_files(image_ids: list[str]) -> tuple[set[str], dict[str, str]]:
+    """
+    Deletes files from ImageKit with a single bulk delete request.
+
+    Returns the ids of files that are gone, whether deleted now or missing
+    already, and the error of each file that could not be deleted. Files in
+    neither were not deleted, as ImageKit deletes nothing when any file is missing.
+    """
+    try:
+        imagekit.bulk_file_delete(image_ids)
+        return set(image_ids), {}
+    except PartialSuccessException as e:
+        response = get_error_response(e)
+        deleted_image_ids = set(response.get("successfullyDeletedFileIds", []))
+        errors = {
+            error["fileId"]: error.get("error", "")
+            for error in response.get("errors", [])
+        }
+    except NotFoundException as e:
+        deleted_image_ids = set(get_error_response(e).get("missingFileIds", []))
+        errors = {}
+
+    ## without knowing which files are gone, the batch is backed off as a whole
+    if not deleted_image_ids and not errors:
+        raise
+
+    return deleted_image_ids, errors
+
+
+def delete_image_files(batch_size: int) -> tuple[int, int]:
+    """
+    Deletes one batch of tombstoned files from ImageKit with a single bulk
+    delete request, then removes the tombstones of files that are gone.
+
+    Files that failed to be deleted are retried with backoff, and files that
+    were not attempted are released to be retried right away.
+
+    Returns the number of tombstones claimed and the number removed.
+    """
+    image_file_tombstones = claim_image_file_tombstones(batch_size)
+
+    if not image_file_tombstones:
+        return 0, 0
+
+    image_ids = list({tombstone.image_id for tombstone in image_file_tombstones})
+
+    try:
+        deleted_image_ids, errors = bulk_delete_image_files(image_ids)
+    except Exception as e:
+        record_image_file_deletion_failure(
+            image_file_tombstones, {image_id: repr(e) for image_id in image_ids}
+        )
+        return len(image_file_tombstones), 0
+
+    record_image_file_deletion_failure(
+        [
+            tombstone
+            for tombstone in image_file_tombstones
+            if tombstone.image_id in errors
+        ],
+        errors,
+    )
+    release_image_file_tombstones(
+        [
+            tombstone
+            for tombstone in image_file_tombstones
+            if tombstone.image_id not in deleted_image_ids
+            and tombstone.image_id not in errors
+        ]
+    )
+
+    num_deleted, _ = get_image_file_tombstones(
+        id__in=[
+            tombstone.id
+            for tombstone in image_file_tombstones
+            if tombstone.image_id in deleted_image_ids
+        ]
+    ).delete()
+
+    return len(image_file_tombstones), num_deleted
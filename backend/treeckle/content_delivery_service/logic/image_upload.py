@@ -0,0 +1,269 @@
+import base64
+import binascii
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
+
+from treeckle.common.exceptions import BadRequest
+from treeckle.common.retries import get_retry_delay
+from content_delivery_service.clients import imagekit
+from organizations.models import Organization
+from content_delivery_service.logic.image import (
+    acquire_image,
+    create_uploaded_image,
+    get_content_hash,
+    release_image,
+    replace_image,
+)
+from content_delivery_service.models import (
+    Image,
+    ImageHolder,
+    ImageUploadStatus,
+    PendingImageUpload,
+)
+from content_delivery_service.processing import image_processing_service
+
+
+def get_pending_image_uploads(*args, **kwargs):
+    return PendingImageUpload.objects.filter(*args, **kwargs)
+
+
+def get_target_pending_image_uploads(target: ImageHolder):
+    return get_pending_image_uploads(
+        content_type=ContentType.objects.get_for_model(target),
+        object_id=target.pk,
+    )
+
+
+def cancel_image_uploads(target: ImageHolder):
+    ## an upload finishing after this finds its row gone and discards the file
+    get_target_pending_image_uploads(target).delete()
+
+
+def stage_image_upload(
+    target: ImageHolder,
+    image_data: str = "",
+    image_content: Optional[bytes] = None,
+    folder: str = "",
+    file_name: Optional[str] = None,
+) -> PendingImageUpload:
+    """
+    Queues a base64 image, or the bytes of an image, to be uploaded and swapped
+    into the target ImageHolder by the uploadpendingimages worker.
+
+    Any earlier upload for the same target is cancelled, so the latest image wins.
+    The row is written with the caller's transaction.
+    """
+    cancel_image_uploads(target)
+
+    return PendingImageUpload.objects.create(
+        target=target,
+        image_data=image_data,
+        image_content=image_content,
+        folder=folder,
+        file_name=file_name or get_random_string(length=20),
+    )
+
+
+def stage_image_file_upload(
+    target: ImageHolder,
+    image_file: UploadedFile,
+    folder: str = "",
+    file_name: Optional[str] = None,
+) -> PendingImageUpload:
+    """
+    Queues an uploaded image file like stage_image_upload. The file has been
+    validated and size limited while it was received, so it is read whole.
+    """
+    image_file.seek(0)
+
+    return stage_image_upload(
+        target=target,
+        image_content=image_file.read(),
+        folder=folder,
+        file_name=file_name,
+    )
+
+
+def get_pending_image_content(pending_image_upload: PendingImageUpload) -> bytes:
+    if pending_image_upload.image_content is not None:
+        return bytes(pending_image_upload.image_content)
+
+    return base64.b64decode(pending_image_upload.image_data.split(",", 1)[-1])
+
+
+def claim_pending_image_uploads(batch_size: int) -> list[PendingImageUpload]:
+    """
+    Leases a batch of due uploads so that other workers skip them.
+
+    The lease is an advanced next_attempt_at, so uploads held by a worker that
+    dies are retried once the lease expires.
+    """
+    with transaction.atomic():
+        pending_image_uploads = list(
+            get_pending_image_uploads(
+                status=ImageUploadStatus.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        lease_expiry = timezone.now() + timedelta(
+            seconds=settings.IMAGE_UPLOADS["LEASE"]
+        )
+
+        for pending_image_upload in pending_image_uploads:
+            pending_image_upload.attempts += 1
+            pending_image_upload.next_attempt_at = lease_expiry
+
+        PendingImageUpload.objects.bulk_update(
+            pending_image_uploads, fields=["attempts", "next_attempt_at"]
+        )
+
+    return pending_image_uploads
+
+
+def record_image_upload_failure(
+    pending_image_upload: PendingImageUpload,
+    error: Exception,
+    is_retryable: bool = True,
+):
+    if (
+        not is_retryable
+        or pending_image_upload.attempts >= settings.IMAGE_UPLOADS["MAX_ATTEMPTS"]
+    ):
+        update = {"status": ImageUploadStatus.FAILED}
+    else:
+        update = {
+            "next_attempt_at": timezone.now()
+            + get_retry_delay(
+                pending_image_upload.attempts,
+                base=settings.IMAGE_UPLOADS["RETRY_BACKOFF_BASE"],
+                maximum=settings.IMAGE_UPLOADS["RETRY_BACKOFF_MAX"],
+            )
+        }
+
+    get_pending_image_uploads(id=pending_image_upload.id).update(
+        last_error=repr(error), updated_at=timezone.now(), **update
+    )
+
+
+def lock_target(
+    target_model: type[ImageHolder], target_id: int
+) -> Optional[ImageHolder]:
+    return target_model.objects.select_for_update().filter(pk=target_id).first()
+
+
+@transaction.atomic
+def complete_image_upload(
+    pending_image_upload: PendingImageUpload, image: Image
+) -> bool:
+    """
+    Swaps the uploaded image into the target and removes the staging row.
+
+    Returns False, after releasing the uploaded image, if the upload was cancelled
+    or its target deleted while the file was being uploaded.
+    """
+    is_staged = (
+        get_pending_image_uploads(id=pending_image_upload.id)
+        .select_for_update()
+        .exists()
+    )
+    target = (
+        lock_target(
+            pending_image_upload.content_type.model_class(),
+            pending_image_upload.object_id,
+        )
+        if is_staged
+        else None
+    )
+
+    if target is None:
+        release_image(image)
+        get_pending_image_uploads(id=pending_image_upload.id).delete()
+        return False
+
+    replace_image(target, image)
+    pending_image_upload.delete()
+
+    return True
+
+
+def upload_image_content(
+    organization: Organization,
+    source: bytes,
+    folder: str = "",
+    file_name: Optional[str] = None,
+) -> Image:
+    """
+    Returns a new reference to an image with the given bytes, uploading them to
+    ImageKit only if the organization does not have such an image yet.
+    """
+    content_hash = get_content_hash(source)
+    image = acquire_image(organization=organization, content_hash=content_hash)
+
+    if image is not None:
+        return image
+
+    file_name = file_name or get_random_string(length=20)
+    options = UploadFileRequestOptions(folder=folder)
+
+    if settings.IMAGE_PROCESSING["ENABLED"]:
+        file, file_name = image_processing_service.process_for_upload(source, file_name)
+        data = imagekit.upload(file=file, file_name=file_name, options=options)
+    else:
+        data = imagekit.upload(file=source, file_name=file_name, options=options)
+
+    return create_uploaded_image(
+        organization=organization,
+        content_hash=content_hash,
+        image_url=data.url,
+        image_id=data.file_id,
+    )
+
+
+def upload_pending_images(batch_size: int) -> tuple[int, int]:
+    """
+    Uploads one batch of staged images. The uploads run outside any transaction,
+    so no row is locked while waiting on ImageKit.
+
+    Returns the number of uploads claimed and the number swapped in.
+    """
+    pending_image_uploads = claim_pending_image_uploads(batch_size)
+    num_completed = 0
+
+    for pending_image_upload in pending_image_uploads:
+        target = pending_image_upload.target
+
+        if target is None:
+            pending_image_upload.delete()
+            continue
+
+        try:
+            image = upload_image_content(
+                organization=target.get_image_organization(),
+                source=get_pending_image_content(pending_image_upload),
+                folder=pending_image_upload.folder,
+                file_name=pending_image_upload.file_name,
+            )
+        except (BadRequest, binascii.Error) as e:
+            ## the data is not a readable image, which no retry can change
+            record_image_upload_failure(pending_image_upload, e, is_retryable=False)
+            continue
+        except Exception as e:
+            record_image_upload_failure(pending_image_upload, e)
+            continue
+
+        if complete_image_upload(pending_image_upload, image):
+            num_completed += 1
+
+    return len(pending_image_uploads), num_completed
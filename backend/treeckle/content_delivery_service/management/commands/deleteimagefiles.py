@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content_delivery_service.logic.image_deletion import delete_image_files
+
+
+class Command(BaseCommand):
+    help = "Deletes tombstoned image files from ImageKit in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.IMAGE_FILE_DELETIONS["BATCH_SIZE"],
+            help="Maximum number of files deleted per bulk delete request",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=int,
+            default=settings.IMAGE_FILE_DELETIONS["POLL_INTERVAL"],
+            help="Seconds to wait when no deletions are due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no deletions are due instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                num_claimed, num_deleted = delete_image_files(
+                    batch_size=options["batch_size"]
+                )
+
+                if num_claimed:
+                    self.stdout.write(f"Deleted {num_deleted}/{num_claimed} files")
+                    continue
+
+                if options["once"]:
+                    return
+
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content_delivery_service.logic.image_upload import upload_pending_images
+
+
+class Command(BaseCommand):
+    help = "Uploads staged images to ImageKit and swaps in their CDN URLs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.IMAGE_UPLOADS["BATCH_SIZE"],
+            help="Maximum number of images uploaded per batch",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=int,
+            default=settings.IMAGE_UPLOADS["POLL_INTERVAL"],
+            help="Seconds to wait when no uploads are due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no uploads are due instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                num_claimed, num_completed = upload_pending_images(
+                    batch_size=options["batch_size"]
+                )
+
+                if num_claimed:
+                    self.stdout.write(f"Uploaded {num_completed}/{num_claimed} images")
+                    continue
+
+                if options["once"]:
+                    return
+
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content_delivery_service", "0005_image_file_tombstone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingimageupload",
+            name="image_content",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="pendingimageupload",
+            name="image_data",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -1,75 +1,155 @@
-import os
+from abc import ABCMeta, abstractmethod
 from typing import Optional
 
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.base import ModelBase
 from django.db.models.signals import post_delete
-from django.utils.crypto import get_random_string
+from django.utils import timezone
 
-from imagekitio import ImageKit
-from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
-
-from treeckle.common.validators import is_url
 from treeckle.common.models import TimestampedModel
 from organizations.models import Organization
 
-IMAGEKIT_PRIVATE_KEY = os.getenv("IMAGEKIT_PRIVATE_KEY")
-IMAGEKIT_PUBLIC_KEY = os.getenv("IMAGEKIT_PUBLIC_KEY")
-IMAGEKIT_BASE_URL = os.getenv("IMAGEKIT_BASE_URL")
-
-imagekit = ImageKit(
-    private_key=IMAGEKIT_PRIVATE_KEY,
-    public_key=IMAGEKIT_PUBLIC_KEY,
-    url_endpoint=IMAGEKIT_BASE_URL,
-)
-
 
 # Create your models here.
 class Image(TimestampedModel):
+    """
+    Image shared by every holder with the same uploaded bytes in an organization.
+
+    reference_count is the number of holders of the image. The image and its
+    file on ImageKit are deleted when the last holder releases it.
+    """
+
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     image_url = models.URLField(max_length=500)
     image_id = models.CharField(max_length=255, blank=True)
+    ## sha256 hex digest of the uploaded bytes, blank for external urls
+    content_hash = models.CharField(max_length=64, blank=True)
+    reference_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "content_hash"],
+                condition=~models.Q(content_hash=""),
+                name="image_organization_content_hash",
+            )
+        ]
 
     def __str__(self):
         return self.image_url
 
-    def copy(self):
-        return self.__class__(
-            organization=self.organization,
-            image_url=self.image_url,
-            image_id=self.image_id,
-        )
 
-    def delete_image_from_server(self):
-        ## image does not exist on server
-        if not self.image_id:
-            return
+class ImageHolderBase(ABCMeta, ModelBase):
+    pass
+
+
+class ImageHolder(models.Model, metaclass=ImageHolderBase):
+    """
+    Model holding an Image, which can be swapped by image uploads.
+    """
+
+    class Meta:
+        abstract = True
+
+    @abstractmethod
+    def get_image_organization(self) -> Organization:
+        pass
+
+    @abstractmethod
+    def get_image(self) -> Optional[Image]:
+        pass
+
+    @abstractmethod
+    def set_image(self, image: Optional[Image]):
+        """
+        Points the holder at image and saves it, without touching reference counts.
+        """
+
+
+class ImageUploadStatus(models.TextChoices):
+    PENDING = "PENDING"
+    FAILED = "FAILED"
+
+
+class PendingImageUpload(TimestampedModel):
+    """
+    Image waiting to be uploaded to ImageKit by the uploadpendingimages worker.
+
+    The target is an ImageHolder. Its current image is kept until the upload
+    completes, and is then released.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey("content_type", "object_id")
+    ## base64 data URI as sent by the client, or the bytes of an uploaded file
+    image_data = models.TextField(blank=True)
+    image_content = models.BinaryField(null=True, blank=True)
+    folder = models.CharField(max_length=255, blank=True)
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=50,
+        choices=ImageUploadStatus.choices,
+        default=ImageUploadStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status=ImageUploadStatus.PENDING),
+                name="pending_image_upload_due_idx",
+            ),
+            models.Index(
+                fields=["content_type", "object_id"],
+                name="pending_image_target_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id} - {self.status}"
 
-        imagekit.delete_file(self.image_id)
 
-    def upload_image_to_server(self, filename: Optional[str] = None):
-        if not self.image_url or is_url(self.image_url):
-            return
+class ImageFileTombstone(TimestampedModel):
+    """
+    File on ImageKit that is no longer referred to, waiting to be deleted in a
+    batch by the deleteimagefiles worker.
+    """
 
-        image_name = filename if filename else get_random_string(length=20)
-        _, image_file = self.image_url.split(":", 1)
+    image_id = models.CharField(max_length=255)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
 
-        data = imagekit.upload(
-            file=image_file,
-            file_name=image_name,
-            options=UploadFileRequestOptions(
-                folder=self.organization.name,
-            ),
-        )
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"], name="image_file_tombstone_due_idx"
+            )
+        ]
 
-        self.image_url = data.url
-        self.image_id = data.file_id
+    def __str__(self):
+        return self.image_id
 
 
 def image_cleanup(sender, instance: Image, **kwargs):
-    instance.delete_image_from_server()
+    ## keep the file while another image still refers to it
+    if instance.image_id and Image.objects.filter(image_id=instance.image_id).exists():
+        return
+
+    ## lazy import to prevent circular import
+    from .logic.image import delete_image
+
+    delete_image(instance.image_id)
 
 
-## set up listener to delete image from server when an image object is deleted
+## set up listener to delete image from server when an image object is deleted,
+## once the deletion is committed
 post_delete.connect(
     image_cleanup,
     sender=Image,
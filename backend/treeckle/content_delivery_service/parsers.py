@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    TemporaryFileUploadHandler,
+    UploadFileException,
+)
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+
+class UploadedFileTooLarge(UploadFileException):
+    def __init__(self, field_name: str, max_file_size: int):
+        super().__init__(field_name, max_file_size)
+        self.field_name = field_name
+        self.max_file_size = max_file_size
+
+
+class SizeLimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded files to temporary files, and stops reading a file as soon
+    as it grows past max_file_size.
+    """
+
+    def __init__(self, request=None, max_file_size: int = None):
+        super().__init__(request)
+        self.max_file_size = max_file_size
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_file_size:
+            self.file.close()
+            raise UploadedFileTooLarge(self.field_name, self.max_file_size)
+
+        return super().receive_data_chunk(raw_data, start)
+
+
+class TemporaryFileMultiPartParser(MultiPartParser):
+    """
+    Multipart parser that streams every uploaded file to a temporary file,
+    however small, so that uploads are never held in memory while they are read.
+
+    A file larger than IMAGE_UPLOADS["MAX_FILE_SIZE"] is rejected while it is
+    being read, before the rest of it is received.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context["request"]
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta["CONTENT_TYPE"] = media_type
+        upload_handlers = [
+            SizeLimitedTemporaryFileUploadHandler(
+                request, max_file_size=settings.IMAGE_UPLOADS["MAX_FILE_SIZE"]
+            )
+        ]
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, upload_handlers, encoding)
+            data, files = parser.parse()
+            return DataAndFiles(data, files)
+        except MultiPartParserError as e:
+            raise ParseError(f"Multipart form parse error - {e}")
+        except UploadedFileTooLarge as e:
+            raise ValidationError(
+                {e.field_name: [f"File cannot be larger than {e.max_file_size} bytes."]}
+            )
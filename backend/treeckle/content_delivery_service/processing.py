@@ -0,0 +1,149 @@
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+
+from treeckle.common.exceptions import BadRequest, ServiceUnavailable
+
+## file extensions of the formats images can be re-encoded to
+IMAGE_FORMAT_EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def process_image(
+    source: bytes,
+    max_width: int,
+    max_height: int,
+    image_format: str,
+    quality: int,
+) -> bytes:
+    """
+    Decodes an image from bytes, shrinks it to fit within
+    max_width x max_height and re-encodes it in image_format.
+
+    EXIF, ICC and other metadata are not carried over, after the EXIF
+    orientation has been applied to the pixels.
+    """
+    with PILImage.open(io.BytesIO(source)) as image:
+        ## lets JPEG decoding skip detail that is thrown away anyway
+        largest_dimension = max(max_width, max_height)
+        image.draft(image.mode, (largest_dimension, largest_dimension))
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_width, max_height))
+
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        output = io.BytesIO()
+        image.save(output, format=image_format, quality=quality)
+
+        return output.getvalue()
+
+
+class ImageProcessingService:
+    """
+    Downscales and re-encodes images on a bounded pool of worker processes,
+    so that decoding and encoding run outside the request thread and the GIL.
+
+    Callers wait for their result. Once max_pending images are queued or being
+    processed, new calls wait up to timeout seconds for a slot and are then
+    rejected with a 503.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        timeout: float,
+        max_width: int,
+        max_height: int,
+        image_format: str,
+        quality: int,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_width = max_width
+        self.max_height = max_height
+        self.image_format = image_format
+        self.quality = quality
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_FORMAT_EXTENSIONS[self.image_format]
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        ## created lazily so that the pool is started after the server forks
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+            return self.executor
+
+    def reset_executor(self, executor: ProcessPoolExecutor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+
+        executor.shutdown(wait=False)
+
+    def process(self, source: bytes) -> bytes:
+        """
+        Processes image bytes. Raises BadRequest if the data is not a readable image.
+        """
+        if not self.pending.acquire(timeout=self.timeout):
+            raise ServiceUnavailable(
+                detail="Too many images are being processed, please try again.",
+                code="image_processing_busy",
+            )
+
+        try:
+            executor = self.get_executor()
+
+            try:
+                return executor.submit(
+                    process_image,
+                    source,
+                    self.max_width,
+                    self.max_height,
+                    self.image_format,
+                    self.quality,
+                ).result()
+            except BrokenProcessPool:
+                ## a worker process died, e.g. when out of memory
+                self.reset_executor(executor)
+                raise ServiceUnavailable(
+                    detail="Image could not be processed, please try again.",
+                    code="image_processing_failed",
+                )
+            except (UnidentifiedImageError, PILImage.DecompressionBombError, OSError):
+                raise BadRequest(
+                    detail="Uploaded file is not a valid image.", code="invalid_image"
+                )
+        finally:
+            self.pending.release()
+
+    def process_for_upload(self, source: bytes, file_name: str) -> tuple[bytes, str]:
+        """
+        Returns the processed image and file_name with the extension of its format.
+        """
+        return self.process(source), f"{file_name}.{self.extension}"
+
+
+image_processing_service = ImageProcessingService(
+    max_workers=settings.IMAGE_PROCESSING["MAX_WORKERS"],
+    max_pending=settings.IMAGE_PROCESSING["MAX_PENDING"],
+    timeout=settings.IMAGE_PROCESSING["TIMEOUT"],
+    max_width=settings.IMAGE_PROCESSING["MAX_WIDTH"],
+    max_height=settings.IMAGE_PROCESSING["MAX_HEIGHT"],
+    image_format=settings.IMAGE_PROCESSING["FORMAT"],
+    quality=settings.IMAGE_PROCESSING["QUALITY"],
+)
@@ -1 +1,441 @@
+import base64
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from imagekitio.exceptions.PartialSuccessException import PartialSuccessException
+from imagekitio.models.results.ResponseMetadata import ResponseMetadata
+from PIL import Image as PILImage
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from treeckle.common.exceptions import BadRequest
+from treeckle.common.testing import benchmark
+from organizations.models import Organization
+from users.models import User
+from users.views import RequesterProfileImageView, RequesterView
+from authentication.logic import get_tokens
+from .clients import FakeImageKit
+from .logic.image_deletion import delete_image_files
+from .logic.image_upload import (
+    cancel_image_uploads,
+    claim_pending_image_uploads,
+    complete_image_upload,
+    stage_image_upload,
+    upload_image_content,
+    upload_pending_images,
+)
+from .models import Image, ImageFileTombstone, ImageUploadStatus, PendingImageUpload
+from .processing import ImageProcessingService, process_image
+
+
+def make_image_content(
+    width: int = 64, height: int = 48, image=None, **save_kwargs
+) -> bytes:
+    image = image or PILImage.new("RGB", (width, height), color=(200, 30, 30))
+    output = io.BytesIO()
+    image.save(output, format=save_kwargs.pop("format", "PNG"), **save_kwargs)
+
+    return output.getvalue()
+
+
+def make_noise_image_content(num_bytes: int) -> bytes:
+    ## uncompressed noise, so the file is about num_bytes
+    side = int((num_bytes / 3) ** 0.5)
+
+    return make_image_content(
+        image=PILImage.frombytes("RGB", (side, side), os.urandom(side * side * 3)),
+        format="BMP",
+    )
+
+
 # Create your tests here.
+class FakeImageKitTestCase(TestCase):
+    """
+    Replaces the ImageKit client with FakeImageKit storing files in a temporary
+    directory.
+    """
+
+    def setUp(self):
+        storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_dir.cleanup)
+        self.imagekit = FakeImageKit(
+            storage_dir=storage_dir.name, base_url="http://imagekit.test"
+        )
+
+        for module in ["image_upload", "image_deletion"]:
+            imagekit_patch = patch(
+                f"content_delivery_service.logic.{module}.imagekit", self.imagekit
+            )
+            imagekit_patch.start()
+            self.addCleanup(imagekit_patch.stop)
+
+        self.organization = Organization.objects.create(name="Organization")
+        self.user = User.objects.create(
+            organization=self.organization, name="User", email="user@example.com"
+        )
+
+    def get_stored_file_ids(self) -> set[str]:
+        return {path.name for path in self.imagekit.storage_dir.iterdir()}
+
+
+@override_settings(IMAGE_PROCESSING={**settings.IMAGE_PROCESSING, "ENABLED": False})
+class ImageUploadTestCase(FakeImageKitTestCase):
+    def test_staged_image_is_uploaded_and_swapped_in_by_the_worker(self):
+        content = make_image_content()
+
+        stage_image_upload(self.user, image_content=content, folder="profile")
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.profile_image)
+        self.assertEqual(self.get_stored_file_ids(), set())
+
+        self.assertEqual(upload_pending_images(batch_size=10), (1, 1))
+
+        self.user.refresh_from_db()
+        image = self.user.profile_image
+        self.assertTrue(image.image_url.startswith("http://imagekit.test/profile/"))
+        self.assertEqual(self.imagekit.get_path(image.image_id).read_bytes(), content)
+        self.assertFalse(PendingImageUpload.objects.exists())
+
+    def test_later_upload_cancels_the_earlier_one(self):
+        stage_image_upload(self.user, image_content=make_image_content(width=10))
+        stage_image_upload(self.user, image_content=make_image_content(width=20))
+
+        self.assertEqual(upload_pending_images(batch_size=10), (1, 1))
+
+        self.user.refresh_from_db()
+        stored_content = self.imagekit.get_path(
+            self.user.profile_image.image_id
+        ).read_bytes()
+        self.assertEqual(stored_content, make_image_content(width=20))
+
+    def test_upload_cancelled_while_in_flight_is_discarded(self):
+        stage_image_upload(self.user, image_content=make_image_content())
+        [pending_image_upload] = claim_pending_image_uploads(batch_size=10)
+        image = upload_image_content(
+            organization=self.organization,
+            source=make_image_content(),
+            file_name=pending_image_upload.file_name,
+        )
+
+        cancel_image_uploads(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(complete_image_upload(pending_image_upload, image))
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.profile_image)
+        self.assertFalse(Image.objects.exists())
+        self.assertEqual(
+            list(ImageFileTombstone.objects.values_list("image_id", flat=True)),
+            [image.image_id],
+        )
+
+    def test_unreadable_image_data_fails_without_retrying(self):
+        stage_image_upload(self.user, image_data="data:image/png;base64,not base64!")
+
+        self.assertEqual(upload_pending_images(batch_size=10), (1, 0))
+
+        pending_image_upload = PendingImageUpload.objects.get()
+        self.assertEqual(pending_image_upload.status, ImageUploadStatus.FAILED)
+        self.assertEqual(pending_image_upload.attempts, 1)
+
+    @override_settings(IMAGE_PROCESSING={**settings.IMAGE_PROCESSING, "ENABLED": True})
+    def test_undecodable_image_fails_without_retrying(self):
+        stage_image_upload(self.user, image_content=b"GIF89a but not really")
+
+        with patch(
+            "content_delivery_service.logic.image_upload.image_processing_service",
+            ImageProcessingService(
+                max_workers=1,
+                max_pending=1,
+                timeout=10,
+                max_width=100,
+                max_height=100,
+                image_format="WEBP",
+                quality=80,
+            ),
+        ):
+            self.assertEqual(upload_pending_images(batch_size=10), (1, 0))
+
+        pending_image_upload = PendingImageUpload.objects.get()
+        self.assertEqual(pending_image_upload.status, ImageUploadStatus.FAILED)
+        self.assertEqual(self.get_stored_file_ids(), set())
+
+
+class ImageFileDeletionTestCase(FakeImageKitTestCase):
+    def store_files(self, count: int) -> list[str]:
+        return [
+            self.imagekit.upload(make_image_content(), file_name="image").file_id
+            for _ in range(count)
+        ]
+
+    def create_tombstones(self, image_ids: list[str]):
+        ImageFileTombstone.objects.bulk_create(
+            ImageFileTombstone(image_id=image_id) for image_id in image_ids
+        )
+
+    def get_tombstones(self) -> dict[str, ImageFileTombstone]:
+        return {
+            tombstone.image_id: tombstone
+            for tombstone in ImageFileTombstone.objects.all()
+        }
+
+    def test_deleted_files_lose_their_tombstones(self):
+        image_ids = self.store_files(3)
+        self.create_tombstones(image_ids)
+
+        self.assertEqual(delete_image_files(batch_size=10), (3, 3))
+
+        self.assertEqual(self.get_stored_file_ids(), set())
+        self.assertFalse(ImageFileTombstone.objects.exists())
+
+    def test_missing_file_releases_the_rest_of_the_batch(self):
+        image_ids = self.store_files(2)
+        self.create_tombstones([*image_ids, "missing"])
+
+        ## ImageKit deletes nothing when a file in the batch is missing
+        self.assertEqual(delete_image_files(batch_size=10), (3, 1))
+
+        tombstones = self.get_tombstones()
+        self.assertEqual(set(tombstones), set(image_ids))
+        self.assertEqual(self.get_stored_file_ids(), set(image_ids))
+
+        for tombstone in tombstones.values():
+            self.assertLessEqual(tombstone.next_attempt_at, timezone.now())
+
+        self.assertEqual(delete_image_files(batch_size=10), (2, 2))
+
+        self.assertEqual(self.get_stored_file_ids(), set())
+        self.assertFalse(ImageFileTombstone.objects.exists())
+
+    def test_files_that_failed_to_be_deleted_are_backed_off(self):
+        image_ids = self.store_files(3)
+        self.create_tombstones(image_ids)
+        error = PartialSuccessException(
+            message="File(s) not deleted.",
+            response_help="",
+            response_metadata=ResponseMetadata(
+                {
+                    "successfullyDeletedFileIds": image_ids[:2],
+                    "errors": [{"fileId": image_ids[2], "error": "Internal error"}],
+                },
+                207,
+                {},
+            ),
+        )
+
+        with patch.object(self.imagekit, "bulk_file_delete", side_effect=error):
+            self.assertEqual(delete_image_files(batch_size=10), (3, 2))
+
+        [tombstone] = self.get_tombstones().values()
+        self.assertEqual(tombstone.image_id, image_ids[2])
+        self.assertEqual(tombstone.last_error, "Internal error")
+        self.assertGreater(tombstone.next_attempt_at, timezone.now())
+
+    def test_failed_request_backs_off_the_whole_batch(self):
+        image_ids = self.store_files(2)
+        self.create_tombstones(image_ids)
+
+        with patch.object(
+            self.imagekit, "bulk_file_delete", side_effect=ConnectionError("timeout")
+        ):
+            self.assertEqual(delete_image_files(batch_size=10), (2, 0))
+
+        tombstones = self.get_tombstones()
+        self.assertEqual(set(tombstones), set(image_ids))
+
+        for tombstone in tombstones.values():
+            self.assertEqual(tombstone.attempts, 1)
+            self.assertIn("timeout", tombstone.last_error)
+            self.assertGreater(tombstone.next_attempt_at, timezone.now())
+
+        self.assertEqual(delete_image_files(batch_size=10), (0, 0))
+
+
+class ImageFileUploadViewTestCase(FakeImageKitTestCase):
+    url = "/api/users/self/profileimage"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_tokens(self.user)['access']}"
+        )
+
+    def put_image(self, content: bytes, name: str = "blob"):
+        return self.client.put(
+            self.url,
+            {"image": SimpleUploadedFile(name, content)},
+            format="multipart",
+        )
+
+    def test_image_file_is_staged(self):
+        content = make_image_content()
+
+        response = self.put_image(content)
+
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(bytes(PendingImageUpload.objects.get().image_content), content)
+
+    @override_settings(IMAGE_UPLOADS={**settings.IMAGE_UPLOADS, "MAX_FILE_SIZE": 1024})
+    def test_oversized_file_is_rejected(self):
+        response = self.put_image(
+            make_image_content(width=200, height=200, format="BMP")
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["image"], ["File cannot be larger than 1024 bytes."]
+        )
+        self.assertFalse(PendingImageUpload.objects.exists())
+
+    def test_non_image_file_is_rejected(self):
+        response = self.put_image(b"%PDF-1.4 not an image", name="image.png")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("image", response.data)
+        self.assertFalse(PendingImageUpload.objects.exists())
+
+    @benchmark
+    def test_benchmark_memory_for_10mb_images(self):
+        content = make_noise_image_content(10 * 1024 * 1024)
+        factory = APIRequestFactory()
+        token_user = TokenUser(AccessToken(get_tokens(self.user)["access"]))
+
+        multipart_request = factory.put(
+            self.url, {"image": SimpleUploadedFile("blob", content)}, format="multipart"
+        )
+        base64_request = factory.patch(
+            "/api/users/self",
+            {
+                "action": "PROFILE_IMAGE",
+                "payload": {
+                    "profileImage": "data:image/bmp;base64,"
+                    + base64.b64encode(content).decode()
+                },
+            },
+            format="json",
+        )
+
+        peaks = {}
+
+        for name, view, request in [
+            ("multipart", RequesterProfileImageView.as_view(), multipart_request),
+            ("base64 JSON", RequesterView.as_view(), base64_request),
+        ]:
+            force_authenticate(request, user=token_user)
+            tracemalloc.start()
+            response = view(request)
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            self.assertLess(response.status_code, 300, response.data)
+
+        print(
+            f"\npeak memory for a {len(content) / 2**20:.1f}MB image: "
+            + ", ".join(f"{name} {peak / 2**20:.1f}MB" for name, peak in peaks.items())
+        )
+
+
+class ImageProcessingTestCase(SimpleTestCase):
+    def process(self, source: bytes, image_format: str = "WEBP") -> PILImage.Image:
+        return PILImage.open(
+            io.BytesIO(
+                process_image(
+                    source,
+                    max_width=400,
+                    max_height=300,
+                    image_format=image_format,
+                    quality=80,
+                )
+            )
+        )
+
+    def test_large_image_is_downscaled_to_fit(self):
+        image = self.process(make_image_content(width=2000, height=1000))
+
+        self.assertEqual(image.format, "WEBP")
+        self.assertEqual(image.size, (400, 200))
+
+    def test_small_image_is_not_upscaled(self):
+        image = self.process(make_image_content(width=40, height=40), "JPEG")
+
+        self.assertEqual(image.format, "JPEG")
+        self.assertEqual(image.size, (40, 40))
+
+    def test_metadata_is_stripped_after_applying_orientation(self):
+        exif = PILImage.Exif()
+        ## rotated 90 degrees clockwise, and a camera model
+        exif[0x0112] = 6
+        exif[0x0110] = "Phone Camera"
+        source = make_image_content(width=600, height=300, format="JPEG", exif=exif)
+
+        for image_format in ["WEBP", "JPEG"]:
+            image = self.process(source, image_format)
+
+            self.assertEqual(image.size, (150, 300))
+            self.assertEqual(dict(image.getexif()), {})
+            self.assertNotIn("exif", image.info)
+            self.assertNotIn("icc_profile", image.info)
+
+    def test_service_rejects_data_that_is_not_an_image(self):
+        service = ImageProcessingService(
+            max_workers=1,
+            max_pending=1,
+            timeout=10,
+            max_width=400,
+            max_height=300,
+            image_format="WEBP",
+            quality=80,
+        )
+
+        with self.assertRaises(BadRequest):
+            service.process(b"not an image")
+
+    @benchmark
+    def test_benchmark_processing_throughput(self):
+        num_workers = os.cpu_count()
+        ## a phone photo
+        sources = [
+            make_image_content(
+                image=PILImage.frombytes(
+                    "RGB", (4000, 3000), os.urandom(4000 * 3000 * 3)
+                ),
+                format="JPEG",
+                quality=90,
+            )
+        ] * (num_workers * 4)
+        service = ImageProcessingService(
+            max_workers=num_workers,
+            max_pending=len(sources),
+            timeout=60,
+            max_width=settings.IMAGE_PROCESSING["MAX_WIDTH"],
+            max_height=settings.IMAGE_PROCESSING["MAX_HEIGHT"],
+            image_format=settings.IMAGE_PROCESSING["FORMAT"],
+            quality=settings.IMAGE_PROCESSING["QUALITY"],
+        )
+        ## starts the worker processes
+        service.process(sources[0])
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            start = time.perf_counter()
+            results = list(executor.map(service.process, sources))
+            elapsed = time.perf_counter() - start
+
+        print(
+            f"\nprocessing {len(sources)} 12MP photos on {num_workers} processes: "
+            f"{len(sources) / elapsed:.1f} images/s, "
+            f"{sum(map(len, sources)) / 2**20:.0f}MB in, "
+            f"{sum(map(len, results)) / 2**20:.1f}MB out"
+        )
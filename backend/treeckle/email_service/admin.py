@@ -1 +1,17 @@
+from django.contrib import admin
+from django.db import models
+
+from django_json_widget.widgets import JSONEditorWidget
+
+from .models import OutboxEmail
+
+
 # Register your models here.
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    formfield_overrides = {
+        models.JSONField: {"widget": JSONEditorWidget},
+    }
+    list_display = ["subject", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["subject__icontains", "to__icontains", "cc__icontains"]
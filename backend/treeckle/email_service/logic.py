@@ -1,24 +1,41 @@
 import os
+from collections import defaultdict
 from typing import Iterable
 from datetime import timedelta
 
 
+from django.conf import settings
 from django.core.mail import get_connection, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.db import transaction
 
 from treeckle.common.constants import DATE_TIME_FORMAT, SUPPORT_EMAIL
 from venues.logic import get_booking_notification_subscriptions
 from users.models import UserInvite, User
 from bookings.models import Booking, BookingStatus
+from .models import OutboxEmail, OutboxEmailStatus
+from .outbox import email_to_outbox_email, enqueue_emails, enqueue_outbox_emails
+from .rendering import render_email
 
 HOST = os.getenv("HOST")
 
 
+def get_venue_id_to_subscription_emails_mapping(
+    venue_ids: Iterable[int],
+) -> dict[int, list[str]]:
+    venue_id_to_subscription_emails_mapping = defaultdict(list)
+
+    for venue_id, email in get_booking_notification_subscriptions(
+        venue_id__in=set(venue_ids)
+    ).values_list("venue_id", "email"):
+        venue_id_to_subscription_emails_mapping[venue_id].append(email)
+
+    return venue_id_to_subscription_emails_mapping
+
+
 def send_password_reset_email(user: User, new_password: str):
     subject = "Reset your Treeckle password"
-    html_message = render_to_string(
-        "password_reset_email_template.html",
+    plain_message, html_message = render_email(
+        "password_reset_email_template",
         context={
             "name": user.name,
             "email": user.email,
@@ -27,45 +44,86 @@ def send_password_reset_email(user: User, new_password: str):
             "support_email": SUPPORT_EMAIL,
         },
     )
-    plain_message = strip_tags(html_message)
 
     email = EmailMultiAlternatives(subject=subject, body=plain_message, to=[user.email])
     email.attach_alternative(html_message, "text/html")
 
+    ## sent directly instead of through the outbox, so that the new password is
+    ## never stored in the database
     connection = get_connection(fail_silently=True)
     connection.send_messages([email])
 
 
-def send_user_invite_emails(user_invites: Iterable[UserInvite]):
-    if not user_invites:
-        return
+def get_user_invite_email(user_invite: UserInvite) -> EmailMultiAlternatives:
+    organization_name = user_invite.organization.name
+    recipient_email = user_invite.email
 
-    emails = []
+    subject = f"Account creation for Treeckle ({organization_name})"
+    plain_message, html_message = render_email(
+        "user_invite_email_template",
+        context={
+            "organization": organization_name,
+            "email": recipient_email,
+            "host": HOST,
+        },
+    )
 
-    for user_invite in user_invites:
-        organization_name = user_invite.organization.name
-        recipient_email = user_invite.email
+    email = EmailMultiAlternatives(
+        subject=subject, body=plain_message, to=[recipient_email]
+    )
+    email.attach_alternative(html_message, "text/html")
 
-        subject = f"Account creation for Treeckle ({organization_name})"
-        html_message = render_to_string(
-            "user_invite_email_template.html",
-            context={
-                "organization": organization_name,
-                "email": recipient_email,
-                "host": HOST,
-            },
-        )
-        plain_message = strip_tags(html_message)
+    return email
 
-        email = EmailMultiAlternatives(
-            subject=subject, body=plain_message, to=[recipient_email]
-        )
-        email.attach_alternative(html_message, "text/html")
 
-        emails.append(email)
+@transaction.atomic
+def send_user_invite_emails(user_invites: Iterable[UserInvite]) -> int:
+    """
+    Queues invite emails in chunks of EMAIL_OUTBOX["BATCH_SIZE"].
 
-    connection = get_connection(fail_silently=True)
-    connection.send_messages(emails)
+    Invites whose email was already sent or is still queued are skipped, so a
+    partially sent batch can be resumed by calling this again with the same
+    invites. Returns the number of emails queued.
+    """
+    user_invites = [
+        user_invite
+        for user_invite in user_invites
+        if user_invite.email_status != OutboxEmailStatus.SENT
+    ]
+
+    if not user_invites:
+        return 0
+
+    queued_user_invite_ids = set(
+        OutboxEmail.objects.filter(
+            user_invite__in=user_invites, status=OutboxEmailStatus.PENDING
+        ).values_list("user_invite_id", flat=True)
+    )
+
+    user_invites_to_be_sent = [
+        user_invite
+        for user_invite in user_invites
+        if user_invite.id not in queued_user_invite_ids
+    ]
+
+    num_enqueued = enqueue_outbox_emails(
+        (
+            email_to_outbox_email(
+                get_user_invite_email(user_invite), user_invite=user_invite
+            )
+            for user_invite in user_invites_to_be_sent
+        ),
+        chunk_size=settings.EMAIL_OUTBOX["BATCH_SIZE"],
+    )
+
+    ## resent invites go back to pending until the worker delivers them
+    UserInvite.objects.filter(
+        id__in=[user_invite.id for user_invite in user_invites_to_be_sent]
+    ).exclude(email_status=OutboxEmailStatus.PENDING).update(
+        email_status=OutboxEmailStatus.PENDING
+    )
+
+    return num_enqueued
 
 
 def send_created_booking_emails(bookings: Iterable[Booking]):
@@ -88,8 +146,8 @@ def send_created_booking_emails(bookings: Iterable[Booking]):
             f"{start.strftime(DATE_TIME_FORMAT)} - {end.strftime(DATE_TIME_FORMAT)}"
         )
 
-    html_message = render_to_string(
-        "created_booking_email_template.html",
+    plain_message, html_message = render_email(
+        "created_booking_email_template",
         context={
             "name": booker.name,
             "email": booker.email,
@@ -101,13 +159,12 @@ def send_created_booking_emails(bookings: Iterable[Booking]):
             "status": status,
         },
     )
-    plain_message = strip_tags(html_message)
 
     subject = f"[{venue.name}] Your booking request has been created"
     cc_emails = [
-        subscription.email
-        for subscription in get_booking_notification_subscriptions(venue_id=venue.id)
-        if subscription.email != booker.email
+        email
+        for email in get_venue_id_to_subscription_emails_mapping([venue.id])[venue.id]
+        if email != booker.email
     ]
 
     email = EmailMultiAlternatives(
@@ -115,8 +172,7 @@ def send_created_booking_emails(bookings: Iterable[Booking]):
     )
     email.attach_alternative(html_message, "text/html")
 
-    connection = get_connection(fail_silently=True)
-    connection.send_messages([email])
+    enqueue_emails([email])
 
 
 def send_updated_booking_emails(
@@ -126,6 +182,13 @@ def send_updated_booking_emails(
     if not bookings:
         return
 
+    ## bookings are expected to be loaded with booker and venue__organization
+    venue_id_to_subscription_emails_mapping = (
+        get_venue_id_to_subscription_emails_mapping(
+            booking.venue_id for booking in bookings
+        )
+    )
+
     emails = []
 
     for booking in bookings:
@@ -141,8 +204,8 @@ def send_updated_booking_emails(
 
         description = f"Your booking request has been {new_status.lower() if new_status != BookingStatus.PENDING else 'revoked'}"
 
-        html_message = render_to_string(
-            "updated_booking_status_email_template.html",
+        plain_message, html_message = render_email(
+            "updated_booking_status_email_template",
             context={
                 "description": description,
                 "name": booker.name,
@@ -156,16 +219,13 @@ def send_updated_booking_emails(
                 "new_status": new_status,
             },
         )
-        plain_message = strip_tags(html_message)
 
         subject = f"[{venue.name}] {description}"
 
         cc_emails = [
-            subscription.email
-            for subscription in get_booking_notification_subscriptions(
-                venue_id=venue.id
-            )
-            if subscription.email != booker.email
+            email
+            for email in venue_id_to_subscription_emails_mapping[venue.id]
+            if email != booker.email
         ]
 
         email = EmailMultiAlternatives(
@@ -175,5 +235,4 @@ def send_updated_booking_emails(
 
         emails.append(email)
 
-    connection = get_connection(fail_silently=True)
-    connection.send_messages(emails)
+    enqueue_emails(emails)
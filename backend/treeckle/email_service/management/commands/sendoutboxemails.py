@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from email_service.outbox import send_outbox_emails
+
+
+class Command(BaseCommand):
+    help = "Sends queued outbox emails in batches, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX["BATCH_SIZE"],
+            help="Maximum number of emails sent per batch",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=int,
+            default=settings.EMAIL_OUTBOX["POLL_INTERVAL"],
+            help="Seconds to wait when no emails are due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no emails are due instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                num_claimed, num_sent = send_outbox_emails(
+                    batch_size=options["batch_size"]
+                )
+
+                if num_claimed:
+                    self.stdout.write(f"Sent {num_sent}/{num_claimed} emails")
+                    continue
+
+                if options["once"]:
+                    return
+
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0020_user_invite_email_status"),
+        ("email_service", "0001_outbox_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxemail",
+            name="user_invite",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="users.userinvite",
+            ),
+        ),
+    ]
@@ -1 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+from treeckle.common.models import TimestampedModel
+
+
 # Create your models here.
+class OutboxEmailStatus(models.TextChoices):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class OutboxEmail(TimestampedModel):
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=50,
+        choices=OutboxEmailStatus.choices,
+        default=OutboxEmailStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    user_invite = models.ForeignKey(
+        "users.UserInvite", on_delete=models.SET_NULL, blank=True, null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status=OutboxEmailStatus.PENDING),
+                name="outbox_email_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({', '.join(self.to)}) - {self.status}"
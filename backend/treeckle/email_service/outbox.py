@@ -0,0 +1,190 @@
+from datetime import timedelta
+from itertools import islice
+from typing import Iterable
+
+from django.conf import settings
+from django.core.mail import get_connection, EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+
+from treeckle.common.retries import get_retry_delay
+from users.models import UserInvite
+from .models import OutboxEmail, OutboxEmailStatus
+
+
+def email_to_outbox_email(email: EmailMultiAlternatives, **kwargs) -> OutboxEmail:
+    return OutboxEmail(
+        subject=email.subject,
+        body=email.body,
+        html_body=next(
+            (
+                content
+                for content, mimetype in email.alternatives
+                if mimetype == "text/html"
+            ),
+            "",
+        ),
+        to=list(email.to),
+        cc=list(email.cc),
+        **kwargs,
+    )
+
+
+def enqueue_outbox_emails(outbox_emails: Iterable[OutboxEmail], chunk_size: int) -> int:
+    """
+    Stores outbox emails in chunks, so only one chunk is held in memory at a time.
+
+    The rows are written with the caller's transaction, so emails about changes
+    that are rolled back are never sent. Returns the number of emails enqueued.
+    """
+    outbox_emails = iter(outbox_emails)
+    num_enqueued = 0
+
+    while chunk := list(islice(outbox_emails, chunk_size)):
+        OutboxEmail.objects.bulk_create(chunk)
+        num_enqueued += len(chunk)
+
+    return num_enqueued
+
+
+def enqueue_emails(emails: Iterable[EmailMultiAlternatives]) -> int:
+    """
+    Stores emails in the outbox to be sent by the sendoutboxemails worker.
+    """
+    return enqueue_outbox_emails(
+        (email_to_outbox_email(email) for email in emails),
+        chunk_size=settings.EMAIL_OUTBOX["BATCH_SIZE"],
+    )
+
+
+def outbox_email_to_email_message(
+    outbox_email: OutboxEmail,
+) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        subject=outbox_email.subject,
+        body=outbox_email.body,
+        to=outbox_email.to,
+        cc=outbox_email.cc,
+    )
+
+    if outbox_email.html_body:
+        email.attach_alternative(outbox_email.html_body, "text/html")
+
+    return email
+
+
+def claim_outbox_emails(batch_size: int) -> list[OutboxEmail]:
+    """
+    Leases a batch of due emails so that other workers skip them.
+
+    The lease is an advanced next_attempt_at, so emails held by a worker that
+    dies are retried once the lease expires.
+    """
+    with transaction.atomic():
+        outbox_emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=OutboxEmailStatus.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        lease_expiry = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX["LEASE"]
+        )
+
+        for outbox_email in outbox_emails:
+            outbox_email.attempts += 1
+            outbox_email.next_attempt_at = lease_expiry
+
+        OutboxEmail.objects.bulk_update(
+            outbox_emails, fields=["attempts", "next_attempt_at"]
+        )
+
+    return outbox_emails
+
+
+def record_outbox_email_sent(outbox_email: OutboxEmail):
+    now = timezone.now()
+
+    with transaction.atomic():
+        OutboxEmail.objects.filter(id=outbox_email.id).update(
+            status=OutboxEmailStatus.SENT, sent_at=now, updated_at=now
+        )
+
+        if outbox_email.user_invite_id is not None:
+            UserInvite.objects.filter(id=outbox_email.user_invite_id).update(
+                email_status=OutboxEmailStatus.SENT, email_sent_at=now
+            )
+
+
+def record_outbox_email_failure(outbox_email: OutboxEmail, error: Exception):
+    if outbox_email.attempts >= settings.EMAIL_OUTBOX["MAX_ATTEMPTS"]:
+        update = {"status": OutboxEmailStatus.FAILED}
+    else:
+        update = {
+            "next_attempt_at": timezone.now()
+            + get_retry_delay(
+                outbox_email.attempts,
+                base=settings.EMAIL_OUTBOX["RETRY_BACKOFF_BASE"],
+                maximum=settings.EMAIL_OUTBOX["RETRY_BACKOFF_MAX"],
+            )
+        }
+
+    with transaction.atomic():
+        OutboxEmail.objects.filter(id=outbox_email.id).update(
+            last_error=repr(error), updated_at=timezone.now(), **update
+        )
+
+        if (
+            update.get("status") == OutboxEmailStatus.FAILED
+            and outbox_email.user_invite_id is not None
+        ):
+            UserInvite.objects.filter(id=outbox_email.user_invite_id).update(
+                email_status=OutboxEmailStatus.FAILED
+            )
+
+
+def send_outbox_emails(batch_size: int) -> tuple[int, int]:
+    """
+    Sends one batch of due outbox emails over a single connection.
+
+    The batch is leased first, and the emails are sent outside any transaction,
+    so no row is locked while waiting on the email provider. Each email is
+    recorded as sent or failed right after its attempt. Delivery is at least
+    once: if the worker dies mid-batch, emails not yet recorded are retried
+    once their lease expires.
+
+    Returns the number of emails claimed and the number sent.
+    """
+    outbox_emails = claim_outbox_emails(batch_size)
+
+    if not outbox_emails:
+        return 0, 0
+
+    num_sent = 0
+    connection = get_connection()
+
+    try:
+        connection.open()
+    except Exception as e:
+        for outbox_email in outbox_emails:
+            record_outbox_email_failure(outbox_email, e)
+
+        return len(outbox_emails), 0
+
+    try:
+        for outbox_email in outbox_emails:
+            try:
+                connection.send_messages([outbox_email_to_email_message(outbox_email)])
+            except Exception as e:
+                record_outbox_email_failure(outbox_email, e)
+                continue
+
+            record_outbox_email_sent(outbox_email)
+            num_sent += 1
+    finally:
+        connection.close()
+
+    return len(outbox_emails), num_sent
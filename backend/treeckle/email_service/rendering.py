@@ -0,0 +1,15 @@
+from django.template.loader import get_template
+
+
+def render_email(template_name: str, context: dict) -> tuple[str, str]:
+    """
+    Renders an email from <template_name>.txt and <template_name>.html.
+
+    Returns the plain-text body and the HTML body. The plain-text body comes from
+    its own template, so HTML never has to be stripped. Compiled templates are
+    cached by Django's cached template loader.
+    """
+    plain_message = get_template(f"{template_name}.txt").render(context).strip()
+    html_message = get_template(f"{template_name}.html").render(context)
+
+    return plain_message, html_message
@@ -1 +1,82 @@
+from unittest.mock import patch
+
+from django.core import mail
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.utils.html import strip_tags
+
+from treeckle.common.testing import benchmark, measure
+from organizations.models import Organization
+from users.models import User, UserInvite
+from authentication.serializers import PasswordResetSerializer
+from .logic import send_user_invite_emails
+from .models import OutboxEmail
+
+
 # Create your tests here.
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class PasswordResetEmailTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Organization")
+        self.user = User.objects.create(
+            organization=organization, name="User", email="user@example.com"
+        )
+
+    def test_new_password_is_sent_but_not_stored(self):
+        new_password = "Kx7pQ2mZ"
+
+        with patch("authentication.logic.get_random_string", return_value=new_password):
+            serializer = PasswordResetSerializer(data={"email": self.user.email})
+            serializer.is_valid(raise_exception=True)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(new_password, mail.outbox[0].body)
+        self.assertFalse(
+            OutboxEmail.objects.filter(
+                Q(subject__contains=new_password)
+                | Q(body__contains=new_password)
+                | Q(html_body__contains=new_password)
+            ).exists()
+        )
+
+
+class UserInviteEmailTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Tembusu & Friends")
+
+    def test_plain_text_body_comes_from_the_text_template(self):
+        user_invite = UserInvite.objects.create(
+            organization=self.organization, email="invited@example.com"
+        )
+
+        self.assertEqual(send_user_invite_emails([user_invite]), 1)
+
+        outbox_email = OutboxEmail.objects.get(user_invite=user_invite)
+        self.assertIn(
+            "You have been invited to join Tembusu & Friends@Treeckle.",
+            outbox_email.body,
+        )
+        self.assertIn("invited@example.com", outbox_email.body)
+        self.assertNotIn("<", outbox_email.body)
+        self.assertIn("Tembusu &amp; Friends", outbox_email.html_body)
+
+    @benchmark
+    def test_benchmark_sending_user_invites(self):
+        user_invites = UserInvite.objects.bulk_create(
+            UserInvite(organization=self.organization, email=f"user{i}@example.com")
+            for i in range(5000)
+        )
+
+        ## queued invites are skipped, so only the first run sends anything
+        sending_time = measure(lambda: send_user_invite_emails(user_invites), repeat=1)
+        self.assertEqual(OutboxEmail.objects.count(), 5000)
+
+        html_bodies = OutboxEmail.objects.values_list("html_body", flat=True)
+        stripping_time = measure(
+            lambda: [strip_tags(html_body) for html_body in html_bodies], repeat=1
+        )
+
+        print(
+            f"\nsending 5,000 user invites: {sending_time:.3f}s, "
+            f"stripping their HTML bodies instead would add {stripping_time:.3f}s"
+        )
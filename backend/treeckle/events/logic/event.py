@@ -1,8 +1,9 @@
 from typing import Optional, Iterable, Sequence
 from datetime import datetime
 
-from django.db.models import QuerySet
-from django.db import transaction, IntegrityError
+from django.db.models import QuerySet, Prefetch, Count, OuterRef, Subquery
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 
 from treeckle.common.constants import (
     ID,
@@ -25,8 +26,14 @@ from treeckle.common.constants import (
     SIGN_UP_STATUS,
 )
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.camel_case import camel_case_json
 from treeckle.common.validators import is_url
-from content_delivery_service.logic.image import delete_image, upload_image
+from content_delivery_service.logic.image import release_image
+from content_delivery_service.logic.image_upload import (
+    cancel_image_uploads,
+    stage_image_file_upload,
+    stage_image_upload,
+)
 from organizations.models import Organization
 from users.models import User
 from users.logic import user_to_json
@@ -34,36 +41,72 @@ from events.models import Event, EventCategory, EventCategoryType, EventSignUp
 
 
 def event_to_json(event: Event, user: User) -> dict:
-    ##categories = EventCategory.objects.select_related("category").filter(event=event)
-
-    try:
-        sign_up_status = EventSignUp.objects.get(event=event, user=user).status
-    except EventSignUp.DoesNotExist:
-        sign_up_status = None
-
-    return {
-        ID: event.id,
-        CREATED_AT: parse_datetime_to_ms_timestamp(event.created_at),
-        UPDATED_AT: parse_datetime_to_ms_timestamp(event.updated_at),
-        TITLE: event.title,
-        ORGANIZED_BY: event.organized_by,
-        CREATOR: user_to_json(event.creator),
-        VENUE_NAME: event.venue_name,
-        CAPACITY: str(event.capacity) if event.capacity else None,
-        DESCRIPTION: event.description,
-        CATEGORIES: [
-            event_category.category.name
-            for event_category in event.eventcategory_set.all()
-        ],
-        START_DATE_TIME: parse_datetime_to_ms_timestamp(event.start_date_time),
-        END_DATE_TIME: parse_datetime_to_ms_timestamp(event.end_date_time),
-        IMAGE: event.image_url,
-        IS_PUBLISHED: event.is_published,
-        IS_SIGN_UP_ALLOWED: event.is_sign_up_allowed,
-        IS_SIGN_UP_APPROVAL_REQUIRED: event.is_sign_up_approval_required,
-        SIGN_UP_COUNT: event.eventsignup_set.count(),
-        SIGN_UP_STATUS: sign_up_status,
-    }
+    ## use values annotated by events_to_json when available to avoid per-event queries
+    if hasattr(event, "requester_sign_up_status"):
+        sign_up_status = event.requester_sign_up_status
+    else:
+        try:
+            sign_up_status = EventSignUp.objects.get(event=event, user=user).status
+        except EventSignUp.DoesNotExist:
+            sign_up_status = None
+
+    sign_up_count = (
+        event.annotated_sign_up_count
+        if hasattr(event, "annotated_sign_up_count")
+        else event.eventsignup_set.count()
+    )
+
+    return camel_case_json(
+        {
+            ID: event.id,
+            CREATED_AT: parse_datetime_to_ms_timestamp(event.created_at),
+            UPDATED_AT: parse_datetime_to_ms_timestamp(event.updated_at),
+            TITLE: event.title,
+            ORGANIZED_BY: event.organized_by,
+            CREATOR: user_to_json(event.creator),
+            VENUE_NAME: event.venue_name,
+            CAPACITY: str(event.capacity) if event.capacity else None,
+            DESCRIPTION: event.description,
+            CATEGORIES: [
+                event_category.category.name
+                for event_category in event.eventcategory_set.all()
+            ],
+            START_DATE_TIME: parse_datetime_to_ms_timestamp(event.start_date_time),
+            END_DATE_TIME: parse_datetime_to_ms_timestamp(event.end_date_time),
+            IMAGE: event.image_url,
+            IS_PUBLISHED: event.is_published,
+            IS_SIGN_UP_ALLOWED: event.is_sign_up_allowed,
+            IS_SIGN_UP_APPROVAL_REQUIRED: event.is_sign_up_approval_required,
+            SIGN_UP_COUNT: sign_up_count,
+            SIGN_UP_STATUS: sign_up_status,
+        }
+    )
+
+
+def annotate_events_for_json(events: QuerySet[Event], user: User) -> QuerySet[Event]:
+    user_sign_up_status = EventSignUp.objects.filter(
+        event=OuterRef("pk"), user=user
+    ).values("status")[:1]
+
+    return (
+        events.select_related("creator__organization", "creator__profile_image")
+        .prefetch_related(
+            Prefetch(
+                "eventcategory_set",
+                queryset=EventCategory.objects.select_related("category"),
+            )
+        )
+        .annotate(
+            annotated_sign_up_count=Count("eventsignup", distinct=True),
+            requester_sign_up_status=Subquery(user_sign_up_status),
+        )
+    )
+
+
+def events_to_json(events: QuerySet[Event], user: User) -> list[dict]:
+    return [
+        event_to_json(event, user) for event in annotate_events_for_json(events, user)
+    ]
 
 
 def get_events(*args, **kwargs) -> QuerySet[Event]:
@@ -126,34 +169,34 @@ def create_event(
     is_sign_up_approval_required: bool,
     categories: list[str],
 ) -> Event:
-    image_id, image_url = upload_image(image)
-
-    try:
-        with transaction.atomic():
-            new_event = Event.objects.create(
-                title=title,
-                creator=creator,
-                organized_by=organized_by,
-                venue_name=venue_name,
-                description=description,
-                capacity=capacity,
-                start_date_time=start_date_time,
-                end_date_time=end_date_time,
-                image_url=image_url,
-                image_id=image_id,
-                is_published=is_published,
-                is_sign_up_allowed=is_sign_up_allowed,
-                is_sign_up_approval_required=is_sign_up_approval_required,
-            )
-            create_event_categories(
-                categories=categories,
-                event=new_event,
-                organization=creator.organization,
-            )
+    with transaction.atomic():
+        new_event = Event.objects.create(
+            title=title,
+            creator=creator,
+            organized_by=organized_by,
+            venue_name=venue_name,
+            description=description,
+            capacity=capacity,
+            start_date_time=start_date_time,
+            end_date_time=end_date_time,
+            image_url=image if is_url(image) else "",
+            is_published=is_published,
+            is_sign_up_allowed=is_sign_up_allowed,
+            is_sign_up_approval_required=is_sign_up_approval_required,
+        )
+        create_event_categories(
+            categories=categories,
+            event=new_event,
+            organization=creator.organization,
+        )
 
-    except IntegrityError as e:
-        delete_image(image_id)
-        raise e
+        ## the image is uploaded and swapped in by the uploadpendingimages worker
+        if image and not is_url(image):
+            stage_image_upload(
+                target=new_event,
+                image_data=image,
+                folder=creator.organization.name,
+            )
 
     return new_event
 
@@ -174,53 +217,65 @@ def update_event(
     categories: list[str],
 ) -> Event:
 
-    current_image_id, current_image_url = (
-        current_event.image_id,
-        current_event.image_url,
-    )
+    is_image_removed = not image
 
-    if is_url(image):
-        new_image_id, new_image_url = current_image_id, current_image_url
-    else:
-        new_image_id, new_image_url = upload_image(image)
-
-    try:
-        with transaction.atomic():
-            ## delete existing event categories and re-populate with latest categories
-            get_event_categories(event=current_event).delete()
-            create_event_categories(
-                categories=categories,
-                event=current_event,
-                organization=current_event.creator.organization,
-            )
-            delete_unused_event_category_types(
-                organization=current_event.creator.organization
-            )
+    with transaction.atomic():
+        current_image = current_event.get_image() if is_image_removed else None
 
-            current_event.update_from_dict(
-                {
-                    "title": title,
-                    "organized_by": organized_by,
-                    "venue_name": venue_name,
-                    "description": description,
-                    "capacity": capacity,
-                    "start_date_time": start_date_time,
-                    "end_date_time": end_date_time,
-                    "image_url": new_image_url,
-                    "image_id": new_image_id,
-                    "is_published": is_published,
-                    "is_sign_up_allowed": is_sign_up_allowed,
-                    "is_sign_up_approval_required": is_sign_up_approval_required,
-                },
-                commit=True,
-            )
+        ## delete existing event categories and re-populate with latest categories
+        get_event_categories(event=current_event).delete()
+        create_event_categories(
+            categories=categories,
+            event=current_event,
+            organization=current_event.creator.organization,
+        )
+        delete_unused_event_category_types(
+            organization=current_event.creator.organization
+        )
 
-    except IntegrityError as e:
-        if current_image_id != new_image_id:
-            delete_image(new_image_id)
-        raise e
+        current_event.update_from_dict(
+            {
+                "title": title,
+                "organized_by": organized_by,
+                "venue_name": venue_name,
+                "description": description,
+                "capacity": capacity,
+                "start_date_time": start_date_time,
+                "end_date_time": end_date_time,
+                "image_url": "" if is_image_removed else current_event.image_url,
+                "image_id": "" if is_image_removed else current_event.image_id,
+                "is_published": is_published,
+                "is_sign_up_allowed": is_sign_up_allowed,
+                "is_sign_up_approval_required": is_sign_up_approval_required,
+            },
+            commit=True,
+        )
 
-    if current_image_id != new_image_id:
-        delete_image(current_image_id)
+        ## a new image is uploaded and swapped in by the uploadpendingimages
+        ## worker, which also releases the current one
+        if is_image_removed:
+            cancel_image_uploads(current_event)
+
+            if current_image is not None:
+                release_image(current_image)
+        elif not is_url(image):
+            stage_image_upload(
+                target=current_event,
+                image_data=image,
+                folder=current_event.creator.organization.name,
+            )
 
     return current_event
+
+
+@transaction.atomic
+def update_event_image_file(event: Event, image_file: UploadedFile) -> Event:
+    ## the uploadpendingimages worker uploads the image, swaps it in
+    ## and releases the current one
+    stage_image_file_upload(
+        target=event,
+        image_file=image_file,
+        folder=event.creator.organization.name,
+    )
+
+    return event
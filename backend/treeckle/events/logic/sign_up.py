@@ -12,6 +12,7 @@ from treeckle.common.constants import (
     STATUS,
 )
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.camel_case import camel_case_json
 from organizations.models import Organization
 from users.models import User
 from users.logic import user_to_json, get_users
@@ -19,14 +20,16 @@ from events.models import Event, EventSignUp, SignUpStatus, SignUpAction
 
 
 def event_sign_up_to_json(event_sign_up: EventSignUp) -> dict:
-    return {
-        ID: event_sign_up.id,
-        CREATED_AT: parse_datetime_to_ms_timestamp(event_sign_up.created_at),
-        UPDATED_AT: parse_datetime_to_ms_timestamp(event_sign_up.updated_at),
-        USER: user_to_json(event_sign_up.user),
-        EVENT_ID: event_sign_up.event_id,
-        STATUS: event_sign_up.status,
-    }
+    return camel_case_json(
+        {
+            ID: event_sign_up.id,
+            CREATED_AT: parse_datetime_to_ms_timestamp(event_sign_up.created_at),
+            UPDATED_AT: parse_datetime_to_ms_timestamp(event_sign_up.updated_at),
+            USER: user_to_json(event_sign_up.user),
+            EVENT_ID: event_sign_up.event_id,
+            STATUS: event_sign_up.status,
+        }
+    )
 
 
 def get_event_sign_ups(*args, **kwargs) -> QuerySet[EventSignUp]:
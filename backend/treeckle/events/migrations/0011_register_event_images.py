@@ -0,0 +1,46 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:12
+
+from django.db import migrations
+from django.db.models import Count, F, Max
+
+
+def register_event_images(apps, schema_editor):
+    ## event images were uploaded without an image to count their references,
+    ## and every event holding an image is one reference to it
+    Event = apps.get_model("events", "Event")
+    Image = apps.get_model("content_delivery_service", "Image")
+
+    event_images = (
+        Event.objects.exclude(image_id="")
+        .values("creator__organization_id", "image_id")
+        .annotate(num_events=Count("id"), image_url=Max("image_url"))
+        .order_by()
+    )
+
+    for event_image in event_images:
+        num_updated = Image.objects.filter(
+            organization_id=event_image["creator__organization_id"],
+            image_id=event_image["image_id"],
+        ).update(reference_count=F("reference_count") + event_image["num_events"])
+
+        if num_updated:
+            continue
+
+        Image.objects.create(
+            organization_id=event_image["creator__organization_id"],
+            image_url=event_image["image_url"],
+            image_id=event_image["image_id"],
+            reference_count=event_image["num_events"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content_delivery_service", "0004_image_content_hash"),
+        ("events", "0010_alter_event_image_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(register_event_images, migrations.RunPython.noop),
+    ]
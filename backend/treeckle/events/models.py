@@ -1,13 +1,18 @@
+from typing import Optional
+
 from django.db import models
 from django.db.models import Q, F
+from django.db.models.signals import post_delete
 
 from treeckle.common.models import TimestampedModel
 from organizations.models import Organization
+from content_delivery_service.models import Image, ImageHolder
+from content_delivery_service.logic.image import release_image
 from users.models import User
 
 
 # Create your models here.
-class Event(TimestampedModel):
+class Event(ImageHolder, TimestampedModel):
     title = models.CharField(max_length=255)
     creator = models.ForeignKey(User, on_delete=models.CASCADE)
     organized_by = models.CharField(max_length=255)
@@ -34,6 +39,38 @@ class Event(TimestampedModel):
     def __str__(self):
         return f"{self.title} | {self.creator}"
 
+    def get_image_organization(self) -> Organization:
+        return self.creator.organization
+
+    def get_image(self) -> Optional[Image]:
+        ## external image urls have no image
+        if not self.image_id:
+            return None
+
+        return Image.objects.filter(
+            organization_id=self.creator.organization_id, image_id=self.image_id
+        ).first()
+
+    def set_image(self, image: Optional[Image]):
+        self.image_url = image.image_url if image else ""
+        self.image_id = image.image_id if image else ""
+        self.save(update_fields=["image_url", "image_id", "updated_at"])
+
+
+def event_cleanup(sender, instance: Event, **kwargs):
+    image = instance.get_image()
+
+    if image is not None:
+        release_image(image)
+
+
+## set up listener to release event image when an event is deleted
+post_delete.connect(
+    event_cleanup,
+    sender=Event,
+    dispatch_uid="events.event.event_cleanup",
+)
+
 
 class EventCategoryType(TimestampedModel):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
@@ -1 +1,181 @@
+import importlib
+import json
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from content_delivery_service.models import Image, ImageFileTombstone
+from organizations.models import Organization
+from users.models import User, Role
+from authentication.logic import get_tokens
+from .models import (
+    Event,
+    EventCategory,
+    EventCategoryType,
+    EventCategoryTypeSubscription,
+    EventSignUp,
+)
+
+
 # Create your tests here.
+class EventListTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Organization")
+        self.admin = User.objects.create(
+            organization=self.organization,
+            name="Admin",
+            email="admin@example.com",
+            role=Role.ADMIN,
+        )
+        self.resident = User.objects.create(
+            organization=self.organization,
+            name="Resident",
+            email="resident@example.com",
+        )
+        self.category_type = EventCategoryType.objects.create(
+            organization=self.organization, name="Category"
+        )
+        EventCategoryTypeSubscription.objects.create(
+            category=self.category_type, user=self.admin
+        )
+
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_tokens(self.admin)['access']}"
+        )
+
+    def create_events(self, count: int):
+        now = timezone.now()
+
+        for i in range(count):
+            event = Event.objects.create(
+                title=f"Event {i}",
+                creator=self.admin,
+                organized_by="Organizer",
+                start_date_time=now,
+                end_date_time=now,
+                is_published=True,
+                is_sign_up_allowed=True,
+                is_sign_up_approval_required=False,
+            )
+            EventCategory.objects.create(event=event, category=self.category_type)
+            EventSignUp.objects.create(event=event, user=self.admin)
+            EventSignUp.objects.create(event=event, user=self.resident)
+
+    def get_events(self, url: str) -> tuple[list, int]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            content = (
+                b"".join(response.streaming_content)
+                if response.streaming
+                else response.content
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        return json.loads(content), len(context.captured_queries)
+
+
+class EventListQueryCountTestCase(EventListTestCase):
+    """
+    Event lists are serialized in batches, so their query count must not grow
+    with the number of events.
+    """
+
+    def assert_constant_queries(self, url: str):
+        self.create_events(2)
+        ## warms the requester cache
+        self.get_events(url)
+        events, num_queries = self.get_events(url)
+        self.assertEqual(len(events), 2)
+
+        self.create_events(20)
+        events, num_queries_for_more_events = self.get_events(url)
+        self.assertEqual(len(events), 22)
+
+        self.assertEqual(num_queries_for_more_events, num_queries)
+
+    def test_events(self):
+        self.assert_constant_queries("/api/events/")
+
+    def test_own_events(self):
+        self.assert_constant_queries("/api/events/own")
+
+    def test_signed_up_events(self):
+        self.assert_constant_queries("/api/events/signedup")
+
+    def test_published_events(self):
+        self.assert_constant_queries("/api/events/published")
+
+    def test_subscribed_events(self):
+        self.assert_constant_queries("/api/events/subscribed")
+
+
+class SignedUpEventsQueryCountTestCase(EventListTestCase):
+    """
+    The signed up events of a resident are serialized with the same batched
+    pipeline, so a long sign-up history costs no extra queries.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_tokens(self.resident)['access']}"
+        )
+
+    def test_queries_stay_flat_as_sign_up_history_grows(self):
+        self.create_events(1)
+        self.get_events("/api/events/signedup")
+        _, num_queries = self.get_events("/api/events/signedup")
+
+        for num_events in [10, 50]:
+            self.create_events(num_events)
+            events, num_queries_for_longer_history = self.get_events(
+                "/api/events/signedup"
+            )
+
+            self.assertEqual(
+                len(events), EventSignUp.objects.filter(user=self.resident).count()
+            )
+            self.assertEqual(num_queries_for_longer_history, num_queries)
+
+
+class RegisterEventImagesMigrationTestCase(EventListTestCase):
+    migration = importlib.import_module("events.migrations.0011_register_event_images")
+
+    def create_event(self, image_id: str) -> Event:
+        now = timezone.now()
+
+        return Event.objects.create(
+            title="Event",
+            creator=self.admin,
+            organized_by="Organizer",
+            start_date_time=now,
+            end_date_time=now,
+            is_published=True,
+            is_sign_up_allowed=False,
+            is_sign_up_approval_required=False,
+            image_url=f"https://imagekit.test/{image_id}",
+            image_id=image_id,
+        )
+
+    def test_shared_image_counts_every_event(self):
+        events = [self.create_event("shared") for _ in range(3)]
+        self.create_event("own")
+
+        self.migration.register_event_images(apps, None)
+
+        self.assertEqual(
+            dict(Image.objects.values_list("image_id", "reference_count")),
+            {"shared": 3, "own": 1},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            events[0].delete()
+
+        self.assertEqual(Image.objects.get(image_id="shared").reference_count, 2)
+        self.assertFalse(ImageFileTombstone.objects.exists())
@@ -7,6 +7,7 @@ from .views.event import (
     SignedUpEventsView,
     PublishedEventsView,
     SingleEventView,
+    EventImageView,
 )
 from .views.subscription import (
     SubscribedEventsView,
@@ -27,6 +28,7 @@ urlpatterns = [
     path("published", PublishedEventsView.as_view(), name="published_events"),
     path("subscribed", SubscribedEventsView.as_view(), name="subscribed_events"),
     path("<int:event_id>", SingleEventView.as_view(), name="single_event"),
+    path("<int:event_id>/image", EventImageView.as_view(), name="event_image"),
     path("<int:event_id>/selfsignup", SelfSignUpView.as_view(), name="self_sign_up"),
     path("<int:event_id>/signup", SignUpView.as_view(), name="sign_up"),
 ]
@@ -1,5 +1,3 @@
-from django.db.models import Prefetch
-
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -7,19 +5,26 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 
 from treeckle.common.parsers import parse_ms_timestamp_to_datetime
 from treeckle.common.constants import EVENT, SIGN_UPS
+from treeckle.common.camel_case import camel_case_json
+from treeckle.common.responses import StreamingJSONListResponse, STREAMING_CHUNK_SIZE
+from content_delivery_service.parsers import TemporaryFileMultiPartParser
+from content_delivery_service.serializers import ImageFileSerializer
 from users.permission_middlewares import check_access
 from users.models import Role, User
 from events.serializers import EventSerializer
 from events.logic.event import (
     get_events,
     event_to_json,
+    events_to_json,
+    annotate_events_for_json,
     create_event,
     delete_unused_event_category_types,
     update_event,
+    update_event_image_file,
     get_event_category_types,
 )
 from events.logic.sign_up import get_event_sign_ups, event_sign_up_to_json
-from events.models import Event, EventCategory
+from events.models import Event
 from events.middlewares import (
     check_requester_event_same_organization,
     check_event_viewer,
@@ -155,21 +160,18 @@ class EventsView(APIView):
         Admin-only endpoint that returns comprehensive details about all events
         in the organization, including sign-up counts, categories, and permissions.
         """
-        same_organization_events = (
-            get_events(creator__organization=requester.organization)
-            .prefetch_related(
-                "eventsignup_set",
-                Prefetch(
-                    "eventcategory_set",
-                    queryset=EventCategory.objects.select_related("category"),
-                ),
-            )
-            .select_related("creator__organization", "creator__profile_image")
+        same_organization_events = get_events(
+            creator__organization=requester.organization
         )
 
-        data = [event_to_json(event, requester) for event in same_organization_events]
+        data = (
+            event_to_json(event, requester)
+            for event in annotate_events_for_json(
+                same_organization_events, requester
+            ).iterator(chunk_size=STREAMING_CHUNK_SIZE)
+        )
 
-        return Response(data, status=status.HTTP_200_OK)
+        return StreamingJSONListResponse(data, status=status.HTTP_200_OK)
 
     @check_access(Role.ORGANIZER, Role.ADMIN)
     def post(self, request, requester: User):
@@ -260,19 +262,9 @@ class OwnEventsView(APIView):
         Returns events where the current user is the creator, along with
         complete event details including sign-up information and categories.
         """
-        same_creator_events = (
-            get_events(creator=requester)
-            .prefetch_related(
-                "eventsignup_set",
-                Prefetch(
-                    "eventcategory_set",
-                    queryset=EventCategory.objects.select_related("category"),
-                ),
-            )
-            .select_related("creator__organization", "creator__profile_image")
-        )
+        same_creator_events = get_events(creator=requester)
 
-        data = [event_to_json(event, requester) for event in same_creator_events]
+        data = events_to_json(same_creator_events, requester)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -324,14 +316,15 @@ class SignedUpEventsView(APIView):
         Returns only published events where the user has an active sign-up,
         regardless of the sign-up status (pending, confirmed, or attended).
         """
-        user_published_event_sign_ups = get_event_sign_ups(
+        ## filter by id instead of joining sign-ups so that the sign-up count
+        ## annotation is not restricted to the requester's own sign-up
+        signed_up_published_event_ids = get_event_sign_ups(
             user=requester, event__is_published=True
-        ).select_related("event")
-        signed_up_events = [
-            event_sign_up.event for event_sign_up in user_published_event_sign_ups
-        ]
+        ).values_list("event_id", flat=True)
+
+        signed_up_events = get_events(id__in=signed_up_published_event_ids)
 
-        data = [event_to_json(event, requester) for event in signed_up_events]
+        data = events_to_json(signed_up_events, requester)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -384,22 +377,11 @@ class PublishedEventsView(APIView):
         to all organization members. Includes complete event details and
         current sign-up counts.
         """
-        same_organization_published_events = (
-            get_events(creator__organization=requester.organization, is_published=True)
-            .prefetch_related(
-                "eventsignup_set",
-                Prefetch(
-                    "eventcategory_set",
-                    queryset=EventCategory.objects.select_related("category"),
-                ),
-            )
-            .select_related("creator__organization", "creator__profile_image")
+        same_organization_published_events = get_events(
+            creator__organization=requester.organization, is_published=True
         )
 
-        data = [
-            event_to_json(event, requester)
-            for event in same_organization_published_events
-        ]
+        data = events_to_json(same_organization_published_events, requester)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -556,10 +538,12 @@ class SingleEventView(APIView):
             "user__organization", "user__profile_image"
         )
 
-        data = {
-            EVENT: event_to_json(event, requester),
-            SIGN_UPS: [event_sign_up_to_json(sign_up) for sign_up in sign_ups],
-        }
+        data = camel_case_json(
+            {
+                EVENT: event_to_json(event, requester),
+                SIGN_UPS: [event_sign_up_to_json(sign_up) for sign_up in sign_ups],
+            }
+        )
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -620,3 +604,62 @@ class SingleEventView(APIView):
         delete_unused_event_category_types(organization=requester.organization)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@extend_schema_view(
+    put=extend_schema(
+        summary="Upload Event Image",
+        description="Replace the image of an existing event with an uploaded file, sent as multipart/form-data in the image field. The file is queued and uploaded to the CDN in the background, instead of being sent as base64 JSON.",
+        parameters=[
+            OpenApiParameter(
+                name="event_id",
+                description="Unique identifier of the event to update",
+                required=True,
+                type=int,
+                location=OpenApiParameter.PATH,
+            )
+        ],
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"image": {"type": "string", "format": "binary"}},
+                "required": ["image"],
+            }
+        },
+        responses={
+            202: {
+                "description": "Event, whose image is replaced once the upload completes"
+            },
+            400: {"description": "Missing, oversized or non-image file"},
+            401: {"description": "Authentication required"},
+            403: {"description": "Not authorized to modify this event"},
+            404: {"description": "Event not found"},
+        },
+        tags=["Events"],
+    ),
+)
+class EventImageView(APIView):
+    parser_classes = [TemporaryFileMultiPartParser]
+
+    @check_access(Role.ORGANIZER, Role.ADMIN)
+    @check_requester_event_same_organization
+    @check_event_modifier
+    def put(self, request, requester: User, event: Event):
+        """
+        Upload a new image for an existing event.
+
+        The uploaded file is queued for the uploadpendingimages worker, which
+        uploads it to the CDN and releases the previous image once the new one
+        is in place.
+        """
+        serializer = ImageFileSerializer(data=request.data)
+
+        serializer.is_valid(raise_exception=True)
+
+        updated_event = update_event_image_file(
+            event=event, image_file=serializer.validated_data["image"]
+        )
+
+        data = event_to_json(updated_event, requester)
+
+        return Response(data, status=status.HTTP_202_ACCEPTED)
@@ -1,5 +1,3 @@
-from django.db.models import Prefetch
-
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -8,12 +6,11 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 from treeckle.common.constants import SUBSCRIBED_CATEGORIES, NON_SUBSCRIBED_CATEGORIES
 from users.permission_middlewares import check_access
 from users.models import Role, User
-from events.models import EventCategory
 from events.serializers import PatchEventCategoryTypeSubscriptionSerializer
 from events.logic.event import (
     get_event_categories,
     get_events,
-    event_to_json,
+    events_to_json,
 )
 from events.logic.subscription import (
     get_event_category_type_subscriptions,
@@ -201,20 +198,8 @@ class SubscribedEventsView(APIView):
             .distinct()
         )
 
-        subscribed_published_events = (
-            get_events(id__in=subscribed_published_event_ids)
-            .prefetch_related(
-                "eventsignup_set",
-                Prefetch(
-                    "eventcategory_set",
-                    queryset=EventCategory.objects.select_related("category"),
-                ),
-            )
-            .select_related("creator__organization", "creator__profile_image")
-        )
+        subscribed_published_events = get_events(id__in=subscribed_published_event_ids)
 
-        data = [
-            event_to_json(event, requester) for event in subscribed_published_events
-        ]
+        data = events_to_json(subscribed_published_events, requester)
 
         return Response(data, status=status.HTTP_200_OK)
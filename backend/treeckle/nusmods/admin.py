@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from .models import AcademicCalendarSnapshot
+
+# Register your models here.
+admin.site.register(AcademicCalendarSnapshot)
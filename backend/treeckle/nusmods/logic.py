@@ -0,0 +1,220 @@
+import datetime
+import threading
+import time
+
+from typing import Optional
+
+import requests
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils import timezone
+
+from .models import AcademicCalendarSnapshot
+
+ACADEMIC_WEEKS_CACHE_KEY_PREFIX = "academic_weeks"
+
+refresh_lock = threading.Lock()
+## academic year -> time.monotonic() of its last background refresh attempt
+last_refresh_attempts = {}
+
+
+def get_semester_start_dates(academic_year: str) -> dict[int, datetime.date]:
+    """
+    Returns the configured start date of each semester of the academic year.
+
+    Raises ImproperlyConfigured if the academic year has no start dates, as the
+    week dates would otherwise be computed from another year's calendar.
+    """
+    for entry in settings.NUSMODS["SEMESTER_START_DATES"].split():
+        entry_academic_year, _, start_dates = entry.partition(":")
+
+        if entry_academic_year == academic_year:
+            return {
+                semester: datetime.date.fromisoformat(start_date.strip())
+                for semester, start_date in enumerate(start_dates.split(","), start=1)
+            }
+
+    raise ImproperlyConfigured(
+        f"No semester start dates are configured for academic year {academic_year}."
+    )
+
+
+def get_week_dates(sem_start_date, filtered_data):
+    """
+    Calculate week dates for a semester based on start date and timetable data.
+
+    Args:
+        sem_start_date: The Monday of the first week of the semester
+        filtered_data: List of timetable entries with week information
+
+    Returns:
+        List of week objects with week number, start date, and end date
+    """
+    week_dates = []
+    seen_weeks = set()
+
+    for data in filtered_data:
+        weeks = data["weeks"]
+
+        for week in weeks:
+            try:
+                week = int(week)
+            except ValueError:
+                print(f"Skipping invalid week value: {week}")
+                continue
+
+            # Add a week after week 6 to account for recess week
+            adjusted_week = week - 1 if week < 6 else week
+            monday_date = sem_start_date + datetime.timedelta(weeks=adjusted_week)
+
+            if week not in seen_weeks:
+                seen_weeks.add(week)
+                friday_date = monday_date + datetime.timedelta(days=4)
+                week_dates.append(
+                    {
+                        "week": week,
+                        "startDate": monday_date.strftime("%d %b %Y"),
+                        "endDate": friday_date.strftime("%d %b %Y"),
+                    }
+                )
+
+    return sorted(week_dates, key=lambda x: x["week"])
+
+
+def module_data_to_academic_weeks(
+    module_data: dict, sem_start_dates: dict[int, datetime.date]
+) -> list[dict]:
+    result = []
+
+    for semester in module_data.get("semesterData", []):
+        timetable = semester.get("timetable", [])
+        if not timetable or semester["semester"] not in sem_start_dates:
+            continue
+
+        filtered_data = [
+            {
+                "semester": semester["semester"],
+                "weeks": entry["weeks"],
+                "day": entry["day"],
+            }
+            for entry in timetable
+        ]
+
+        sem_num = filtered_data[0]["semester"]
+        week_dates = get_week_dates(sem_start_dates[sem_num], filtered_data)
+
+        if week_dates:
+            result.append({"semester": sem_num, "weeks": week_dates})
+
+    return result
+
+
+def fetch_module_data(academic_year: str) -> dict:
+    response = requests.get(
+        f"{settings.NUSMODS['API_URL']}/{academic_year}/modules/{settings.NUSMODS['REFERENCE_MODULE']}.json",
+        timeout=settings.NUSMODS["TIMEOUT"],
+    )
+    response.raise_for_status()
+
+    return response.json()
+
+
+def get_academic_calendar_snapshot(
+    academic_year: str,
+) -> Optional[AcademicCalendarSnapshot]:
+    return AcademicCalendarSnapshot.objects.filter(academic_year=academic_year).first()
+
+
+def is_snapshot_stale(fetched_at: datetime.datetime) -> bool:
+    return timezone.now() - fetched_at > datetime.timedelta(
+        seconds=settings.NUSMODS["TTL"]
+    )
+
+
+def refresh_academic_calendar_snapshot(
+    academic_year: str,
+) -> AcademicCalendarSnapshot:
+    module_data = fetch_module_data(academic_year)
+
+    snapshot, _ = AcademicCalendarSnapshot.objects.update_or_create(
+        academic_year=academic_year,
+        defaults={"module_data": module_data, "fetched_at": timezone.now()},
+    )
+
+    cache.delete(f"{ACADEMIC_WEEKS_CACHE_KEY_PREFIX}:{academic_year}")
+
+    return snapshot
+
+
+def refresh_academic_calendar_snapshot_in_background(academic_year: str):
+    ## at most one attempt per academic year per retry interval in each process
+    with refresh_lock:
+        last_refresh_attempt = last_refresh_attempts.get(academic_year)
+
+        if (
+            last_refresh_attempt is not None
+            and time.monotonic() - last_refresh_attempt
+            < settings.NUSMODS["REFRESH_RETRY_INTERVAL"]
+        ):
+            return
+
+        last_refresh_attempts[academic_year] = time.monotonic()
+
+    def refresh():
+        try:
+            ## the cache is per process, so another process may have refreshed
+            ## the stored snapshot already
+            snapshot = get_academic_calendar_snapshot(academic_year)
+
+            if snapshot is not None and not is_snapshot_stale(snapshot.fetched_at):
+                cache.delete(f"{ACADEMIC_WEEKS_CACHE_KEY_PREFIX}:{academic_year}")
+                return
+
+            refresh_academic_calendar_snapshot(academic_year)
+        except requests.RequestException:
+            ## the last good snapshot keeps being served
+            pass
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_academic_weeks(academic_year: str = None) -> list[dict]:
+    """
+    Returns the week dates of each semester of the academic year.
+
+    Week dates are computed from the stored snapshot of NUSMods data and cached.
+    A snapshot older than the TTL is refreshed in the background while the stale
+    one is served, so NUSMods being slow or down never blocks a request once a
+    snapshot exists. Only the very first fetch is made inline.
+
+    Raises ImproperlyConfigured if the academic year has no semester start dates.
+    """
+    academic_year = academic_year or settings.NUSMODS["ACADEMIC_YEAR"]
+    sem_start_dates = get_semester_start_dates(academic_year)
+    cache_key = f"{ACADEMIC_WEEKS_CACHE_KEY_PREFIX}:{academic_year}"
+
+    cached_academic_weeks = cache.get(cache_key)
+
+    if cached_academic_weeks is None:
+        snapshot = get_academic_calendar_snapshot(academic_year)
+
+        if snapshot is None:
+            snapshot = refresh_academic_calendar_snapshot(academic_year)
+
+        cached_academic_weeks = (
+            snapshot.fetched_at,
+            module_data_to_academic_weeks(snapshot.module_data, sem_start_dates),
+        )
+        cache.set(cache_key, cached_academic_weeks, timeout=settings.NUSMODS["TTL"])
+
+    fetched_at, academic_weeks = cached_academic_weeks
+
+    if is_snapshot_stale(fetched_at):
+        refresh_academic_calendar_snapshot_in_background(academic_year)
+
+    return academic_weeks
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AcademicCalendarSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("academic_year", models.CharField(max_length=9, unique=True)),
+                ("module_data", models.JSONField()),
+                ("fetched_at", models.DateTimeField()),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
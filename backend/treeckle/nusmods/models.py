@@ -0,0 +1,14 @@
+from django.db import models
+
+from treeckle.common.models import TimestampedModel
+
+
+# Create your models here.
+class AcademicCalendarSnapshot(TimestampedModel):
+    academic_year = models.CharField(max_length=9, unique=True)
+    ## last module data successfully fetched from NUSMods for the academic year
+    module_data = models.JSONField()
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.academic_year} (fetched at {self.fetched_at})"
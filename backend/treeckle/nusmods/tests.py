@@ -0,0 +1,181 @@
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .logic import get_academic_weeks, last_refresh_attempts
+from .models import AcademicCalendarSnapshot
+
+ACADEMIC_YEAR = "2030-2031"
+
+MODULE_DATA = {
+    "semesterData": [
+        {
+            "semester": 1,
+            "timetable": [{"weeks": [1, 2, 7], "day": "Monday"}],
+        },
+        {
+            "semester": 2,
+            "timetable": [{"weeks": [1], "day": "Tuesday"}],
+        },
+    ]
+}
+
+
+class StubNUSModsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requested_paths.append(self.path)
+        time.sleep(self.server.delay)
+
+        body = json.dumps(MODULE_DATA).encode()
+
+        ## the client may have given up waiting already
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Create your tests here.
+class AcademicWeeksTestCase(TransactionTestCase):
+    """
+    Runs against a local stub of the NUSMods API. Background refreshes use their
+    own database connection, so tests are not wrapped in a transaction.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubNUSModsHandler)
+        self.server.requested_paths = []
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        settings_override = override_settings(
+            NUSMODS={
+                **settings.NUSMODS,
+                "API_URL": f"http://127.0.0.1:{self.server.server_port}/v2",
+                "ACADEMIC_YEAR": ACADEMIC_YEAR,
+                "SEMESTER_START_DATES": f"{ACADEMIC_YEAR}:2030-08-05,2031-01-13",
+                "REFERENCE_MODULE": "CS1010S",
+                "TIMEOUT": 0.5,
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        cache.clear()
+        last_refresh_attempts.clear()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_academic_weeks_and_wait(self, academic_year: str = None):
+        """
+        Returns the academic weeks and how long getting them took, after waiting
+        for any background refresh started by the call.
+        """
+        threads_before = set(threading.enumerate())
+        start = time.perf_counter()
+        academic_weeks = get_academic_weeks(academic_year)
+        elapsed = time.perf_counter() - start
+
+        for thread in set(threading.enumerate()) - threads_before:
+            thread.join(timeout=5)
+
+        return academic_weeks, elapsed
+
+    def test_first_fetch_is_stored_and_cached(self):
+        academic_weeks, _ = self.get_academic_weeks_and_wait()
+
+        self.assertEqual(
+            self.server.requested_paths, [f"/v2/{ACADEMIC_YEAR}/modules/CS1010S.json"]
+        )
+        self.assertEqual(
+            academic_weeks,
+            [
+                {
+                    "semester": 1,
+                    "weeks": [
+                        {
+                            "week": 1,
+                            "startDate": "05 Aug 2030",
+                            "endDate": "09 Aug 2030",
+                        },
+                        {
+                            "week": 2,
+                            "startDate": "12 Aug 2030",
+                            "endDate": "16 Aug 2030",
+                        },
+                        {
+                            "week": 7,
+                            "startDate": "23 Sep 2030",
+                            "endDate": "27 Sep 2030",
+                        },
+                    ],
+                },
+                {
+                    "semester": 2,
+                    "weeks": [
+                        {
+                            "week": 1,
+                            "startDate": "13 Jan 2031",
+                            "endDate": "17 Jan 2031",
+                        },
+                    ],
+                },
+            ],
+        )
+        self.assertEqual(
+            AcademicCalendarSnapshot.objects.get(
+                academic_year=ACADEMIC_YEAR
+            ).module_data,
+            MODULE_DATA,
+        )
+
+        self.assertEqual(self.get_academic_weeks_and_wait()[0], academic_weeks)
+        self.assertEqual(len(self.server.requested_paths), 1)
+
+    def test_stale_snapshot_is_served_when_nusmods_times_out(self):
+        stale_fetched_at = timezone.now() - datetime.timedelta(
+            seconds=settings.NUSMODS["TTL"] + 1
+        )
+        AcademicCalendarSnapshot.objects.create(
+            academic_year=ACADEMIC_YEAR,
+            module_data={"semesterData": MODULE_DATA["semesterData"][1:]},
+            fetched_at=stale_fetched_at,
+        )
+        self.server.delay = 1
+
+        academic_weeks, elapsed = self.get_academic_weeks_and_wait()
+
+        ## the stale snapshot is served without waiting for NUSMods, and the
+        ## background refresh times out and keeps it
+        self.assertLess(elapsed, settings.NUSMODS["TIMEOUT"])
+        self.assertEqual([semester["semester"] for semester in academic_weeks], [2])
+        self.assertEqual(len(self.server.requested_paths), 1)
+        self.assertEqual(
+            AcademicCalendarSnapshot.objects.get(
+                academic_year=ACADEMIC_YEAR
+            ).fetched_at,
+            stale_fetched_at,
+        )
+
+    def test_unknown_academic_year_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_academic_weeks("1999-2000")
+
+        self.assertEqual(self.server.requested_paths, [])
@@ -0,0 +1,66 @@
+import re
+
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.settings import api_settings
+from djangorestframework_camel_case.util import (
+    camelize,
+    camelize_re,
+    underscore_to_camel,
+)
+
+from . import constants
+
+SNAKE_CASE_KEY_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+
+def to_camel_case(key: str) -> str:
+    return re.sub(camelize_re, underscore_to_camel, key)
+
+
+## camelCase form of every snake_case key constant, computed once at import
+CAMEL_CASE_KEYS = {
+    value: to_camel_case(value)
+    for name, value in vars(constants).items()
+    if name.isupper() and isinstance(value, str) and SNAKE_CASE_KEY_PATTERN.match(value)
+}
+
+
+class CamelCaseDict(dict):
+    """
+    Dict whose keys, including those of nested values, are already camelCased.
+    """
+
+
+def camel_case_json(data: dict) -> CamelCaseDict:
+    return CamelCaseDict(
+        (CAMEL_CASE_KEYS.get(key) or to_camel_case(key), value)
+        for key, value in data.items()
+    )
+
+
+def camelize_json_field(value):
+    ## user-defined JSON is stored underscoreized by the parser, so it still
+    ## needs the recursive transform
+    return camelize(value, **api_settings.JSON_UNDERSCOREIZE)
+
+
+def is_camel_cased(data) -> bool:
+    if isinstance(data, CamelCaseDict):
+        return True
+
+    if isinstance(data, list):
+        return all(isinstance(item, CamelCaseDict) for item in data)
+
+    return False
+
+
+class PrecomputedCamelCaseJSONRenderer(CamelCaseJSONRenderer):
+    """
+    Skips the recursive camelize for payloads built by the *_to_json functions.
+    """
+
+    def render(self, data, *args, **kwargs):
+        if is_camel_cased(data):
+            return super(CamelCaseJSONRenderer, self).render(data, *args, **kwargs)
+
+        return super().render(data, *args, **kwargs)
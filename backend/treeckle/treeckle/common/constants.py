@@ -56,4 +56,14 @@ HAS_PASSWORD_AUTH = "has_password_auth"
 GOOGLE_AUTH = "google_auth"
 FACEBOOK_AUTH = "facebook_auth"
 TOKENS = "tokens"
+BOOKINGS = "bookings"
+NEXT_CURSOR = "next_cursor"
+DROPPED_DATE_TIME_RANGES = "dropped_date_time_ranges"
+REASON = "reason"
+CLASHING_DATE_TIME_RANGE = "clashing_date_time_range"
+USER_INVITES = "user_invites"
+DUPLICATE_INVITATIONS = "duplicate_invitations"
+ORGANIZATION_ID = "organization_id"
+USER_VERSION = "user_version"
+TOKENS_ONLY = "tokens_only"
 SUPPORT_EMAIL = "treeckle@googlegroups.com"
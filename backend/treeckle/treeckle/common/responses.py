@@ -0,0 +1,50 @@
+from typing import Iterable, Iterator
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+from .camel_case import PrecomputedCamelCaseJSONRenderer
+
+## number of rows fetched per database round trip when streaming a queryset
+STREAMING_CHUNK_SIZE = 500
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    Streams an iterable of dicts as a camelCased JSON array.
+
+    Each item is rendered on its own, so only one chunk of items is held in memory
+    at a time. Pass a generator over queryset.iterator(chunk_size=...) to keep
+    memory use constant regardless of the number of rows.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[dict],
+        status: int = status.HTTP_200_OK,
+        chunk_size: int = STREAMING_CHUNK_SIZE,
+    ):
+        super().__init__(
+            self.render_items(items, chunk_size),
+            content_type="application/json",
+            status=status,
+        )
+
+    @staticmethod
+    def render_items(items: Iterable[dict], chunk_size: int) -> Iterator[bytes]:
+        renderer = PrecomputedCamelCaseJSONRenderer()
+        rendered_items = []
+
+        yield b"["
+
+        for index, item in enumerate(items):
+            if index > 0:
+                rendered_items.append(b",")
+
+            rendered_items.append(renderer.render(item))
+
+            if (index + 1) % chunk_size == 0:
+                yield b"".join(rendered_items)
+                rendered_items = []
+
+        yield b"".join(rendered_items) + b"]"
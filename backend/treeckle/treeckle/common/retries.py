@@ -0,0 +1,6 @@
+from datetime import timedelta
+
+
+def get_retry_delay(attempts: int, base: int, maximum: int) -> timedelta:
+    ## exponential backoff: base, 2 * base, 4 * base, ... capped at maximum seconds
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), maximum))
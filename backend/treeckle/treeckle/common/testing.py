@@ -0,0 +1,24 @@
+import os
+import time
+from typing import Callable
+from unittest import skipUnless
+
+## benchmarks are slow and report timings rather than check behaviour,
+## so they only run when asked for
+benchmark = skipUnless(
+    os.getenv("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def measure(function: Callable, repeat: int = 5) -> float:
+    """
+    Returns the fastest of repeat runs of function, in seconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
@@ -62,6 +62,7 @@ INSTALLED_APPS = [
     "venues",
     "bookings",
     "comments",
+    "nusmods",
 ]
 
 if DEBUG:
@@ -107,10 +108,24 @@ ANYMAIL = {
     "SENDINBLUE_API_KEY": os.getenv("SENDINBLUE_API_KEY"),
 }
 
-EMAIL_BACKEND = "anymail.backends.sendinblue.EmailBackend"
+## set to django.core.mail.backends.console.EmailBackend to print emails locally
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "anymail.backends.sendinblue.EmailBackend")
 DEFAULT_FROM_EMAIL = "Treeckle <no-reply@treeckle.com>"
 SERVER_EMAIL = SUPPORT_EMAIL
 
+## Outbox drained by the sendoutboxemails management command
+EMAIL_OUTBOX = {
+    "BATCH_SIZE": int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50)),
+    "MAX_ATTEMPTS": int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 5)),
+    ## seconds before the first retry, doubled on each later attempt
+    "RETRY_BACKOFF_BASE": int(os.getenv("EMAIL_OUTBOX_RETRY_BACKOFF_BASE", 60)),
+    "RETRY_BACKOFF_MAX": int(os.getenv("EMAIL_OUTBOX_RETRY_BACKOFF_MAX", 3600)),
+    ## seconds a claimed email is hidden from other workers
+    "LEASE": int(os.getenv("EMAIL_OUTBOX_LEASE", 300)),
+    ## seconds the worker sleeps when the outbox is empty
+    "POLL_INTERVAL": int(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", 5)),
+}
+
 ## Django admin theming
 ## https://django-jazzmin.readthedocs.io/index.html
 
@@ -180,7 +195,7 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+        "treeckle.common.camel_case.PrecomputedCamelCaseJSONRenderer",
         "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
     ),
     "DEFAULT_PARSER_CLASSES": (
@@ -206,6 +221,17 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
 }
 
+## Requester cache used by users.permission_middlewares.check_access
+
+REQUESTER_CACHE = {
+    "TTL": int(os.getenv("REQUESTER_CACHE_TTL", 30)),
+    "MAX_SIZE": int(os.getenv("REQUESTER_CACHE_MAX_SIZE", 1024)),
+    ## optional alias in CACHES of a cache shared across processes
+    "SHARED_CACHE_ALIAS": os.getenv("REQUESTER_CACHE_SHARED_CACHE_ALIAS"),
+    ## how long a user's version is trusted when authorizing from token claims
+    "USER_VERSION_TTL": int(os.getenv("REQUESTER_CACHE_USER_VERSION_TTL", 30)),
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
@@ -225,12 +251,96 @@ DATABASES = {
 ## https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
 
 PASSWORD_HASHERS = [
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "authentication.hashers.ProfiledArgon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
 
+PASSWORD_HASHING = {
+    ## one of authentication.hashers.ARGON2_PROFILES
+    "PROFILE": os.getenv("PASSWORD_HASHING_PROFILE", "default"),
+    ## optional overrides of the profile's parameters
+    "TIME_COST": int(os.getenv("PASSWORD_HASHING_TIME_COST", 0)) or None,
+    "MEMORY_COST": int(os.getenv("PASSWORD_HASHING_MEMORY_COST", 0)) or None,
+    "PARALLELISM": int(os.getenv("PASSWORD_HASHING_PARALLELISM", 0)) or None,
+    ## hashes computed concurrently per process, when serving on several threads
+    "MAX_CONCURRENT": int(os.getenv("PASSWORD_HASHING_MAX_CONCURRENT", 2)),
+    ## seconds to wait for a slot before rejecting with 503
+    "TIMEOUT": float(os.getenv("PASSWORD_HASHING_TIMEOUT", 10)),
+}
+
+
+## Image uploads staged for the uploadpendingimages management command
+
+IMAGE_UPLOADS = {
+    "BATCH_SIZE": int(os.getenv("IMAGE_UPLOADS_BATCH_SIZE", 10)),
+    "MAX_ATTEMPTS": int(os.getenv("IMAGE_UPLOADS_MAX_ATTEMPTS", 5)),
+    ## seconds before the first retry, doubled on each later attempt
+    "RETRY_BACKOFF_BASE": int(os.getenv("IMAGE_UPLOADS_RETRY_BACKOFF_BASE", 30)),
+    "RETRY_BACKOFF_MAX": int(os.getenv("IMAGE_UPLOADS_RETRY_BACKOFF_MAX", 3600)),
+    ## seconds a claimed upload is hidden from other workers
+    "LEASE": int(os.getenv("IMAGE_UPLOADS_LEASE", 300)),
+    ## seconds the worker sleeps when no uploads are due
+    "POLL_INTERVAL": int(os.getenv("IMAGE_UPLOADS_POLL_INTERVAL", 2)),
+    ## bytes accepted by the multipart image upload endpoints
+    "MAX_FILE_SIZE": int(os.getenv("IMAGE_UPLOADS_MAX_FILE_SIZE", 20 * 1024 * 1024)),
+}
+
+## Image files deleted from ImageKit by the deleteimagefiles management command
+
+IMAGE_FILE_DELETIONS = {
+    ## ImageKit deletes at most 100 files per bulk delete request
+    "BATCH_SIZE": int(os.getenv("IMAGE_FILE_DELETIONS_BATCH_SIZE", 100)),
+    ## seconds before the first retry, doubled on each later attempt
+    "RETRY_BACKOFF_BASE": int(os.getenv("IMAGE_FILE_DELETIONS_RETRY_BACKOFF_BASE", 30)),
+    "RETRY_BACKOFF_MAX": int(os.getenv("IMAGE_FILE_DELETIONS_RETRY_BACKOFF_MAX", 3600)),
+    ## seconds a claimed deletion is hidden from other workers
+    "LEASE": int(os.getenv("IMAGE_FILE_DELETIONS_LEASE", 300)),
+    ## seconds the worker sleeps when no deletions are due
+    "POLL_INTERVAL": int(os.getenv("IMAGE_FILE_DELETIONS_POLL_INTERVAL", 10)),
+}
+
+## Downscaling and re-encoding of images before they are uploaded to ImageKit
+
+IMAGE_PROCESSING = {
+    "ENABLED": bool(int(os.getenv("IMAGE_PROCESSING_ENABLED", 1))),
+    ## images are shrunk to fit within these pixel dimensions
+    "MAX_WIDTH": int(os.getenv("IMAGE_PROCESSING_MAX_WIDTH", 1920)),
+    "MAX_HEIGHT": int(os.getenv("IMAGE_PROCESSING_MAX_HEIGHT", 1920)),
+    ## one of content_delivery_service.processing.IMAGE_FORMAT_EXTENSIONS
+    "FORMAT": os.getenv("IMAGE_PROCESSING_FORMAT", "WEBP"),
+    "QUALITY": int(os.getenv("IMAGE_PROCESSING_QUALITY", 80)),
+    ## processes decoding and encoding images, per server process
+    "MAX_WORKERS": int(os.getenv("IMAGE_PROCESSING_MAX_WORKERS", 2)),
+    ## images queued or being processed before new ones wait for a slot
+    "MAX_PENDING": int(os.getenv("IMAGE_PROCESSING_MAX_PENDING", 8)),
+    ## seconds to wait for a slot before rejecting with 503
+    "TIMEOUT": float(os.getenv("IMAGE_PROCESSING_TIMEOUT", 30)),
+}
+
+## NUSMods academic calendar used by nusmods.logic
+
+NUSMODS = {
+    "API_URL": os.getenv("NUSMODS_API_URL", "https://api.nusmods.com/v2"),
+    "ACADEMIC_YEAR": os.getenv("NUSMODS_ACADEMIC_YEAR", "2024-2025"),
+    ## Mondays of week 1 of semesters 1, 2 and 3 of each academic year, as
+    ## space separated "<academic year>:<date>,<date>,<date>" entries
+    "SEMESTER_START_DATES": os.getenv(
+        "NUSMODS_SEMESTER_START_DATES", "2024-2025:2024-08-05,2025-01-13,2025-05-12"
+    ),
+    "REFERENCE_MODULE": os.getenv("NUSMODS_REFERENCE_MODULE", "CS1010S"),
+    ## seconds before a request to NUSMods is abandoned
+    "TIMEOUT": float(os.getenv("NUSMODS_TIMEOUT", 5)),
+    ## seconds before a snapshot is refreshed in the background
+    "TTL": int(os.getenv("NUSMODS_TTL", 24 * 60 * 60)),
+    ## seconds between background refresh attempts while NUSMods is failing
+    "REFRESH_RETRY_INTERVAL": int(os.getenv("NUSMODS_REFRESH_RETRY_INTERVAL", 300)),
+}
+
+## seconds within which repeated logins do not rewrite a user's last_login
+LAST_LOGIN_UPDATE_INTERVAL = int(os.getenv("LAST_LOGIN_UPDATE_INTERVAL", 300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
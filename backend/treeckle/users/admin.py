@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from email_service.logic import send_user_invite_emails
 from .models import User, UserInvite
 
 
@@ -22,6 +23,15 @@ class UserInviteAdmin(admin.ModelAdmin):
         "organization__name__icontains",
         "role__icontains",
     ]
+    list_display = ["email", "organization", "role", "email_status", "email_sent_at"]
+    list_filter = ["email_status"]
+    actions = ["resend_invite_emails"]
+
+    @admin.action(description="Resend invite emails that were not sent")
+    def resend_invite_emails(self, request, queryset):
+        num_enqueued = send_user_invite_emails(queryset.select_related("organization"))
+
+        self.message_user(request, f"Queued {num_enqueued} invite email(s).")
 
 
 admin.site.register(UserInvite, UserInviteAdmin)
@@ -1,10 +1,16 @@
 import os
 import requests
 
+from datetime import timedelta
 from typing import Sequence, Iterable, Optional
 
-from django.db.models import QuerySet
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
 from django.db import transaction
+from django.utils import timezone
 
 from treeckle.common.exceptions import InternalServerError, BadRequest
 from treeckle.common.constants import (
@@ -20,8 +26,11 @@ from treeckle.common.constants import (
     HAS_PASSWORD_AUTH,
     GOOGLE_AUTH,
     FACEBOOK_AUTH,
+    REASON,
 )
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.validators import is_url
+from treeckle.common.camel_case import camel_case_json
 from organizations.models import Organization
 from authentication.models import (
     PasswordAuthentication,
@@ -29,7 +38,14 @@ from authentication.models import (
     FacebookAuthentication,
 )
 from content_delivery_service.models import Image
-from .models import User, UserInvite, PatchUserAction
+from content_delivery_service.logic.image import replace_image
+from content_delivery_service.logic.image_upload import (
+    cancel_image_uploads,
+    stage_image_file_upload,
+    stage_image_upload,
+)
+from .models import User, UserInvite, PatchUserAction, InvitationDuplicateReason
+from .requester_cache import user_version_cache
 
 
 def user_to_json(user: User, requester: User = None) -> dict:
@@ -49,48 +65,60 @@ def user_to_json(user: User, requester: User = None) -> dict:
     if requester is not None:
         data.update({IS_SELF: user == requester})
 
-    return data
+    return camel_case_json(data)
 
 
 def requester_to_json(requester: User) -> dict:
     data = user_to_json(user=requester, requester=requester)
 
     data.update(
-        {
-            HAS_PASSWORD_AUTH: hasattr(
-                requester, PasswordAuthentication.get_related_name()
-            ),
-            GOOGLE_AUTH: (
-                {
-                    EMAIL: requester.googleauthentication.email,
-                    PROFILE_IMAGE: requester.googleauthentication.profile_image,
-                }
-                if hasattr(requester, GoogleAuthentication.get_related_name())
-                else None
-            ),
-            FACEBOOK_AUTH: (
-                {
-                    EMAIL: requester.facebookauthentication.email,
-                    PROFILE_IMAGE: requester.facebookauthentication.profile_image,
-                }
-                if hasattr(requester, FacebookAuthentication.get_related_name())
-                else None
-            ),
-        }
+        camel_case_json(
+            {
+                HAS_PASSWORD_AUTH: hasattr(
+                    requester, PasswordAuthentication.get_related_name()
+                ),
+                GOOGLE_AUTH: (
+                    camel_case_json(
+                        {
+                            EMAIL: requester.googleauthentication.email,
+                            PROFILE_IMAGE: requester.googleauthentication.profile_image,
+                        }
+                    )
+                    if hasattr(requester, GoogleAuthentication.get_related_name())
+                    else None
+                ),
+                FACEBOOK_AUTH: (
+                    camel_case_json(
+                        {
+                            EMAIL: requester.facebookauthentication.email,
+                            PROFILE_IMAGE: requester.facebookauthentication.profile_image,
+                        }
+                    )
+                    if hasattr(requester, FacebookAuthentication.get_related_name())
+                    else None
+                ),
+            }
+        )
     )
 
     return data
 
 
 def user_invite_to_json(user_invite: UserInvite) -> dict:
-    return {
-        ID: user_invite.id,
-        EMAIL: user_invite.email,
-        ROLE: user_invite.role,
-        ORGANIZATION: user_invite.organization.name,
-        CREATED_AT: parse_datetime_to_ms_timestamp(user_invite.created_at),
-        UPDATED_AT: parse_datetime_to_ms_timestamp(user_invite.updated_at),
-    }
+    return camel_case_json(
+        {
+            ID: user_invite.id,
+            EMAIL: user_invite.email,
+            ROLE: user_invite.role,
+            ORGANIZATION: user_invite.organization.name,
+            CREATED_AT: parse_datetime_to_ms_timestamp(user_invite.created_at),
+            UPDATED_AT: parse_datetime_to_ms_timestamp(user_invite.updated_at),
+        }
+    )
+
+
+def duplicate_invitation_to_json(email: str, reason: InvitationDuplicateReason) -> dict:
+    return camel_case_json({EMAIL: email, REASON: reason})
 
 
 def get_users(*args, **kwargs) -> QuerySet[User]:
@@ -101,19 +129,116 @@ def get_user_invites(*args, **kwargs) -> QuerySet[UserInvite]:
     return UserInvite.objects.filter(*args, **kwargs)
 
 
-def get_valid_invitations(invitations: dict) -> Sequence[tuple[str, str]]:
-    existing_user_emails = User.objects.values_list("email", flat=True)
-    existing_user_invite_emails = UserInvite.objects.values_list("email", flat=True)
+def email_matches(email: str) -> Exact:
+    ## compares LOWER(email) so that the Lower("email") indexes are used,
+    ## which __iexact (UPPER on postgres) would not
+    return Exact(Lower("email"), email.lower())
+
+
+def get_single_by_email(queryset: QuerySet, email: str):
+    """
+    Gets the single object in queryset whose email matches case-insensitively.
+
+    Rows created before emails were lowercased may differ only in case. Among
+    those, the one matching email exactly is returned; if none does, the email is
+    ambiguous and queryset.model.DoesNotExist is raised as if nothing matched.
+    """
+    matches = list(queryset.filter(email_matches(email)))
+
+    if len(matches) > 1:
+        matches = [match for match in matches if match.email == email]
+
+    if len(matches) != 1:
+        raise queryset.model.DoesNotExist
+
+    return matches[0]
+
+
+def update_last_login(user: User) -> bool:
+    """
+    Records a login, writing last_login at most once per LAST_LOGIN_UPDATE_INTERVAL.
+
+    The write is a single-column conditional UPDATE, so concurrent logins by the
+    same user result in at most one write. Returns whether a write was made.
+    """
+    current_time = timezone.now()
+    stale_before = current_time - timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL)
+
+    if user.last_login is not None and user.last_login > stale_before:
+        return False
+
+    num_updated = (
+        get_users(id=user.id)
+        .filter(Q(last_login__isnull=True) | Q(last_login__lte=stale_before))
+        .update(last_login=current_time)
+    )
+
+    user.last_login = current_time
+
+    return num_updated > 0
+
+
+def get_user_version(user_id: int) -> Optional[int]:
+    version = user_version_cache.get(user_id)
+
+    if version is not None:
+        return version
+
+    version = get_users(id=user_id).values_list("version", flat=True).first()
+
+    if version is not None:
+        user_version_cache.set(user_id, version)
 
-    existing_emails_set = set(existing_user_emails) | set(existing_user_invite_emails)
+    return version
 
-    valid_invitations = [
-        (invitation["email"].lower(), invitation["role"])
-        for invitation in invitations
-        if invitation["email"].lower() not in existing_emails_set
-    ]
 
-    return valid_invitations
+def get_valid_invitations(
+    invitations: Iterable[dict],
+) -> tuple[Sequence[tuple[str, str]], Sequence[tuple[str, InvitationDuplicateReason]]]:
+    """
+    Split invitations into those to be created and duplicates with their reason.
+
+    Only the submitted emails are looked up, case-insensitively, so the cost does
+    not grow with the number of existing users and invites.
+    """
+    emails = {invitation["email"].lower() for invitation in invitations}
+
+    existing_user_emails = set(
+        User.objects.annotate(lower_email=Lower("email"))
+        .filter(lower_email__in=emails)
+        .values_list("lower_email", flat=True)
+    )
+    existing_user_invite_emails = set(
+        UserInvite.objects.annotate(lower_email=Lower("email"))
+        .filter(lower_email__in=emails)
+        .values_list("lower_email", flat=True)
+    )
+
+    valid_invitations = []
+    duplicate_invitations = []
+    seen_emails = set()
+
+    for invitation in invitations:
+        email = invitation["email"].lower()
+
+        if email in existing_user_emails:
+            duplicate_invitations.append(
+                (email, InvitationDuplicateReason.EXISTING_USER)
+            )
+        elif email in existing_user_invite_emails:
+            duplicate_invitations.append(
+                (email, InvitationDuplicateReason.EXISTING_USER_INVITE)
+            )
+        elif email in seen_emails:
+            duplicate_invitations.append(
+                (email, InvitationDuplicateReason.REPEATED_IN_REQUEST)
+            )
+        else:
+            valid_invitations.append((email, invitation["role"]))
+
+        seen_emails.add(email)
+
+    return valid_invitations, duplicate_invitations
 
 
 def create_user_invites(
@@ -132,6 +257,21 @@ FACEBOOK_APP_ID = os.getenv("FACEBOOK_APP_ID")
 FACEBOOK_APP_SECRET = os.getenv("FACEBOOK_APP_SECRET")
 
 
+@transaction.atomic
+def update_requester_profile_image_file(
+    requester: User, image_file: UploadedFile
+) -> User:
+    ## the uploadpendingimages worker uploads the image, swaps it in
+    ## and releases the current one
+    stage_image_file_upload(
+        target=requester,
+        image_file=image_file,
+        folder=requester.organization.name,
+    )
+
+    return requester
+
+
 @transaction.atomic
 def update_requester(
     requester: User, action: PatchUserAction, payload: Optional[dict]
@@ -159,14 +299,8 @@ def update_requester(
 
     if action == PatchUserAction.PROFILE_IMAGE:
         if payload is None:
-            old_profile_image = requester.profile_image
-            requester.profile_image = None
-
-            requester.save()
-
-            ## only delete if requester can be updated successfully
-            if old_profile_image:
-                old_profile_image.delete()
+            cancel_image_uploads(requester)
+            replace_image(requester, None)
 
             return requester
 
@@ -175,29 +309,23 @@ def update_requester(
 
         image_data = serializer.validated_data.get("profile_image")
 
-        if requester.profile_image:
-            ## make a copy so that we can delete image from server after all db operations
-            old_profile_image = requester.profile_image.copy()
-            profile_image = requester.profile_image
+        if is_url(image_data):
+            ## external urls are stored as is, without uploading
+            cancel_image_uploads(requester)
+            replace_image(
+                requester,
+                Image.objects.create(
+                    organization=requester.organization, image_url=image_data
+                ),
+            )
         else:
-            old_profile_image = None
-            profile_image = Image()
-
-        profile_image.organization = requester.organization
-        profile_image.image_url = image_data
-
-        ## need to upload to server first before saving
-        ## so that image_id can be retrieved and stored
-        profile_image.upload_image_to_server()
-
-        profile_image.save()
-
-        requester.profile_image = profile_image
-
-        requester.save()
-
-        if old_profile_image:
-            old_profile_image.delete_image_from_server()
+            ## the uploadpendingimages worker uploads the image, swaps it in
+            ## and releases the current one
+            stage_image_upload(
+                target=requester,
+                image_data=image_data,
+                folder=requester.organization.name,
+            )
 
         return requester
 
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.20 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+def mark_existing_user_invites_sent(apps, schema_editor):
+    ## invites created before the outbox were emailed on creation
+    UserInvite = apps.get_model("users", "UserInvite")
+    UserInvite.objects.update(email_status="SENT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0019_user_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userinvite",
+            name="email_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="userinvite",
+            name="email_status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("SENT", "Sent"),
+                    ("FAILED", "Failed"),
+                ],
+                default="PENDING",
+                max_length=50,
+            ),
+        ),
+        migrations.RunPython(
+            mark_existing_user_invites_sent, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-18 03:05
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0020_user_invite_email_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="user_lower_email_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userinvite",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="user_invite_lower_email_idx",
+            ),
+        ),
+    ]
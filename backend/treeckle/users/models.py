@@ -1,9 +1,15 @@
+from typing import Optional
+
 from django.db import models
-from django.db.models.signals import post_delete
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
 
 from treeckle.common.models import TimestampedModel
 from organizations.models import Organization
-from content_delivery_service.models import Image
+from content_delivery_service.models import Image, ImageHolder
+from content_delivery_service.logic.image import release_image
+from email_service.models import OutboxEmailStatus
+from .requester_cache import requester_cache, user_version_cache
 
 
 # Create your models here.
@@ -26,7 +32,17 @@ class Role(models.TextChoices):
 MAX_ROLE_LENGTH = max(map(len, Role))
 
 
-class User(TimestampedModel):
+class InvitationDuplicateReason(models.TextChoices):
+    EXISTING_USER = "EXISTING_USER"
+    EXISTING_USER_INVITE = "EXISTING_USER_INVITE"
+    REPEATED_IN_REQUEST = "REPEATED_IN_REQUEST"
+
+
+## fields embedded as token claims
+AUTHORIZATION_FIELD_NAMES = ("role", "organization_id")
+
+
+class User(ImageHolder, TimestampedModel):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
@@ -37,19 +53,67 @@ class User(TimestampedModel):
         Image, null=True, blank=True, on_delete=models.SET_NULL
     )
     last_login = models.DateTimeField(null=True, blank=True)
+    ## incremented whenever role or organization changes, so that tokens
+    ## carrying older claims are no longer trusted
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(Lower("email"), name="user_lower_email_idx")]
 
     def __str__(self):
         return f"{self.name} | {self.email} ({self.organization})"
 
+    def get_image_organization(self) -> Organization:
+        return self.organization
+
+    def get_image(self) -> Optional[Image]:
+        return self.profile_image
+
+    def set_image(self, image: Optional[Image]):
+        self.profile_image = image
+        self.save(update_fields=["profile_image", "updated_at"])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        instance._loaded_authorization_values = {
+            field_name: value
+            for field_name, value in zip(field_names, values)
+            if field_name in AUTHORIZATION_FIELD_NAMES
+        }
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded_authorization_values = getattr(self, "_loaded_authorization_values", {})
+
+        if any(
+            getattr(self, field_name) != value
+            for field_name, value in loaded_authorization_values.items()
+        ):
+            self.version += 1
+
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+
+        super().save(*args, **kwargs)
+
+        self._loaded_authorization_values = {
+            field_name: getattr(self, field_name)
+            for field_name in AUTHORIZATION_FIELD_NAMES
+        }
+
 
 def user_cleanup(sender, instance: User, **kwargs):
-    if not instance.profile_image:
+    if not instance.profile_image_id:
         return
 
-    instance.profile_image.delete()
+    release_image(instance.profile_image)
 
 
-## set up listener to delete profile image when a user is deleted
+## set up listener to release profile image when a user is deleted
 post_delete.connect(
     user_cleanup,
     sender=User,
@@ -57,12 +121,40 @@ post_delete.connect(
 )
 
 
+def invalidate_cached_requester(sender, instance: User, **kwargs):
+    requester_cache.invalidate(instance.id)
+    user_version_cache.invalidate(instance.id)
+
+
+## set up listeners to drop cached requester when a user is updated or deleted
+post_save.connect(
+    invalidate_cached_requester,
+    sender=User,
+    dispatch_uid="users.user.invalidate_cached_requester_on_save",
+)
+post_delete.connect(
+    invalidate_cached_requester,
+    sender=User,
+    dispatch_uid="users.user.invalidate_cached_requester_on_delete",
+)
+
+
 class UserInvite(TimestampedModel):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     email = models.EmailField(unique=True)
     role = models.CharField(
         max_length=MAX_ROLE_LENGTH, choices=Role.choices, default=Role.RESIDENT
     )
+    ## delivery state of the invite email, kept in sync by the outbox worker
+    email_status = models.CharField(
+        max_length=50,
+        choices=OutboxEmailStatus.choices,
+        default=OutboxEmailStatus.PENDING,
+    )
+    email_sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(Lower("email"), name="user_invite_lower_email_idx")]
 
     def __str__(self):
         return f"{self.email} ({self.organization})"
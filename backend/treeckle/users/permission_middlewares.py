@@ -1,27 +1,85 @@
+from typing import Optional
+
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 
+from treeckle.common.constants import ROLE, ORGANIZATION_ID, USER_VERSION
+from organizations.models import Organization
 from .models import User, Role
-from .logic import get_users
+from .logic import get_users, get_user_version
+from .requester_cache import requester_cache
 
 
 def check_access(*allowed_roles: Role):
     def _method_wrapper(view_method):
         def _arguments_wrapper(instance, request, *args, **kwargs):
             requester_id = request.user.id
+            requester = requester_cache.get(requester_id)
 
-            try:
-                requester = (
-                    get_users(id=requester_id)
-                    .select_related("organization", "profile_image")
-                    .get()
-                )
+            if requester is None:
+                try:
+                    requester = (
+                        get_users(id=requester_id)
+                        .select_related("organization", "profile_image")
+                        .get()
+                    )
+
+                except User.DoesNotExist:
+                    raise AuthenticationFailed(
+                        detail="Invalid user.",
+                        code="invalid_user",
+                    )
+
+                requester_cache.set(requester)
 
-            except User.DoesNotExist:
-                raise AuthenticationFailed(
-                    detail="Invalid user.",
-                    code="invalid_user",
+            if requester.role not in allowed_roles:
+                raise PermissionDenied(
+                    detail="No permission", code="invalid_permission"
                 )
 
+            return view_method(instance, request, requester=requester, *args, **kwargs)
+
+        return _arguments_wrapper
+
+    return _method_wrapper
+
+
+def get_token_requester(token_user) -> Optional[User]:
+    role = token_user.token.get(ROLE)
+    organization_id = token_user.token.get(ORGANIZATION_ID)
+    version = token_user.token.get(USER_VERSION)
+
+    if role is None or organization_id is None or version is None:
+        return None
+
+    ## claims are stale if role or organization has changed since token was issued
+    if get_user_version(token_user.id) != version:
+        return None
+
+    requester = User(
+        id=token_user.id, role=role, organization_id=organization_id, version=version
+    )
+    requester.organization = Organization(id=organization_id)
+
+    return requester
+
+
+def check_token_access(*allowed_roles: Role):
+    """
+    Authorizes from token claims without loading the requester.
+
+    Only for views that use nothing but the requester's id, role and organization
+    id. Falls back to check_access when the token has no or stale claims.
+    """
+
+    def _method_wrapper(view_method):
+        checked_view_method = check_access(*allowed_roles)(view_method)
+
+        def _arguments_wrapper(instance, request, *args, **kwargs):
+            requester = get_token_requester(request.user)
+
+            if requester is None:
+                return checked_view_method(instance, request, *args, **kwargs)
+
             if requester.role not in allowed_roles:
                 raise PermissionDenied(
                     detail="No permission", code="invalid_permission"
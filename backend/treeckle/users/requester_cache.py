@@ -0,0 +1,151 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+
+REQUESTER_CACHE_KEY_PREFIX = "requester"
+USER_VERSION_CACHE_KEY_PREFIX = "user_version"
+
+
+class RequesterCache:
+    """
+    Caches requester users (with organization and profile image) by user id.
+
+    Lookups go to a per-process LRU first, then to an optional shared Django cache.
+    Entries are pickled so that each request gets its own User instance. Saving or
+    deleting a user invalidates its entry through signals; other processes rely on
+    the short TTL.
+    """
+
+    def __init__(
+        self, ttl: int, max_size: int, shared_cache_alias: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.shared_cache_alias = shared_cache_alias
+        self.local_cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def shared_cache(self):
+        return caches[self.shared_cache_alias] if self.shared_cache_alias else None
+
+    def get_cache_key(self, user_id: int) -> str:
+        return f"{REQUESTER_CACHE_KEY_PREFIX}:{user_id}"
+
+    def get(self, user_id: int):
+        with self.lock:
+            entry = self.local_cache.get(user_id)
+
+            if entry is not None:
+                expiry, pickled_user = entry
+
+                if expiry > time.monotonic():
+                    self.local_cache.move_to_end(user_id)
+                    self.hits += 1
+                    return pickle.loads(pickled_user)
+
+                del self.local_cache[user_id]
+
+        pickled_user = (
+            self.shared_cache.get(self.get_cache_key(user_id))
+            if self.shared_cache is not None
+            else None
+        )
+
+        with self.lock:
+            if pickled_user is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.set_local(user_id, pickled_user)
+
+        return pickle.loads(pickled_user)
+
+    def set_local(self, user_id: int, pickled_user: bytes) -> None:
+        self.local_cache[user_id] = (time.monotonic() + self.ttl, pickled_user)
+        self.local_cache.move_to_end(user_id)
+
+        while len(self.local_cache) > self.max_size:
+            self.local_cache.popitem(last=False)
+
+    def set(self, user) -> None:
+        pickled_user = pickle.dumps(user)
+
+        with self.lock:
+            self.set_local(user.id, pickled_user)
+
+        if self.shared_cache is not None:
+            self.shared_cache.set(
+                self.get_cache_key(user.id), pickled_user, timeout=self.ttl
+            )
+
+    def invalidate(self, user_id: int) -> None:
+        with self.lock:
+            self.local_cache.pop(user_id, None)
+
+        if self.shared_cache is not None:
+            self.shared_cache.delete(self.get_cache_key(user_id))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.local_cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self.local_cache),
+            }
+
+
+class UserVersionCache:
+    """
+    Caches the version of each user, used to check token claims without loading
+    the user. Uses the shared cache when configured, else the default cache.
+    """
+
+    def __init__(self, ttl: int, cache_alias: Optional[str] = None):
+        self.ttl = ttl
+        self.cache_alias = cache_alias or DEFAULT_CACHE_ALIAS
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_cache_key(self, user_id: int) -> str:
+        return f"{USER_VERSION_CACHE_KEY_PREFIX}:{user_id}"
+
+    def get(self, user_id: int) -> Optional[int]:
+        return self.cache.get(self.get_cache_key(user_id))
+
+    def set(self, user_id: int, version: int) -> None:
+        self.cache.set(self.get_cache_key(user_id), version, timeout=self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        self.cache.delete(self.get_cache_key(user_id))
+
+
+requester_cache = RequesterCache(
+    ttl=settings.REQUESTER_CACHE["TTL"],
+    max_size=settings.REQUESTER_CACHE["MAX_SIZE"],
+    shared_cache_alias=settings.REQUESTER_CACHE["SHARED_CACHE_ALIAS"],
+)
+
+user_version_cache = UserVersionCache(
+    ttl=settings.REQUESTER_CACHE["USER_VERSION_TTL"],
+    cache_alias=settings.REQUESTER_CACHE["SHARED_CACHE_ALIAS"],
+)
@@ -10,6 +10,8 @@ class PostSingleUserInviteSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserInvite
         fields = ["email", "role"]
+        ## existing invites are reported as duplicates instead of failing the request
+        extra_kwargs = {"email": {"validators": []}}
 
 
 class PostUserInviteSerializer(serializers.Serializer):
@@ -1 +1,211 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from treeckle.common.testing import benchmark, measure
+from organizations.models import Organization
+from authentication.logic import get_tokens
+from .models import User, UserInvite, Role
+from .permission_middlewares import check_token_access
+from .requester_cache import requester_cache
+from .views import UserInvitesView
+
+
 # Create your tests here.
+class UserInvitesTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Organization")
+        self.admin = User.objects.create(
+            organization=self.organization,
+            name="Admin",
+            email="admin@example.com",
+            role=Role.ADMIN,
+        )
+        UserInvite.objects.create(
+            organization=self.organization, email="invited@example.com"
+        )
+
+    def post_invitations(self, invitations):
+        request = APIRequestFactory().post(
+            "/users/invite", {"invitations": invitations}, format="json"
+        )
+        force_authenticate(request, user=TokenUser(AccessToken.for_user(self.admin)))
+
+        return UserInvitesView.as_view()(request)
+
+
+class UserInvitesViewTestCase(UserInvitesTestCase):
+    def test_duplicate_invitations_are_returned_with_reasons(self):
+        response = self.post_invitations(
+            [
+                {"email": "new@example.com", "role": Role.RESIDENT},
+                {"email": "new@example.com", "role": Role.ORGANIZER},
+                {"email": "admin@example.com", "role": Role.RESIDENT},
+                {"email": "invited@example.com", "role": Role.RESIDENT},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            [user_invite["email"] for user_invite in response.data["userInvites"]],
+            ["new@example.com"],
+        )
+        self.assertCountEqual(
+            response.data["duplicateInvitations"],
+            [
+                {"email": "new@example.com", "reason": "REPEATED_IN_REQUEST"},
+                {"email": "admin@example.com", "reason": "EXISTING_USER"},
+                {"email": "invited@example.com", "reason": "EXISTING_USER_INVITE"},
+            ],
+        )
+
+
+class UserInvitesCostTestCase(UserInvitesTestCase):
+    """
+    Only the submitted emails are looked up, so the cost of an invite request
+    does not grow with the number of existing users.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.other_organization = Organization.objects.create(name="Other Organization")
+
+    def create_users(self, count: int):
+        organization = self.other_organization
+        start = User.objects.count()
+
+        User.objects.bulk_create(
+            User(
+                organization=organization,
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+            )
+            for i in range(start, start + count)
+        )
+        UserInvite.objects.bulk_create(
+            UserInvite(organization=organization, email=f"invite{i}@example.com")
+            for i in range(start, start + count)
+        )
+
+    def post_new_invitations(self, batch: str):
+        invitations = [
+            {"email": f"{batch}{i}@example.com", "role": Role.RESIDENT}
+            for i in range(5)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_invitations(invitations)
+
+        self.assertEqual(response.status_code, 201, response.data)
+
+        return [query["sql"] for query in context.captured_queries]
+
+    def test_queries_do_not_grow_with_existing_users(self):
+        self.create_users(10)
+        self.post_new_invitations("warmup")
+        queries = self.post_new_invitations("few")
+
+        self.create_users(500)
+        self.assertEqual(len(self.post_new_invitations("many")), len(queries))
+
+        ## existing emails are never loaded wholesale
+        for sql in queries:
+            if sql.startswith("SELECT") and (
+                f'FROM "{User._meta.db_table}"' in sql
+                or f'FROM "{UserInvite._meta.db_table}"' in sql
+            ):
+                self.assertIn("WHERE", sql)
+
+    @benchmark
+    def test_benchmark_invites_against_existing_users(self):
+        timings = []
+
+        for num_users in [100, 10_000, 100_000]:
+            self.create_users(num_users - User.objects.count())
+            timings.append(
+                (
+                    User.objects.count(),
+                    measure(lambda: self.post_new_invitations(f"batch{num_users}"), 1),
+                )
+            )
+
+        print(
+            "\ninvite request: "
+            + ", ".join(
+                f"{num_users} users {timing * 1000:.1f}ms"
+                for num_users, timing in timings
+            )
+        )
+
+
+class AdminOnlyView(APIView):
+    @check_token_access(Role.ADMIN)
+    def get(self, request, requester: User):
+        return Response(
+            {
+                "id": requester.id,
+                "role": requester.role,
+                "organization_id": requester.organization.id,
+            }
+        )
+
+
+class CheckTokenAccessTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Organization")
+        self.admin = User.objects.create(
+            organization=self.organization,
+            name="Admin",
+            email="admin@example.com",
+            role=Role.ADMIN,
+        )
+        requester_cache.clear()
+
+    def get(self, access_token: str):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=TokenUser(AccessToken(access_token)))
+
+        return AdminOnlyView.as_view()(request)
+
+    def test_requester_is_authorized_from_claims_without_queries(self):
+        access_token = get_tokens(self.admin)["access"]
+        ## warms the user version cache
+        self.get(access_token)
+
+        with self.assertNumQueries(0):
+            response = self.get(access_token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {
+                "id": self.admin.id,
+                "role": Role.ADMIN,
+                "organization_id": self.organization.id,
+            },
+        )
+
+    def test_stale_claims_fall_back_to_the_current_role(self):
+        access_token = get_tokens(self.admin)["access"]
+        self.get(access_token)
+
+        self.admin.role = Role.RESIDENT
+        self.admin.save()
+
+        response = self.get(access_token)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_token_without_claims_falls_back_to_the_database(self):
+        access_token = str(RefreshToken.for_user(self.admin).access_token)
+
+        with self.assertNumQueries(1):
+            response = self.get(access_token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["role"], Role.ADMIN)
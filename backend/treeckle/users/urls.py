@@ -5,12 +5,24 @@ from .views import (
     SingleUserInviteView,
     UsersView,
     RequesterView,
+    RequesterProfileImageView,
     SingleUserView,
+    RequesterCacheStatsView,
 )
 
 urlpatterns = [
     path("", UsersView.as_view(), name="users"),
     path("self", RequesterView.as_view(), name="self"),
+    path(
+        "self/profileimage",
+        RequesterProfileImageView.as_view(),
+        name="self_profile_image",
+    ),
+    path(
+        "requester-cache-stats",
+        RequesterCacheStatsView.as_view(),
+        name="requester_cache_stats",
+    ),
     path("invite", UserInvitesView.as_view(), name="user_invites"),
     path(
         "invite/<int:user_invite_id>",
@@ -3,20 +3,28 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
+from treeckle.common.camel_case import camel_case_json
+from treeckle.common.constants import USER_INVITES, DUPLICATE_INVITATIONS
 from treeckle.common.exceptions import BadRequest
+from treeckle.common.responses import StreamingJSONListResponse, STREAMING_CHUNK_SIZE
+from content_delivery_service.parsers import TemporaryFileMultiPartParser
+from content_delivery_service.serializers import ImageFileSerializer
 from email_service.logic import send_user_invite_emails
 from .logic import (
     get_user_invites,
     get_users,
     user_invite_to_json,
+    duplicate_invitation_to_json,
     user_to_json,
     get_valid_invitations,
     create_user_invites,
     requester_to_json,
     update_requester,
+    update_requester_profile_image_file,
 )
 from .models import User, UserInvite, Role
 from .permission_middlewares import check_access
+from .requester_cache import requester_cache
 from .middlewares import (
     check_requester_user_invite_same_organization,
     check_requester_user_same_organization,
@@ -69,17 +77,22 @@ from .serializers import (
         },
         responses={
             201: {
-                "description": "User invitations created and emails sent successfully",
-                "example": [
-                    {
-                        "id": 2,
-                        "email": "newuser@example.com",
-                        "role": "RESIDENT",
-                        "organization": "Test Organization",
-                        "createdAt": 1647875400000,
-                        "updatedAt": 1647875400000,
-                    }
-                ],
+                "description": "User invitations created and emails sent successfully, and the invitations skipped as duplicates",
+                "example": {
+                    "userInvites": [
+                        {
+                            "id": 2,
+                            "email": "newuser@example.com",
+                            "role": "RESIDENT",
+                            "organization": "Test Organization",
+                            "createdAt": 1647875400000,
+                            "updatedAt": 1647875400000,
+                        }
+                    ],
+                    "duplicateInvitations": [
+                        {"email": "organizer@example.com", "reason": "EXISTING_USER"}
+                    ],
+                },
             },
             400: {"description": "Invalid invitation data"},
             401: {"description": "Authentication required"},
@@ -100,12 +113,14 @@ class UserInvitesView(APIView):
             organization=requester.organization
         ).select_related("organization")
 
-        data = [
+        data = (
             user_invite_to_json(user_invite)
-            for user_invite in same_organization_user_invites
-        ]
+            for user_invite in same_organization_user_invites.iterator(
+                chunk_size=STREAMING_CHUNK_SIZE
+            )
+        )
 
-        return Response(data, status=status.HTTP_200_OK)
+        return StreamingJSONListResponse(data, status=status.HTTP_200_OK)
 
     @check_access(Role.ADMIN)
     def post(self, request, requester: User):
@@ -114,6 +129,7 @@ class UserInvitesView(APIView):
 
         Validates invitation data, filters out existing users/invitations,
         creates new user invitations, and sends email invitations to valid users.
+        The filtered out invitations are returned with the reason they were skipped.
         """
         serializer = PostUserInviteSerializer(data=request.data)
 
@@ -122,8 +138,8 @@ class UserInvitesView(APIView):
         ## shape: [{email:, role:}]
         invitations = serializer.validated_data.get("invitations", [])
 
-        ## shape: [(email, role)]
-        valid_invitations = get_valid_invitations(invitations)
+        ## shape: [(email, role)], [(email, reason)]
+        valid_invitations, duplicate_invitations = get_valid_invitations(invitations)
 
         new_user_invites = create_user_invites(
             valid_invitations=valid_invitations,
@@ -132,7 +148,17 @@ class UserInvitesView(APIView):
 
         send_user_invite_emails(user_invites=new_user_invites)
 
-        data = [user_invite_to_json(user_invite) for user_invite in new_user_invites]
+        data = camel_case_json(
+            {
+                USER_INVITES: [
+                    user_invite_to_json(user_invite) for user_invite in new_user_invites
+                ],
+                DUPLICATE_INVITATIONS: [
+                    duplicate_invitation_to_json(email=email, reason=reason)
+                    for email, reason in duplicate_invitations
+                ],
+            }
+        )
 
         return Response(data, status=status.HTTP_201_CREATED)
 
@@ -269,12 +295,14 @@ class UsersView(APIView):
             organization=requester.organization
         ).select_related("organization", "profile_image")
 
-        data = [
+        data = (
             user_to_json(user=user, requester=requester)
-            for user in same_organization_users
-        ]
+            for user in same_organization_users.iterator(
+                chunk_size=STREAMING_CHUNK_SIZE
+            )
+        )
 
-        return Response(data, status=status.HTTP_200_OK)
+        return StreamingJSONListResponse(data, status=status.HTTP_200_OK)
 
 
 @extend_schema_view(
@@ -416,6 +444,52 @@ class RequesterView(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
 
+@extend_schema_view(
+    put=extend_schema(
+        summary="Upload Profile Image",
+        description="Replace the current user's profile image with an uploaded file, sent as multipart/form-data in the image field. The file is queued and uploaded to the CDN in the background, instead of being sent as base64 JSON.",
+        tags=["Users"],
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"image": {"type": "string", "format": "binary"}},
+                "required": ["image"],
+            }
+        },
+        responses={
+            202: {
+                "description": "Current user, whose profile image is replaced once the upload completes"
+            },
+            400: {"description": "Missing, oversized or non-image file"},
+            401: {"description": "Authentication required"},
+        },
+    ),
+)
+class RequesterProfileImageView(APIView):
+    parser_classes = [TemporaryFileMultiPartParser]
+
+    @check_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
+    def put(self, request, requester: User):
+        """
+        Upload a new profile image for the current user.
+
+        The uploaded file is queued for the uploadpendingimages worker, which
+        uploads it to the CDN and releases the previous image once the new one
+        is in place.
+        """
+        serializer = ImageFileSerializer(data=request.data)
+
+        serializer.is_valid(raise_exception=True)
+
+        updated_requester = update_requester_profile_image_file(
+            requester=requester, image_file=serializer.validated_data["image"]
+        )
+
+        data = requester_to_json(updated_requester)
+
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
 @extend_schema_view(
     get=extend_schema(
         summary="Get User Details",
@@ -595,3 +669,37 @@ class SingleUserView(APIView):
         user.delete()
 
         return Response(data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Get Requester Cache Stats",
+        description="Retrieve hit/miss statistics of the requester cache in the worker process serving the request. Admin access required.",
+        tags=["Users"],
+        responses={
+            200: {
+                "description": "Requester cache statistics",
+                "example": {
+                    "hits": 950,
+                    "misses": 50,
+                    "hitRate": 0.95,
+                    "size": 42,
+                },
+            },
+            401: {"description": "Authentication required"},
+            403: {"description": "Admin access required"},
+        },
+    )
+)
+class RequesterCacheStatsView(APIView):
+    @check_access(Role.ADMIN)
+    def get(self, request, requester: User):
+        """
+        Retrieve requester cache statistics.
+
+        Statistics are kept per worker process, so they only reflect the
+        process that serves this request.
+        """
+        data = requester_cache.get_stats()
+
+        return Response(data, status=status.HTTP_200_OK)
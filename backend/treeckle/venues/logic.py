@@ -19,6 +19,7 @@ from treeckle.common.constants import (
     VENUE,
 )
 from treeckle.common.parsers import parse_datetime_to_ms_timestamp
+from treeckle.common.camel_case import camel_case_json, camelize_json_field
 from organizations.models import Organization
 from .models import VenueCategory, Venue, BookingNotificationSubscription
 
@@ -40,24 +41,26 @@ def venue_to_json(venue: Venue, full_details: bool = False) -> dict:
                 IC_NAME: venue.ic_name,
                 IC_EMAIL: venue.ic_email,
                 IC_CONTACT_NUMBER: venue.ic_contact_number,
-                FORM_FIELD_DATA: venue.form_field_data,
+                FORM_FIELD_DATA: camelize_json_field(venue.form_field_data),
             }
         )
 
-    return data
+    return camel_case_json(data)
 
 
 def booking_notification_subscription_to_json(
     subscription: BookingNotificationSubscription,
 ) -> dict:
-    return {
-        ID: subscription.id,
-        CREATED_AT: parse_datetime_to_ms_timestamp(subscription.created_at),
-        UPDATED_AT: parse_datetime_to_ms_timestamp(subscription.updated_at),
-        NAME: subscription.name,
-        EMAIL: subscription.email,
-        VENUE: venue_to_json(subscription.venue, full_details=False),
-    }
+    return camel_case_json(
+        {
+            ID: subscription.id,
+            CREATED_AT: parse_datetime_to_ms_timestamp(subscription.created_at),
+            UPDATED_AT: parse_datetime_to_ms_timestamp(subscription.updated_at),
+            NAME: subscription.name,
+            EMAIL: subscription.email,
+            VENUE: venue_to_json(subscription.venue, full_details=False),
+        }
+    )
 
 
 def get_venue_categories(*args, **kwargs) -> QuerySet[VenueCategory]:
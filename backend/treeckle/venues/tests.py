@@ -1 +1,75 @@
+import statistics
+import time
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from treeckle.common.testing import benchmark
+from organizations.models import Organization
+from users.models import User, Role
+from users.requester_cache import requester_cache
+from authentication.logic import get_tokens
+from .models import Venue, VenueCategory
+
+
 # Create your tests here.
+@benchmark
+class VenuesViewBenchmarkTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Organization")
+        self.admin = User.objects.create(
+            organization=self.organization,
+            name="Admin",
+            email="admin@example.com",
+            role=Role.ADMIN,
+        )
+        category = VenueCategory.objects.create(
+            organization=self.organization, name="Category"
+        )
+        Venue.objects.bulk_create(
+            Venue(
+                organization=self.organization,
+                name=f"Venue {i}",
+                category=category,
+                form_field_data=[],
+            )
+            for i in range(20)
+        )
+
+    def get_latencies(self, access_token: str, clear_requester_cache: bool):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        latencies = []
+
+        for _ in range(500):
+            if clear_requester_cache:
+                requester_cache.clear()
+
+            start = time.perf_counter()
+            response = client.get("/api/venues/")
+            latencies.append(time.perf_counter() - start)
+
+            self.assertEqual(response.status_code, 200)
+
+        percentiles = statistics.quantiles(latencies, n=100)
+
+        return percentiles[49], percentiles[98]
+
+    def test_benchmark_venues_latency(self):
+        ## a token without claims goes through check_access, which loads the
+        ## requester whenever it is not cached
+        fast_path = self.get_latencies(
+            get_tokens(self.admin)["access"], clear_requester_cache=False
+        )
+        database_path = self.get_latencies(
+            str(RefreshToken.for_user(self.admin).access_token),
+            clear_requester_cache=True,
+        )
+
+        print(
+            f"\nGET /venues/ p50/p99: token claims "
+            f"{fast_path[0] * 1000:.2f}/{fast_path[1] * 1000:.2f}ms, "
+            f"requester lookup "
+            f"{database_path[0] * 1000:.2f}/{database_path[1] * 1000:.2f}ms"
+        )
@@ -6,7 +6,7 @@ from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 from treeckle.common.exceptions import Conflict
-from users.permission_middlewares import check_access
+from users.permission_middlewares import check_access, check_token_access
 from users.models import Role, User
 from .serializers import (
     GetVenueSerializer,
@@ -54,7 +54,7 @@ from .logic import (
     )
 )
 class VenueCategoriesView(APIView):
-    @check_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
+    @check_token_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
     def get(self, request, requester: User):
         """
         Get all venue categories in the user's organization.
@@ -352,7 +352,7 @@ class SingleBookingNotificationSubscriptionView(APIView):
     ),
 )
 class VenuesView(APIView):
-    @check_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
+    @check_token_access(Role.RESIDENT, Role.ORGANIZER, Role.ADMIN)
     def get(self, request, requester: User):
         """
         Get venues in the organization.
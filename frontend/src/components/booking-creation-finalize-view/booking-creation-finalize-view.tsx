@@ -66,7 +66,10 @@ function BookingCreationFinalizeView() {
             }
 
             try {
-              const createdBookings = await createBookings({
+              const {
+                bookings: createdBookings,
+                droppedDateTimeRanges,
+              } = await createBookings({
                 title,
                 venueId: selectedVenue.id,
                 dateTimeRanges: newBookingPeriods,
@@ -79,6 +82,16 @@ function BookingCreationFinalizeView() {
                 } created successfully.`,
               );
 
+              if (droppedDateTimeRanges.length === 1) {
+                toast.warning(
+                  "1 selected period was not booked as it clashes with other bookings.",
+                );
+              } else if (droppedDateTimeRanges.length > 1) {
+                toast.warning(
+                  `${droppedDateTimeRanges.length} selected periods were not booked as they clash with other bookings.`,
+                );
+              }
+
               dispatch(successBookingFormSubmissionAction(createdBookings));
               hideModal();
             } catch (error) {
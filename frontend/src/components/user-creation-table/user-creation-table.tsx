@@ -142,9 +142,10 @@ function UserCreationTable() {
 
   const onCreateUsers = async () => {
     try {
-      const createdUserInvites = await createUserInvites(
-        newPendingCreationUsers.map(({ email, role }) => ({ email, role })),
-      );
+      const { userInvites: createdUserInvites, duplicateInvitations } =
+        await createUserInvites(
+          newPendingCreationUsers.map(({ email, role }) => ({ email, role })),
+        );
 
       dispatch(
         updateNewPendingCreationUsersToCreatedAction(createdUserInvites),
@@ -155,6 +156,16 @@ function UserCreationTable() {
           createdUserInvites.length === 1 ? "" : "s"
         } created successfully.`,
       );
+
+      if (duplicateInvitations.length === 1) {
+        toast.warning(
+          "1 user was not created as they have already been invited or registered.",
+        );
+      } else if (duplicateInvitations.length > 1) {
+        toast.warning(
+          `${duplicateInvitations.length} users were not created as they have already been invited or registered.`,
+        );
+      }
     } catch (error) {
       resolveApiError(error as ApiResponseError);
     } finally {
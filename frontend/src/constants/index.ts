@@ -3,9 +3,11 @@ export const ACTION = "action";
 export const ACTIONS = "actions";
 export const BOOKER = "booker";
 export const BOOKING_ID = "bookingId";
+export const BOOKINGS = "bookings";
 export const CAPACITY = "capacity";
 export const CATEGORIES = "categories";
 export const CATEGORY = "category";
+export const CLASHING_DATE_TIME_RANGE = "clashingDateTimeRange";
 export const NON_COMMA_SPACE_REGEX = /[^,\s]+/g;
 export const CREATED_AT = "createdAt";
 export const CREATED_AT_STRING = "createdAtString";
@@ -17,6 +19,8 @@ export const TIME_FORMAT = "h.mm a";
 export const DATE_TIME_FORMAT = `${DATE_FORMAT} ${TIME_FORMAT}`;
 export const DATE_TIME_RANGES = "dateTimeRanges";
 export const DESCRIPTION = "description";
+export const DROPPED_DATE_TIME_RANGES = "droppedDateTimeRanges";
+export const DUPLICATE_INVITATIONS = "duplicateInvitations";
 export const EMAIL = "email";
 export const EMAIL_REGEX =
   /^(([^<>()[\]\\.,;:\s@"]+(\.[^<>()[\]\\.,;:\s@"]+)*)|(".+"))@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}])|(([a-zA-Z\-0-9]+\.)+[a-zA-Z]{2,}))$/;
@@ -47,6 +51,7 @@ export const PHONE_NUM_REGEX =
   /^(\s*|(\+?\d{0,4})?\s?-?\s?(\(?\d{3}\)?)\s?-?\s?(\(?\d{3}\)?)\s?-?\s?(\(?\d{4}\)?)?)$/;
 export const PLACEHOLDER = "placeholder";
 export const POSITIVE_NUM_REGEX = /^(\s*|[1-9]\d*)$/;
+export const REASON = "reason";
 export const REFRESH = "refresh";
 export const REQUIRED = "required";
 export const ROLE = "role";
@@ -61,6 +66,7 @@ export const TITLE = "title";
 export const UPDATED_AT = "updatedAt";
 export const USER = "user";
 export const USER_ID = "userId";
+export const USER_INVITES = "userInvites";
 export const UUID = "uuid";
 export const VENUE = "venue";
 export const VENUE_ID = "venueId";
@@ -82,5 +88,6 @@ export const FACEBOOK_AUTH = "facebookAuth";
 export const ACCESS_TOKEN = "accessToken";
 export const PAYLOAD = "payload";
 export const TOKENS = "tokens";
+export const TOKENS_ONLY = "tokensOnly";
 export const STATUSES = "statuses";
 export const INVITATIONS = "invitations";
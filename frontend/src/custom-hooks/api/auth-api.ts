@@ -21,6 +21,7 @@ import {
   LoginDetails,
   PasswordLoginPostData,
   PasswordResetPostData,
+  TokenRefreshData,
   TokenRefreshPostData,
 } from "../../types/auth";
 import {
@@ -56,13 +57,13 @@ export function useAxiosWithTokenRefresh<TResponse, TBody = undefined>(
     },
   );
   const [, tokenRefresh] = useAxios<
-    AuthenticationData,
+    TokenRefreshData,
     Partial<TokenRefreshPostData>
   >(
     {
       url: "/gateway/refresh",
       method: "post",
-      data: { refresh },
+      data: { refresh, tokensOnly: true },
     },
     { manual: true },
   );
@@ -5,6 +5,7 @@ import { useCallback, useMemo } from "react";
 
 import { DEFAULT_ARRAY } from "../../constants";
 import {
+  BookingCreationData,
   BookingData,
   BookingGetQueryParams,
   BookingPatchData,
@@ -126,7 +127,7 @@ export function useGetBookings() {
 
 export function useCreateBookings() {
   const [{ loading }, apiCall] = useAxiosWithTokenRefresh<
-    BookingData[],
+    BookingCreationData,
     BookingPostData
   >(
     {
@@ -142,17 +143,22 @@ export function useCreateBookings() {
         async (bookingPostData: BookingPostData) => {
           console.log("POST /bookings/ data:", bookingPostData);
 
-          const { data: bookings = [] } = await apiCall({
+          const {
+            data: { bookings = [], droppedDateTimeRanges = [] },
+          } = await apiCall({
             data: bookingPostData,
           });
 
-          console.log("POST /bookings/ success:", bookings);
+          console.log("POST /bookings/ success:", {
+            bookings,
+            droppedDateTimeRanges,
+          });
 
           if (bookings.length === 0) {
             throw new Error("No bookings were created.");
           }
 
-          return bookings;
+          return { bookings, droppedDateTimeRanges };
         },
         { logMessageLabel: "POST /bookings/ error:" },
       ),
@@ -6,6 +6,7 @@ import {
   SelfPatchData,
   SingleUserInvitePostData,
   UserData,
+  UserInviteCreationData,
   UserInviteData,
   UserInvitePatchData,
   UserInvitePostData,
@@ -49,7 +50,7 @@ export function useGetUserInvites() {
 
 export function useCreateUserInvites() {
   const [{ loading }, apiCall] = useAxiosWithTokenRefresh<
-    UserInviteData[],
+    UserInviteCreationData,
     UserInvitePostData
   >(
     {
@@ -63,15 +64,22 @@ export function useCreateUserInvites() {
     () =>
       errorHandlerWrapper(
         async (invitations: SingleUserInvitePostData[]) => {
-          const { data: userInvites = [] } = await apiCall({
+          const {
+            data: { userInvites = [], duplicateInvitations = [] },
+          } = await apiCall({
             data: { invitations },
           });
-          console.log("POST /users/invite success:", userInvites);
+          console.log("POST /users/invite success:", {
+            userInvites,
+            duplicateInvitations,
+          });
 
           if (userInvites.length === 0) {
-            throw new Error("No new users were created.");
+            throw new Error(
+              "No new users were created as they have already been invited or registered.",
+            );
           }
-          return userInvites;
+          return { userInvites, duplicateInvitations };
         },
         { logMessageLabel: "POST /users/invite error:" },
       ),
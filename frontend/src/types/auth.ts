@@ -1,4 +1,12 @@
-import { ACCESS, EMAIL, NAME, REFRESH, TOKENS, USER } from "../constants";
+import {
+  ACCESS,
+  EMAIL,
+  NAME,
+  REFRESH,
+  TOKENS,
+  TOKENS_ONLY,
+  USER,
+} from "../constants";
 import {
   FacebookPayloadPostData,
   GooglePayloadPostData,
@@ -16,8 +24,13 @@ export type AuthenticationData = {
 
 export type TokenRefreshPostData = {
   [REFRESH]: string;
+  [TOKENS_ONLY]?: boolean;
 };
 
+// the user is only returned if their role or organization has changed
+export type TokenRefreshData = Pick<AuthenticationData, typeof TOKENS> &
+  Partial<Pick<AuthenticationData, typeof USER>>;
+
 export type CheckAccountPostData = {
   [EMAIL]: string;
 };
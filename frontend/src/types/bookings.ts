@@ -4,10 +4,14 @@ import {
   ACTION,
   BOOKER,
   BOOKING_FORM_RESPONSES,
+  BOOKINGS,
+  CLASHING_DATE_TIME_RANGE,
   DATE_TIME_RANGES,
+  DROPPED_DATE_TIME_RANGES,
   END_DATE_TIME,
   FORM_RESPONSE_DATA,
   FULL_DETAILS,
+  REASON,
   RESPONSE,
   START_DATE_TIME,
   STATUS,
@@ -42,6 +46,16 @@ export type DateTimeRange = {
   [END_DATE_TIME]: number;
 };
 
+export type DroppedDateTimeRange = DateTimeRange & {
+  [REASON]: DroppedReason;
+  [CLASHING_DATE_TIME_RANGE]: DateTimeRange;
+};
+
+export type BookingCreationData = {
+  [BOOKINGS]: BookingData[];
+  [DROPPED_DATE_TIME_RANGES]: DroppedDateTimeRange[];
+};
+
 export type BookingData = BaseData & {
   [TITLE]: string;
   [BOOKER]: UserData;
@@ -107,3 +121,8 @@ export enum BookingCreationStep {
   Finalize,
   __length,
 }
+
+export enum DroppedReason {
+  ClashingApprovedBooking = "CLASHING_APPROVED_BOOKING",
+  ClashingNewInterval = "CLASHING_NEW_INTERVAL",
+}
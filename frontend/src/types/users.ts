@@ -1,6 +1,7 @@
 import {
   ACCESS_TOKEN,
   ACTION,
+  DUPLICATE_INVITATIONS,
   EMAIL,
   EMAILS,
   FACEBOOK_AUTH,
@@ -14,9 +15,11 @@ import {
   PASSWORD,
   PAYLOAD,
   PROFILE_IMAGE,
+  REASON,
   ROLE,
   STATUS,
   TOKEN_ID,
+  USER_INVITES,
 } from "../constants";
 import { BaseData } from "./base";
 
@@ -105,6 +108,22 @@ export type UserInvitePostData = {
   [INVITATIONS]: SingleUserInvitePostData[];
 };
 
+export enum DuplicateInvitationReason {
+  ExistingUser = "EXISTING_USER",
+  ExistingUserInvite = "EXISTING_USER_INVITE",
+  RepeatedInRequest = "REPEATED_IN_REQUEST",
+}
+
+export type DuplicateInvitation = {
+  [EMAIL]: string;
+  [REASON]: DuplicateInvitationReason;
+};
+
+export type UserInviteCreationData = {
+  [USER_INVITES]: UserInviteData[];
+  [DUPLICATE_INVITATIONS]: DuplicateInvitation[];
+};
+
 export type UserInvitePatchData = {
   [ROLE]: Role;
 };